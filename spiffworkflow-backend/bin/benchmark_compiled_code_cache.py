@@ -0,0 +1,52 @@
+"""Times the script engine work of a looping multi-instance script task with and without the compiled code cache.
+
+Each instance runs the loop condition, the script body and the completion condition like the engine does:
+
+    ./bin/run_local_python_script bin/benchmark_compiled_code_cache.py [instances]
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.services.compiled_code_cache_service import CompiledCodeCacheService
+from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
+
+LOOP_CONDITION = "index < len(items)"
+SCRIPT = """
+item = items[index]
+total = item["quantity"] * item["price"]
+if total > 100:
+    discount = round(total * 0.1, 2)
+else:
+    discount = 0
+line_total = total - discount
+"""
+COMPLETION_CONDITION = "line_total < 0"
+
+
+def main(instance_count: int) -> None:
+    app = create_app()
+    with app.app_context():
+        script_engine = CustomBpmnScriptEngine()
+        items = [{"quantity": index % 7, "price": index % 50} for index in range(instance_count)]
+        for max_entries in [0, app.config["SPIFFWORKFLOW_BACKEND_COMPILED_CODE_CACHE_MAX_ENTRIES"]]:
+            app.config["SPIFFWORKFLOW_BACKEND_COMPILED_CODE_CACHE_MAX_ENTRIES"] = max_entries
+            CompiledCodeCacheService.clear()
+            CompiledCodeCacheService.reset_stats()
+            start = time.perf_counter()
+            for index in range(instance_count):
+                task = SimpleNamespace(data={"items": items, "index": index})
+                script_engine.evaluate(task, LOOP_CONDITION)
+                script_engine.execute(task, SCRIPT)
+                script_engine.evaluate(task, COMPLETION_CONDITION)
+            duration = time.perf_counter() - start
+            print(
+                f"max_entries={max_entries} instances={instance_count} "
+                f"average_instance_time_in_us={duration / instance_count * 1000000:.1f} "
+                f"stats={CompiledCodeCacheService.stats()}"
+            )
+
+
+main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
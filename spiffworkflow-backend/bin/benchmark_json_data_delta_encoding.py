@@ -0,0 +1,66 @@
+"""Reports how much json_data a process instance's task data takes up and how long it takes to load it.
+
+Run it against instances created with SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING_ENABLED on and off
+to compare the two. The size the data would take up without any delta records is estimated as well:
+
+    ./bin/run_local_python_script bin/benchmark_json_data_delta_encoding.py [process_instance_id] [iterations]
+"""
+
+import json
+import sys
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import DELTA_KEY
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel
+
+
+def main(process_instance_id: int, iterations: int) -> None:
+    app = create_app()
+    with app.app_context():
+        task_hashes = {
+            row.json_data_hash
+            for row in db.session.query(TaskModel.json_data_hash)  # type: ignore
+            .filter_by(process_instance_id=process_instance_id)
+            .all()
+        }
+        if len(task_hashes) == 0:
+            raise Exception(f"Could not find any tasks for process instance: {process_instance_id}")
+
+        # follow delta records back to their full records so the rows they need are counted as well
+        stored_data_by_hash: dict[str, dict] = {}
+        hashes_to_query = set(task_hashes)
+        while hashes_to_query:
+            rows = db.session.query(JsonDataModel.hash, JsonDataModel.data).filter(JsonDataModel.hash.in_(hashes_to_query)).all()  # type: ignore
+            hashes_to_query = set()
+            for row in rows:
+                stored_data_by_hash[row.hash] = row.data
+                if JsonDataModel.is_delta(row.data) and row.data[DELTA_KEY]["base"] not in stored_data_by_hash:
+                    hashes_to_query.add(row.data[DELTA_KEY]["base"])
+
+        delta_count = len([d for d in stored_data_by_hash.values() if JsonDataModel.is_delta(d)])
+        stored_bytes = sum(len(json.dumps(d)) for d in stored_data_by_hash.values())
+
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            data_dicts = JsonDataModel.find_data_dicts_by_hashes(task_hashes)
+            durations.append(time.perf_counter() - start)
+        full_bytes = sum(
+            len(json.dumps(d))
+            for d in {JsonDataModel.json_data_dict_from_dict(d)["hash"]: d for d in data_dicts.values()}.values()
+        )
+
+        print(f"Task data for process instance {process_instance_id} uses {len(stored_data_by_hash)} json_data rows")
+        print(f"delta rows: {delta_count}")
+        print(f"stored_mb={stored_bytes / 1024 / 1024:.3f}")
+        print(f"estimated_mb_without_deltas={full_bytes / 1024 / 1024:.3f}")
+        print(f"average_load_time_in_seconds={sum(durations) / len(durations):.3f}")
+
+
+if len(sys.argv) < 2:
+    raise Exception("usage: [script] [process_instance_id] [iterations]")
+
+main(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,86 @@
+"""Compares permission checks with SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED on and off.
+
+Creates a user in 50 groups with 5000 permission targets spread across the groups, times checks
+against both paths and then deletes everything it created:
+
+    ./bin/run_local_python_script bin/benchmark_permission_cache.py [iterations]
+"""
+
+import random
+import sys
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.permission_assignment import PermissionAssignmentModel
+from spiffworkflow_backend.models.permission_target import PermissionTargetModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.authorization_service import AuthorizationService
+from spiffworkflow_backend.services.permission_cache_service import PermissionCacheService
+from spiffworkflow_backend.services.user_service import UserService
+
+GROUP_COUNT = 50
+TARGET_COUNT = 5000
+IDENTIFIER_PREFIX = "benchmark_permission_cache"
+
+
+def main(iterations: int) -> None:
+    app = create_app()
+    with app.app_context():
+        user = UserService.create_user(f"{IDENTIFIER_PREFIX}_user", "local", f"{IDENTIFIER_PREFIX}_user")
+        groups = [UserService.find_or_create_group(f"{IDENTIFIER_PREFIX}_group_{index}") for index in range(GROUP_COUNT)]
+        for group in groups:
+            UserService.add_user_to_group(user, group)
+
+        targets = []
+        for index in range(TARGET_COUNT):
+            group = groups[index % GROUP_COUNT]
+            wildcard = "%" if index % 2 == 0 else ""
+            target = PermissionTargetModel(uri=f"/process-groups/{IDENTIFIER_PREFIX}:group-{index}:{wildcard}")
+            targets.append(target)
+            db.session.add(target)
+            db.session.flush()
+            grant_type = "deny" if index % 10 == 0 else "permit"
+            db.session.add(
+                PermissionAssignmentModel(
+                    principal_id=group.principal.id, permission_target_id=target.id, permission="read", grant_type=grant_type
+                )
+            )
+        db.session.commit()
+        user_id = user.id
+
+        try:
+            uris = [
+                f"/v1.0/process-groups/{IDENTIFIER_PREFIX}:group-{random.randrange(TARGET_COUNT * 2)}:model"  # noqa: S311
+                for _ in range(iterations)
+            ]
+            for cache_enabled in [False, True]:
+                app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED"] = cache_enabled
+                results = []
+                if cache_enabled:
+                    build_start = time.perf_counter()
+                    PermissionCacheService.invalidate()
+                    PermissionCacheService.compiled_permissions()
+                    print(f"build_time_in_seconds={time.perf_counter() - build_start:.3f}")
+                start = time.perf_counter()
+                for uri in uris:
+                    # each request loads the user and its groups in a fresh session
+                    db.session.expire_all()
+                    user = UserModel.query.filter_by(id=user_id).first()
+                    results.append(AuthorizationService.user_has_permission(user, "read", uri))
+                duration = time.perf_counter() - start
+                print(
+                    f"cache_enabled={cache_enabled} checks={iterations} permitted={results.count(True)} "
+                    f"average_check_time_in_ms={duration / iterations * 1000:.3f}"
+                )
+        finally:
+            for target in targets:
+                PermissionAssignmentModel.query.filter_by(permission_target_id=target.id).delete()
+                db.session.delete(target)
+            for group in groups:
+                db.session.delete(group)
+            db.session.delete(user)
+            db.session.commit()
+
+
+main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,74 @@
+"""Compares the memory and time used to load a process instance with and without copying the assembled dict.
+
+To see the difference on a large instance, run a process model with a multi-instance task over something
+like range(5000) so it ends up with at least 5k tasks and pass its id to this script:
+
+    ./bin/run_local_python_script bin/benchmark_process_instance_load.py [process_instance_id] [iterations]
+"""
+
+import copy
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.task import TaskModel
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+
+
+def measure(label: str, iterations: int, func: Callable[[], Any]) -> None:
+    peaks = []
+    durations = []
+    for _ in range(iterations):
+        # start each run with an empty session so every run loads the same rows from the database
+        db.session.expunge_all()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        del result
+    print(
+        f"{label}: peak_memory_mb={max(peaks) / 1024 / 1024:.2f} "
+        f"average_time_in_seconds={sum(durations) / len(durations):.3f}"
+    )
+
+
+def main(process_instance_id: int, iterations: int) -> None:
+    app = create_app()
+    with app.app_context():
+        process_instance = ProcessInstanceModel.query.filter_by(id=process_instance_id).first()
+        if process_instance is None:
+            raise Exception(f"Could not find a process instance with id: {process_instance_id}")
+        task_count = TaskModel.query.filter_by(process_instance_id=process_instance_id).count()
+        print(f"Loading process instance {process_instance_id} with {task_count} tasks")
+
+        def load_with_full_copy() -> Any:
+            instance = ProcessInstanceModel.query.filter_by(id=process_instance_id).one()
+            full_bpmn_process_dict = ProcessInstanceProcessor._get_full_bpmn_process_dict(
+                instance, {}, include_task_data_for_completed_tasks=True, include_completed_subprocesses=True
+            )
+            bpmn_process_instance = ProcessInstanceProcessor._serializer.from_dict(copy.deepcopy(full_bpmn_process_dict))
+            # processors used to keep the assembled dict around for their whole lifetime
+            return (bpmn_process_instance, full_bpmn_process_dict)
+
+        def load_with_processor() -> Any:
+            instance = ProcessInstanceModel.query.filter_by(id=process_instance_id).one()
+            return ProcessInstanceProcessor(
+                instance, include_task_data_for_completed_tasks=True, include_completed_subprocesses=True
+            )
+
+        measure("with full copy", iterations, load_with_full_copy)
+        measure("processor", iterations, load_with_processor)
+
+
+if len(sys.argv) < 2:
+    raise Exception("usage: [script] [process_instance_id] [iterations]")
+
+main(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 3)
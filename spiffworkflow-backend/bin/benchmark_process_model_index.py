@@ -0,0 +1,74 @@
+"""Times listing the process models and process groups of a spec dir with and without the process model index.
+
+Creates a temporary spec dir with the given number of process models spread over nested process groups:
+
+    ./bin/run_local_python_script bin/benchmark_process_model_index.py [process_models] [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.process_group import ProcessGroup
+from spiffworkflow_backend.models.process_model import ProcessModelInfo
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
+
+MODELS_PER_GROUP = 50
+
+
+def create_spec_dir(process_model_count: int) -> None:
+    for group_index in range(process_model_count // MODELS_PER_GROUP + 1):
+        group_id = f"group-{group_index // 10}/subgroup-{group_index}"
+        for process_group_id in [group_id.split("/")[0], group_id]:
+            ProcessModelService.add_process_group(ProcessGroup(id=process_group_id, display_name=process_group_id))
+        for model_index in range(group_index * MODELS_PER_GROUP, min((group_index + 1) * MODELS_PER_GROUP, process_model_count)):
+            process_model = ProcessModelInfo(
+                id=f"{group_id}/model-{model_index}",
+                display_name=f"Model {model_index}",
+                description="benchmark",
+                primary_file_name=f"model_{model_index}.bpmn",
+                primary_process_id=f"Process_{model_index}",
+            )
+            ProcessModelService.add_process_model(process_model)
+
+    # the index does not trust modification times that are too recent so pretend the files were written a while ago
+    timestamp = time.time() - 60
+    for root, _dirs, files in os.walk(ProcessModelService.root_path()):
+        os.utime(root, (timestamp, timestamp))
+        for file in files:
+            os.utime(os.path.join(root, file), (timestamp, timestamp))
+
+
+def main(process_model_count: int, iterations: int) -> None:
+    app = create_app()
+    with app.app_context(), tempfile.TemporaryDirectory() as spec_dir:
+        app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"] = spec_dir
+        create_spec_dir(process_model_count)
+        for enabled, revalidate_interval in [(False, 0), (True, 0), (True, 60)]:
+            app.config["SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_ENABLED"] = enabled
+            app.config["SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_REVALIDATE_INTERVAL_IN_SECONDS"] = revalidate_interval
+            ProcessModelIndexService.clear()
+            ProcessModelService.get_process_models(recursive=True)
+            ProcessModelService.get_process_groups()
+            ProcessModelIndexService.reset_stats()
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                process_models = ProcessModelService.get_process_models(recursive=True)
+            process_models_duration = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(iterations):
+                ProcessModelService.get_process_groups()
+            process_groups_duration = time.perf_counter() - start
+            print(
+                f"enabled={enabled} revalidate_interval={revalidate_interval} process_models={len(process_models)} "
+                f"average_get_process_models_time_in_ms={process_models_duration / iterations * 1000:.1f} "
+                f"average_get_process_groups_time_in_ms={process_groups_duration / iterations * 1000:.1f} "
+                f"stats={ProcessModelIndexService.stats()}"
+            )
+
+
+main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,34 @@
+"""Deletes json_data rows that are no longer referenced by tasks, bpmn processes, reports or task drafts.
+
+Orphaned rows are marked in batches, then after the grace period the ones that are still orphaned are
+deleted. Pass max_batches to only walk part of the table at a time. The hash to resume from is printed
+at the end of a partial run:
+
+    ./bin/run_local_python_script bin/collect_json_data_garbage.py \
+        [batch_size] [grace_period_in_seconds] [max_batches] [start_after_hash]
+"""
+
+import sys
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.services.json_data_garbage_collection_service import JsonDataGarbageCollectionService
+
+
+def main(batch_size: int, grace_period_in_seconds: float, max_batches: int | None, after_hash: str | None) -> None:
+    app = create_app()
+    with app.app_context():
+        deleted_count, after_hash = JsonDataGarbageCollectionService.collect(
+            batch_size, grace_period_in_seconds, after_hash=after_hash, max_batches=max_batches
+        )
+        print(f"Deleted {deleted_count} orphaned json_data rows")
+        if after_hash is not None:
+            print(f"Resume with start_after_hash: {after_hash}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 60,
+        int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3] != "" else None,
+        sys.argv[4] if len(sys.argv) > 4 else None,
+    )
@@ -0,0 +1,40 @@
+"""Compresses or decompresses existing json_data rows to match the current json data compression config.
+
+Rows are rewritten in batches ordered by hash and each batch is committed on its own. The last hash of each
+batch is printed so an interrupted run can be resumed by passing it in:
+
+    ./bin/run_local_python_script bin/compact_json_data.py [batch_size] [start_after_hash]
+"""
+
+import sys
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.helpers.json_data_compression import JsonDataCompression
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+
+
+def main(batch_size: int, after_hash: str | None) -> None:
+    app = create_app()
+    with app.app_context():
+        print(f"Rewriting json_data rows with compression codec: {JsonDataCompression.codec()}")
+        start = time.perf_counter()
+        rewritten_count = 0
+        while True:
+            last_hash, batch_rewritten_count = JsonDataModel.compact_json_data_records(
+                after_hash=after_hash, batch_size=batch_size
+            )
+            db.session.commit()
+            if last_hash is None:
+                break
+            after_hash = last_hash
+            rewritten_count += batch_rewritten_count
+            print(f"rewrote {batch_rewritten_count} rows up to hash: {last_hash}")
+
+        print(f"Rewrote {rewritten_count} rows in {time.perf_counter() - start:.1f} seconds")
+        print(JsonDataCompression.stats())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, sys.argv[2] if len(sys.argv) > 2 else None)
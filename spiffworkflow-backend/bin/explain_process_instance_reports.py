@@ -0,0 +1,40 @@
+"""Records the sql and the query plan the database uses for the first page of each system process instance report.
+
+Run it against a database with realistic data before and after changing how reports are built to compare the plans:
+
+    ./bin/run_local_python_script bin/explain_process_instance_reports.py [username] [output_directory]
+"""
+
+import os
+import sys
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportService
+
+
+def main(username: str, output_directory: str) -> None:
+    app = create_app()
+    with app.app_context():
+        user = UserModel.query.filter_by(username=username).first()
+        if user is None:
+            raise Exception(f"Could not find user: {username}")
+
+        os.makedirs(output_directory, exist_ok=True)
+        for report_identifier in ProcessInstanceReportService.system_metadata_maps().keys():
+            process_instance_report = ProcessInstanceReportService.report_with_identifier(
+                user=user, report_identifier=report_identifier
+            )
+            query_plan = ProcessInstanceReportService.explain_process_instance_report(
+                process_instance_report.report_metadata, user=user
+            )
+            output_file = os.path.join(output_directory, f"{report_identifier}.txt")
+            with open(output_file, "w") as f:
+                f.write(f"{query_plan['sql']}\n\n{query_plan['explain']}\n")
+            print(f"Wrote {output_file}")
+
+
+if len(sys.argv) < 3:
+    raise Exception("usage: [script] [username] [output_directory]")
+
+main(sys.argv[1], sys.argv[2])
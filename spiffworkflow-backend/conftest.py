@@ -5,10 +5,18 @@ import shutil
 import pytest
 from flask.app import Flask
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
+from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.authorization_service import AuthorizationService
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheService
+from spiffworkflow_backend.services.compiled_code_cache_service import CompiledCodeCacheService
+from spiffworkflow_backend.services.permission_cache_service import PermissionCacheService
+from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportService
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.secret_service import SecretService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 
@@ -51,12 +59,24 @@ def with_db_and_bpmn_file_cleanup() -> None:
     for table in reversed(meta.sorted_tables):
         db.session.execute(table.delete())
     db.session.commit()
+    # wiping the permission tables touches the permission cache generation so leave no trace of that either
+    db.session.execute(CacheGenerationModel.__table__.delete())
+    db.session.commit()
+
+    # ids get handed out again once the tables are wiped so nothing cached by an earlier test can be trusted
+    BpmnProcessDefinitionCacheService.clear()
+    SpecCacheService.clear()
+    CompiledCodeCacheService.clear()
+    PermissionCacheService.invalidate()
+    SecretService.invalidate_decrypted_secret()
+    ProcessInstanceReportService.clear_total_count_cache()
 
     try:
         yield
     finally:
         if os.path.exists(ProcessModelService.root_path()):
             shutil.rmtree(ProcessModelService.root_path())
+        ProcessModelIndexService.clear()
 
 
 @pytest.fixture()
@@ -23,6 +23,7 @@ from spiffworkflow_backend.routes.openid_blueprint.openid_blueprint import openi
 from spiffworkflow_backend.routes.user_blueprint import user_blueprint
 from spiffworkflow_backend.services.monitoring_service import configure_sentry
 from spiffworkflow_backend.services.monitoring_service import setup_prometheus_metrics
+from spiffworkflow_backend.services.permission_cache_service import PermissionCacheService
 
 # This commented out code is if you want to use the pymysql library with sqlalchemy rather than mysqlclient.
 # mysqlclient can be hard to install when running non-docker local dev, but it is generally worth it because it is much faster.
@@ -72,6 +73,8 @@ def create_app() -> flask.app.Flask:
 
     setup_config(app)
     db.init_app(app)
+    if app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED"]:
+        PermissionCacheService.register_session_listeners()
     migrate.init_app(app, db)
 
     app.register_blueprint(user_blueprint)
@@ -5,6 +5,7 @@ from apscheduler.schedulers.background import BackgroundScheduler  # type: ignor
 from apscheduler.schedulers.base import BaseScheduler  # type: ignore
 
 from spiffworkflow_backend.background_processing.background_processing_service import BackgroundProcessingService
+from spiffworkflow_backend.background_processing.process_instance_queue_dispatcher import ProcessInstanceQueueDispatcher
 
 
 def should_start_apscheduler(app: flask.app.Flask) -> bool:
@@ -30,6 +31,8 @@ def start_apscheduler(app: flask.app.Flask, scheduler_class: BaseScheduler = Bac
 
     if app.config["SPIFFWORKFLOW_BACKEND_CELERY_ENABLED"]:
         _add_jobs_for_celery_based_configuration(app, scheduler)
+    elif _should_use_dispatcher(app):
+        ProcessInstanceQueueDispatcher(app).start()
     else:
         _add_jobs_for_non_celery_based_configuration(app, scheduler)
 
@@ -38,6 +41,13 @@ def start_apscheduler(app: flask.app.Flask, scheduler_class: BaseScheduler = Bac
     scheduler.start()
 
 
+def _should_use_dispatcher(app: flask.app.Flask) -> bool:
+    return (
+        not app.config["SPIFFWORKFLOW_BACKEND_CELERY_ENABLED"]
+        and app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_ENABLED"] is True
+    )
+
+
 def _add_jobs_for_celery_based_configuration(app: flask.app.Flask, scheduler: BaseScheduler) -> None:
     future_task_execution_interval_in_seconds = app.config[
         "SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_EXECUTION_INTERVAL_IN_SECONDS"
@@ -91,13 +101,21 @@ def _add_jobs_that_should_run_regardless_of_celery_config(app: flask.app.Flask,
     )
 
     # when you create a process instance via the API and do not use the run API method, this would pick up the instance.
-    scheduler.add_job(
-        BackgroundProcessingService(app).process_not_started_process_instances,
-        "interval",
-        seconds=not_started_polling_interval_in_seconds,
-    )
+    # the dispatcher picks those up itself.
+    if not _should_use_dispatcher(app):
+        scheduler.add_job(
+            BackgroundProcessingService(app).process_not_started_process_instances,
+            "interval",
+            seconds=not_started_polling_interval_in_seconds,
+        )
     scheduler.add_job(
         BackgroundProcessingService(app).remove_stale_locks,
         "interval",
         seconds=app.config["MAX_INSTANCE_LOCK_DURATION_IN_SECONDS"],
     )
+    if app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_JSON_DATA_GARBAGE_COLLECTION_ENABLED"]:
+        scheduler.add_job(
+            BackgroundProcessingService(app).collect_json_data_garbage,
+            "interval",
+            seconds=app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_JSON_DATA_GARBAGE_COLLECTION_INTERVAL_IN_SECONDS"],
+        )
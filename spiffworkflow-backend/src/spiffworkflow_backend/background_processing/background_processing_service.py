@@ -11,6 +11,7 @@ from spiffworkflow_backend.models.future_task import FutureTaskModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
 from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
+from spiffworkflow_backend.services.json_data_garbage_collection_service import JsonDataGarbageCollectionService
 from spiffworkflow_backend.services.message_service import MessageService
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
@@ -57,6 +58,11 @@ class BackgroundProcessingService:
         with self.app.app_context():
             ProcessInstanceLockService.remove_stale_locks()
 
+    def collect_json_data_garbage(self) -> None:
+        """Deletes json_data rows that are no longer referenced by anything."""
+        with self.app.app_context():
+            JsonDataGarbageCollectionService.run_scheduled_collection()
+
     def process_future_tasks(self) -> None:
         """Timer related tasks go in the future_task table.
 
@@ -0,0 +1,131 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+import flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+
+
+class ProcessInstanceQueueDispatcher:
+    """Runs queued process instances on a pool of worker threads as soon as they are ready to run.
+
+    This replaces polling the queue for each status on an interval with do_waiting. A single dispatcher thread claims
+    as many ready entries as there are idle workers and hands them to the pool. When nothing is ready it sleeps until
+    the next entry will be, or until something is enqueued in this process, whichever comes first. Entries enqueued
+    by other processes are picked up within SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_MAX_WAIT_IN_SECONDS.
+    """
+
+    def __init__(self, app: flask.app.Flask):
+        self.app = app
+        self.worker_count: int = app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_WORKER_COUNT"]
+        self.max_wait_in_seconds: float = app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_MAX_WAIT_IN_SECONDS"]
+        self.min_age_in_seconds_by_status = self.__class__.default_min_age_in_seconds_by_status(app)
+        self._futures: set[Future] = set()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def default_min_age_in_seconds_by_status(cls, app: flask.app.Flask) -> dict[str, int]:
+        # instances wait a bit after they were last enqueued to avoid conflicts with the interstitial page.
+        # user_input_required instances only need to run if a timer fired so they are checked less often.
+        min_age_in_seconds: int = app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_MIN_AGE_IN_SECONDS"]
+        return {
+            ProcessInstanceStatus.not_started.value: min_age_in_seconds,
+            ProcessInstanceStatus.waiting.value: min_age_in_seconds,
+            ProcessInstanceStatus.running.value: min_age_in_seconds,
+            ProcessInstanceStatus.user_input_required.value: max(
+                min_age_in_seconds,
+                app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_USER_INPUT_REQUIRED_POLLING_INTERVAL_IN_SECONDS"],
+            ),
+        }
+
+    def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix="process-instance-worker")
+        self._thread = threading.Thread(target=self._dispatch, name="process-instance-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopped.set()
+        ProcessInstanceQueueService._notify_enqueued()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def dispatch_ready_process_instances(self) -> float:
+        """Claims ready queue entries for idle workers and returns how long to wait before trying again."""
+        self._futures = {f for f in self._futures if not f.done()}
+        idle_worker_count = self.worker_count - len(self._futures)
+        if idle_worker_count < 1:
+            # a worker finishing enqueues its instance again which wakes us up
+            return self.max_wait_in_seconds
+
+        with self.app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context("bg:dispatcher")
+            queue_entries = ProcessInstanceQueueService.claim_ready_entries(self.min_age_in_seconds_by_status, idle_worker_count)
+            if len(queue_entries) == 0:
+                seconds_until_next_ready_entry = ProcessInstanceQueueService.seconds_until_next_ready_entry(
+                    self.min_age_in_seconds_by_status
+                )
+                if seconds_until_next_ready_entry is None:
+                    return self.max_wait_in_seconds
+                return min(seconds_until_next_ready_entry, self.max_wait_in_seconds)
+
+            for queue_entry in queue_entries:
+                db.session.expunge(queue_entry)
+                self._futures.add(self._submit(queue_entry))
+
+        # there may be more ready entries than we had idle workers
+        return 0
+
+    def run_queue_entry(self, queue_entry: ProcessInstanceQueueModel) -> None:
+        """Runs the process instance for a claimed queue entry and then puts it back in the queue."""
+        with self.app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context("bg:dispatcher")
+            # the dispatcher claimed the entry in the database so all this thread needs to do is remember it has the lock
+            ProcessInstanceLockService.lock(queue_entry.process_instance_id, queue_entry)
+            process_instance = ProcessInstanceModel.query.filter_by(id=queue_entry.process_instance_id).first()
+            if process_instance is None:
+                ProcessInstanceLockService.unlock(queue_entry.process_instance_id)
+                return
+
+            self.app.logger.info(f"Dispatcher {queue_entry.status}: Processing process_instance {process_instance.id}")
+            try:
+                ProcessInstanceService.run_process_instance_with_processor(
+                    process_instance,
+                    status_value=queue_entry.status,
+                    execution_strategy_name=self.app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_DEFAULT_STRATEGY_BACKGROUND"],
+                )
+            except Exception as exception:
+                db.session.rollback()  # in case the above left the database with a bad transaction
+                new_exception = Exception(
+                    f"Error running {queue_entry.status} task for process_instance {process_instance.id}"
+                    + f"({process_instance.process_model_identifier}). {exception.__class__.__name__}: {str(exception)}"
+                )
+                self.app.logger.exception(new_exception, stack_info=True)
+            finally:
+                ProcessInstanceQueueService._enqueue(process_instance)
+
+    def _submit(self, queue_entry: ProcessInstanceQueueModel) -> Future:
+        if self._executor is None:
+            raise Exception("The process instance queue dispatcher has not been started")
+        return self._executor.submit(self.run_queue_entry, queue_entry)
+
+    def _dispatch(self) -> None:
+        while not self._stopped.is_set():
+            generation = ProcessInstanceQueueService.enqueued_generation()
+            try:
+                wait_in_seconds = self.dispatch_ready_process_instances()
+            except Exception as exception:
+                self.app.logger.exception(exception)
+                wait_in_seconds = self.max_wait_in_seconds
+            if wait_in_seconds > 0 and not self._stopped.is_set():
+                ProcessInstanceQueueService.wait_for_enqueued(generation, wait_in_seconds)
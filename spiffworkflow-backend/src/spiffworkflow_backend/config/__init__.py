@@ -106,6 +106,14 @@ def _check_extension_api_configs(app: Flask) -> None:
         )
 
 
+def _check_connector_proxy_configs(app: Flask) -> None:
+    task_data_mode = app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TASK_DATA_MODE"]
+    if task_data_mode not in ["always", "declared"]:
+        raise ConfigurationError(
+            f"SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TASK_DATA_MODE must be either 'always' or 'declared'. Got: {task_data_mode}"
+        )
+
+
 # see the message in the ConfigurationError below for why we are checking this.
 # we really do not want this to raise when there is not a problem, so there are lots of return statements littered throughout.
 def _check_for_incompatible_frontend_and_backend_urls(app: Flask) -> None:
@@ -260,4 +268,5 @@ def setup_config(app: Flask) -> None:
     _set_up_tenant_specific_fields_as_list_of_strings(app)
     _check_for_incompatible_frontend_and_backend_urls(app)
     _check_extension_api_configs(app)
+    _check_connector_proxy_configs(app)
     _setup_cipher(app)
@@ -72,6 +72,19 @@ config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_ALLOW_OPTIMISTIC_CHE
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_POLLING_INTERVAL_IN_SECONDS", default=10)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_NOT_STARTED_POLLING_INTERVAL_IN_SECONDS", default=30)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_USER_INPUT_REQUIRED_POLLING_INTERVAL_IN_SECONDS", default=120)
+# how many process instances do_waiting claims at once. each one is released as soon as it has run.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DEQUEUE_BATCH_SIZE", default=10)
+# run queued process instances on a pool of worker threads as soon as they are ready instead of polling for each status
+# on an interval. only used when celery is disabled. see background_processing/process_instance_queue_dispatcher.py.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_ENABLED", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_WORKER_COUNT", default=4)
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_MIN_AGE_IN_SECONDS", default=60)
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DISPATCHER_MAX_WAIT_IN_SECONDS", default=10)
+# delete json_data rows nothing references anymore. rows are deleted one interval after they are found to be orphaned.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_JSON_DATA_GARBAGE_COLLECTION_ENABLED", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_JSON_DATA_GARBAGE_COLLECTION_INTERVAL_IN_SECONDS", default=3600)
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_GARBAGE_COLLECTION_BATCH_SIZE", default=1000)
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_GARBAGE_COLLECTION_MAX_BATCHES_PER_RUN", default=100)
 
 ### background with celery
 config_from_env("SPIFFWORKFLOW_BACKEND_CELERY_ENABLED", default=False)
@@ -82,6 +95,15 @@ config_from_env("SPIFFWORKFLOW_BACKEND_CELERY_RESULT_BACKEND", default="redis://
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_LOOKAHEAD_IN_SECONDS", default=301)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_EXECUTION_INTERVAL_IN_SECONDS", default=300)
 
+### interstitial progress
+# how the interstitial page hears about progress made by whatever holds the lock on a process instance.
+# local only sees progress made in the same python process. use redis when background workers run separately.
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_PROGRESS_BACKEND", default="local")
+# defaults to SPIFFWORKFLOW_BACKEND_CELERY_BROKER_URL
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_PROGRESS_REDIS_URL")
+# how often to send a keep-alive and check the db for progress the backend did not tell us about
+config_from_env("SPIFFWORKFLOW_BACKEND_INTERSTITIAL_HEARTBEAT_IN_SECONDS", default=15)
+
 ### frontend
 config_from_env("SPIFFWORKFLOW_BACKEND_URL_FOR_FRONTEND", default="http://localhost:7001")
 config_from_env("SPIFFWORKFLOW_BACKEND_URL", default="http://localhost:7000")
@@ -98,6 +120,18 @@ config_from_env(
     "SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TYPEAHEAD_URL",
     default="https://emehvlxpwodjawtgi7ctkbvpse0vmaow.lambda-url.us-east-1.on.aws",
 )
+# each process keeps this many connections to the connector proxy open between service task calls.
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_POOL_SIZE", default=20)
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_CONNECT_TIMEOUT_IN_SECONDS", default=5)
+# failed connections are always retried. 502, 503 and 504 responses are only retried for the comma separated
+# commands in SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_IDEMPOTENT_COMMANDS since others may have already done something.
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_RETRIES", default=2)
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_RETRY_BACKOFF_FACTOR", default="0.5")
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_IDEMPOTENT_COMMANDS", default="")
+# always: send the task data to every command as spiff__task_data.
+# declared: only send it to commands that list spiff__task_data in their parameters from /v1/commands.
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TASK_DATA_MODE", default="always")
+config_from_env("SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_COMMANDS_CACHE_MAX_AGE_IN_SECONDS", default=300)
 
 ### database
 config_from_env("SPIFFWORKFLOW_BACKEND_DATABASE_TYPE", default="mysql")  # can also be sqlite, postgres
@@ -165,6 +199,13 @@ config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSIONS_FILE_NAME")
 # FIXME: do not default this but we will need to coordinate release of it since it is a breaking change
 config_from_env("SPIFFWORKFLOW_BACKEND_DEFAULT_USER_GROUP", default="everybody")
 config_from_env("SPIFFWORKFLOW_BACKEND_DEFAULT_PUBLIC_USER_GROUP", default="spiff_public")
+# permission checks use a compiled copy of all permission assignments kept in each process instead of querying the db.
+# commits that change permissions rebuild it in the same process and other processes check for changes at this interval.
+# target uris are matched literally instead of with LIKE so "_" is not a wildcard and matching is case sensitive.
+config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_GENERATION_CHECK_INTERVAL_IN_SECONDS", default=5)
+# how many users' group memberships each process keeps while the permission cache is enabled
+config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_MEMBERSHIPS_MAX_ENTRIES", default=10000)
 
 ### sentry
 config_from_env("SPIFFWORKFLOW_BACKEND_SENTRY_DSN", default="")
@@ -190,6 +231,9 @@ config_from_env("SPIFFWORKFLOW_BACKEND_GIT_USERNAME")
 config_from_env("SPIFFWORKFLOW_BACKEND_GIT_USER_EMAIL")
 config_from_env("SPIFFWORKFLOW_BACKEND_GITHUB_WEBHOOK_SECRET")
 config_from_env("SPIFFWORKFLOW_BACKEND_GIT_SSH_PRIVATE_KEY_PATH")
+# after a git webhook pull only re-parse the process models with files that changed between the revisions and copy the
+# reference cache rows of the rest. everything is re-parsed if git cannot diff the revisions.
+config_from_env("SPIFFWORKFLOW_BACKEND_GIT_WEBHOOK_INCREMENTAL_REFERENCE_CACHE_ENABLED", default=True)
 
 ### webhook
 # configs for handling incoming webhooks from other systems
@@ -222,6 +266,53 @@ config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PAT
 config_from_env("SPIFFWORKFLOW_BACKEND_ALLOW_CONFISCATING_LOCK_AFTER_SECONDS", default="600")
 config_from_env("SPIFFWORKFLOW_BACKEND_MAX_INSTANCE_LOCK_DURATION_IN_SECONDS", default="300")
 
+### caching
+# parsed bpmn specs are cached per worker process and are keyed on the digests of the files used to build them
+config_from_env("SPIFFWORKFLOW_BACKEND_SPEC_CACHE_ENABLED", default=True)
+config_from_env("SPIFFWORKFLOW_BACKEND_SPEC_CACHE_MAX_ENTRIES", default=128)
+config_from_env("SPIFFWORKFLOW_BACKEND_SPEC_CACHE_MAX_AGE_IN_SECONDS", default=3600)
+# the settings from process_model.json files that are needed while instances run are cached alongside the specs
+config_from_env("SPIFFWORKFLOW_BACKEND_SPEC_CACHE_PROCESS_MODEL_SETTINGS_MAX_ENTRIES", default=1024)
+# bpmn process definitions and their task definitions are cached per worker process by bpmn_process_definition_id
+config_from_env("SPIFFWORKFLOW_BACKEND_BPMN_PROCESS_DEFINITION_CACHE_ENABLED", default=True)
+config_from_env("SPIFFWORKFLOW_BACKEND_BPMN_PROCESS_DEFINITION_CACHE_MAX_ENTRIES", default=256)
+# process group and process model directory listings and json files are cached per worker process and read again when
+# their modification times change. set the interval to only check the modification times that often.
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_ENABLED", default=True)
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_REVALIDATE_INTERVAL_IN_SECONDS", default=0)
+# only persist non-completed tasks that changed since they were loaded or last saved instead of all of them after each run
+config_from_env("SPIFFWORKFLOW_BACKEND_TASK_CHANGE_TRACKING_ENABLED", default=True)
+# load all task and bpmn process rows for an instance in one query each before running it instead of one at a time as needed.
+# the properties_json of the tasks is only loaded for the ones that need it.
+config_from_env("SPIFFWORKFLOW_BACKEND_TASK_MODEL_PREFETCH_ENABLED", default=True)
+# how content addressed rows like json_data are hashed. see helpers/content_hash.py before changing this.
+# sha256 (default and what has always been used) or blake2b which uses orjson if it is installed.
+config_from_env("SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM", default="sha256")
+# store task data as a delta against its parent task's data when the parent was saved in the same run.
+# reads have to follow the chain of deltas back to a full record so the max chain length bounds how many rows that takes.
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING_ENABLED", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_LENGTH", default=10)
+# compress json_data rows that are at least the min size when serialized. see helpers/json_data_compression.py.
+# codec can be zlib or zstd, which requires the zstandard package. bin/compact_json_data.py rewrites existing rows.
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_ENABLED", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_CODEC", default="zlib")
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_MIN_SIZE_IN_BYTES", default=4096)
+# limits on the total serialized size of an instance's task data. process models can override them in process_model.json.
+# going over the soft limit logs a warning before each run and going over the hard limit stops the instance from running.
+# the hard limit matches the max_allowed_packet we use for mysql. 0 disables a limit.
+config_from_env("SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_SOFT_LIMIT_IN_BYTES", default=0)
+config_from_env("SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_HARD_LIMIT_IN_BYTES", default=1073741824)
+# process instance report totals are reused for this long unless the request asks for an exact count. 0 always counts.
+# a worker forgets its totals when it creates or deletes a process instance but not when other workers do.
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_REPORT_TOTAL_COUNT_CACHE_MAX_AGE_IN_SECONDS", default=10)
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_REPORT_TOTAL_COUNT_CACHE_MAX_ENTRIES", default=1000)
+# compiled script task scripts and expressions are cached per worker process keyed on their source. 0 disables it.
+config_from_env("SPIFFWORKFLOW_BACKEND_COMPILED_CODE_CACHE_MAX_ENTRIES", default=2048)
+# decrypted secrets used by service tasks are kept in memory per worker process for this long. 0 disables it.
+# changes made through other processes can take this long to be used.
+config_from_env("SPIFFWORKFLOW_BACKEND_SECRET_CACHE_TTL_IN_SECONDS", default=30)
+config_from_env("SPIFFWORKFLOW_BACKEND_SECRET_CACHE_MAX_ENTRIES", default=256)
+
 ### other
 config_from_env(
     "SPIFFWORKFLOW_BACKEND_SYSTEM_NOTIFICATION_PROCESS_MODEL_MESSAGE_ID",
@@ -242,3 +333,8 @@ config_from_env("SPIFFWORKFLOW_BACKEND_USE_WERKZEUG_MIDDLEWARE_PROXY_FIX", defau
 
 # only for DEBUGGING - turn off threaded task execution.
 config_from_env("SPIFFWORKFLOW_BACKEND_USE_THREADS_FOR_TASK_EXECUTION", default=True)
+# the most ready tasks each process runs at once when using threads. the pool is shared by all process instances.
+config_from_env("SPIFFWORKFLOW_BACKEND_ENGINE_STEP_THREAD_POOL_SIZE", default=32)
+# the time spent in each phase of running engine steps (lock, definitions, run, persist, save) is logged at debug,
+# or at info when they add up to at least this many seconds.
+config_from_env("SPIFFWORKFLOW_BACKEND_ENGINE_STEP_SLOW_LOG_THRESHOLD_IN_SECONDS", default=10)
@@ -9,6 +9,7 @@ from spiffworkflow_backend.data_migrations.version_4 import Version4
 from spiffworkflow_backend.data_migrations.version_5 import Version5
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheService
 
 
 # simple decorator to time the func
@@ -67,6 +68,8 @@ class ProcessInstanceMigrator:
     def run_version(cls, data_migration_version_class: DataMigrationBase, process_instance: ProcessInstanceModel) -> None:
         if process_instance.spiff_serializer_version < data_migration_version_class.version():
             data_migration_version_class.run(process_instance)
+            # migrations can rewrite definition rows in place so do not serve stale ones from the cache
+            BpmnProcessDefinitionCacheService.clear()
             process_instance.spiff_serializer_version = data_migration_version_class.version()
             db.session.add(process_instance)
             db.session.commit()
@@ -12,3 +12,25 @@ def benchmark(message: str) -> Generator:
     yield
     t2 = time.perf_counter()
     current_app.logger.debug(f"{message}, Time={t2 - t1}")
+
+
+class PhaseTimings:
+    """Adds up how long each named phase of some larger piece of work took."""
+
+    def __init__(self) -> None:
+        self.durations_in_seconds: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Generator:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations_in_seconds[name] = self.durations_in_seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def total_in_seconds(self) -> float:
+        return sum(self.durations_in_seconds.values())
+
+    def summary(self) -> str:
+        phases = " ".join(f"{name}={duration:.4f}" for name, duration in self.durations_in_seconds.items())
+        return f"{phases} total={self.total_in_seconds():.4f}"
@@ -0,0 +1,118 @@
+"""Canonical serialization and hashing for content addressed rows like json_data and bpmn_process_definition.
+
+The default "sha256" algorithm produces exactly the hashes we have always stored: sha256 of
+json.dumps(value, sort_keys=True). The "blake2b" algorithm uses compact json, encoded with orjson when
+it is installed, and a blake2b digest which is noticeably faster on large task data.
+
+Hashes are only used to find identical content so switching algorithms does not require migrating
+existing rows. Rows that were already written keep their hashes and remain valid. The first time
+something is saved after switching, its hash will not match the stored one so it will be written
+again, and new bpmn_process_definition rows will be created for process models as instances of them
+are started. Hashes from non-default algorithms are prefixed with the algorithm name so the two kinds
+can be told apart if anyone ever wants to backfill.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import TypeVar
+
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+T = TypeVar("T")
+
+CONTENT_HASH_ALGORITHMS = ["sha256", "blake2b"]
+
+# (object id, kind) -> (object, result). the object is kept so its id cannot be reused while memoizing.
+_memo: ContextVar[dict[tuple[int, str], tuple[Any, Any]] | None] = ContextVar("content_hash_memo", default=None)
+
+
+class UnknownContentHashAlgorithmError(Exception):
+    pass
+
+
+def content_hash_algorithm() -> str:
+    algorithm: str = current_app.config["SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM"]
+    if algorithm not in CONTENT_HASH_ALGORITHMS:
+        raise UnknownContentHashAlgorithmError(
+            f"Unknown content hash algorithm '{algorithm}'. Expected one of: {', '.join(CONTENT_HASH_ALGORITHMS)}"
+        )
+    return algorithm
+
+
+def canonical_json(value: Any, algorithm: str | None = None) -> bytes:
+    if (algorithm or content_hash_algorithm()) == "sha256":
+        return json.dumps(value, sort_keys=True).encode("utf8")
+    if orjson is not None:
+        try:
+            encoded: bytes = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+            return encoded
+        except TypeError:
+            # orjson is stricter than the stdlib about things like integers larger than 64 bits
+            pass
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf8")
+
+
+def content_hash(value: Any) -> str:
+    """Returns the hash of the canonical json of the given value.
+
+    Inside of memoized_content_hashes this is only computed once for each object.
+    """
+    return content_hash_and_size(value)[0]
+
+
+def content_hash_and_size(value: Any) -> tuple[str, int]:
+    """Returns the hash and the length in bytes of the canonical json of the given value.
+
+    The size comes for free since the value has to be serialized to hash it anyway.
+    """
+    return memoize_for_object(value, lambda: _compute_content_hash_and_size(value), kind="content_hash")
+
+
+def memoize_for_object(obj: Any, compute: Callable[[], T], *, kind: str) -> T:
+    """Returns compute() or what it returned the last time it was called for the same object and kind.
+
+    The kind names the computation so different computations on the same object do not return each
+    other's results. Results are only remembered inside of memoized_content_hashes so callers must
+    make sure the objects are not modified while it is active.
+    """
+    memo = _memo.get()
+    if memo is None:
+        return compute()
+    key = (id(obj), kind)
+    cached = memo.get(key)
+    if cached is not None and cached[0] is obj:
+        result: T = cached[1]
+        return result
+    result = compute()
+    memo[key] = (obj, result)
+    return result
+
+
+@contextmanager
+def memoized_content_hashes() -> Generator[None, None, None]:
+    if _memo.get() is not None:
+        yield
+        return
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def _compute_content_hash_and_size(value: Any) -> tuple[str, int]:
+    algorithm = content_hash_algorithm()
+    serialized = canonical_json(value, algorithm=algorithm)
+    if algorithm == "sha256":
+        return (hashlib.sha256(serialized).hexdigest(), len(serialized))
+    return (f"{algorithm}:{hashlib.blake2b(serialized, digest_size=32).hexdigest()}", len(serialized))
@@ -0,0 +1,111 @@
+"""Compression for large json_data rows.
+
+Rows at least SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_MIN_SIZE_IN_BYTES big when serialized are stored
+in json_data.compressed_data with the codec that was used in json_data.codec, and json_data.data is left
+null. Rows are only compressed if that actually makes them smaller. Hashes are always of the uncompressed
+data so compressing a row never changes its hash.
+
+zlib is always available. zstd is faster and compresses better but needs the zstandard package.
+"""
+
+import json
+import threading
+import time
+import zlib
+from typing import Any
+
+from flask import current_app
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+JSON_DATA_COMPRESSION_CODECS = ["zlib", "zstd"]
+
+
+class UnknownJsonDataCompressionCodecError(Exception):
+    pass
+
+
+class JsonDataCompression:
+    _lock = threading.Lock()
+    _stats: dict[str, Any] = {
+        "compressed": 0,
+        "skipped": 0,
+        "decompressed": 0,
+        "uncompressed_bytes": 0,
+        "compressed_bytes": 0,
+        "compress_seconds": 0.0,
+        "decompress_seconds": 0.0,
+    }
+
+    @classmethod
+    def codec(cls) -> str | None:
+        """Returns the codec new rows should be compressed with or None if compression is disabled."""
+        if not current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_ENABLED"]:
+            return None
+        codec: str = current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_CODEC"]
+        cls._validate_codec(codec)
+        return codec
+
+    @classmethod
+    def compress(cls, data: dict) -> tuple[str, bytes] | None:
+        """Returns the codec and compressed data or None if the data should be stored uncompressed."""
+        codec = cls.codec()
+        if codec is None:
+            return None
+        start = time.perf_counter()
+        serialized = json.dumps(data, separators=(",", ":")).encode("utf8")
+        if len(serialized) < current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_MIN_SIZE_IN_BYTES"]:
+            return None
+
+        if codec == "zstd":
+            compressed = zstandard.ZstdCompressor().compress(serialized)
+        else:
+            compressed = zlib.compress(serialized)
+        with cls._lock:
+            cls._stats["compress_seconds"] += time.perf_counter() - start
+            if len(compressed) >= len(serialized):
+                cls._stats["skipped"] += 1
+                return None
+            cls._stats["compressed"] += 1
+            cls._stats["uncompressed_bytes"] += len(serialized)
+            cls._stats["compressed_bytes"] += len(compressed)
+        return (codec, compressed)
+
+    @classmethod
+    def decompress(cls, codec: str, compressed_data: bytes) -> dict:
+        cls._validate_codec(codec)
+        start = time.perf_counter()
+        if codec == "zstd":
+            serialized = zstandard.ZstdDecompressor().decompress(compressed_data)
+        else:
+            serialized = zlib.decompress(compressed_data)
+        data: dict = json.loads(serialized)
+        with cls._lock:
+            cls._stats["decompressed"] += 1
+            cls._stats["decompress_seconds"] += time.perf_counter() - start
+        return data
+
+    @classmethod
+    def stats(cls) -> dict[str, Any]:
+        with cls._lock:
+            stats = dict(cls._stats)
+        stats["bytes_saved"] = stats["uncompressed_bytes"] - stats["compressed_bytes"]
+        return stats
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key, value in cls._stats.items():
+                cls._stats[key] = type(value)()
+
+    @classmethod
+    def _validate_codec(cls, codec: str) -> None:
+        if codec not in JSON_DATA_COMPRESSION_CODECS:
+            raise UnknownJsonDataCompressionCodecError(
+                f"Unknown json data compression codec '{codec}'. Expected one of: {', '.join(JSON_DATA_COMPRESSION_CODECS)}"
+            )
+        if codec == "zstd" and zstandard is None:
+            raise UnknownJsonDataCompressionCodecError("The zstd json data compression codec requires the zstandard package")
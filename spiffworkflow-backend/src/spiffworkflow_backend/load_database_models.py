@@ -35,6 +35,9 @@ from spiffworkflow_backend.models.process_caller import (
 from spiffworkflow_backend.models.message_instance import (
     MessageInstanceModel,
 )  # noqa: F401
+from spiffworkflow_backend.models.message_instance_correlation_value import (
+    MessageInstanceCorrelationValueModel,
+)  # noqa: F401
 from spiffworkflow_backend.models.message_triggerable_process_model import (
     MessageTriggerableProcessModel,
 )  # noqa: F401
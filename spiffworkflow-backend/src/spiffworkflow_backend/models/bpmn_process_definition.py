@@ -27,7 +27,7 @@ class BpmnProcessDefinitionModel(SpiffworkflowBaseDBModel):
 
     id: int = db.Column(db.Integer, primary_key=True)
 
-    # this is a sha256 hash of spec and serializer_version
+    # this is a content_hash of spec and serializer_version
     # note that a call activity is its own row in this table, with its own hash,
     # and therefore it only gets stored once per version, and can be reused
     # by multiple calling processes.
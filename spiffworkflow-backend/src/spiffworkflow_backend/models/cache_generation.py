@@ -12,6 +12,8 @@ from spiffworkflow_backend.models.db import db
 class CacheGenerationTable(SpiffEnum):
     reference_cache = "reference_cache"
     feature_flag = "feature_flag"
+    permission = "permission"
+    permission_membership = "permission_membership"
 
 
 class CacheGenerationModel(SpiffworkflowBaseDBModel):
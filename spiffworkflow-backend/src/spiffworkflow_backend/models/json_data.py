@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-import json
-from hashlib import sha256
+import copy
 from typing import TypedDict
 
 from flask import current_app
+from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.orm.attributes import set_committed_value
 
+from spiffworkflow_backend.helpers.content_hash import canonical_json
+from spiffworkflow_backend.helpers.content_hash import content_hash
+from spiffworkflow_backend.helpers.content_hash import content_hash_and_size
+from spiffworkflow_backend.helpers.json_data_compression import JsonDataCompression
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
 
@@ -21,22 +26,12 @@ class JsonDataDict(TypedDict):
     data: dict
 
 
-# delta algorithm <- just to save it for when we want to try to implement it:
-#   a = {"hey": { "hey2": 2, "hey3": 3, "hey6": 7 }, "hey30": 3, "hey40": 4}
-#   b = {"hey": { "hey2": 4, "hey5": 3 }, "hey20": 2, "hey30": 3}
-#   a_keys = set(a.keys())
-#   b_keys = set(b.keys())
-#   removed = a_keys - b_keys
-#   added_keys = b_keys - a_keys
-#   keys_present_in_both = a_keys & b_keys
-#   changed = {}
-#   for key_in_both in keys_present_in_both:
-#       if a[key_in_both] != b[key_in_both]:
-#           changed[key_in_both] = b[key_in_both]
-#   added = {}
-#   for added_key in added_keys:
-#       added[added_key] = b[added_key]
-#   final_tuple = [added, removed, changed]
+# task data can optionally be stored as a delta against the data of another json_data record, normally the
+# data of the task's parent since that is where spiff copies it from. the record's data then looks like:
+#   {DELTA_KEY: {"base": [base hash], "depth": [number of deltas to get to a full record], "changed": {}, "removed": []}}
+# "changed" contains top level keys that were added or whose values differ from the base and "removed" lists
+# top level keys from the base that are not in this data.
+DELTA_KEY = "__spiffworkflow_backend_json_data_delta__"
 
 
 # to find the users of this model run:
@@ -45,33 +40,225 @@ class JsonDataModel(SpiffworkflowBaseDBModel):
     __tablename__ = "json_data"
     # id: int = db.Column(db.Integer, primary_key=True)
 
-    # this is a sha256 hash of spec and serializer_version
+    # this is a content_hash of the data
     hash: str = db.Column(db.String(255), nullable=False, unique=True, primary_key=True)
-    data: dict = db.Column(db.JSON, nullable=False)
+
+    # data is null when the row is compressed. see helpers/json_data_compression.py
+    data: dict | None = db.Column(db.JSON(none_as_null=True), nullable=True)
+    codec: str | None = db.Column(db.String(20), nullable=True)
+    compressed_data: bytes | None = db.Column(db.LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=True)
+
+    # the hash of the record a delta record is based on so garbage collection can tell which records are still needed
+    delta_base_hash: str | None = db.Column(db.String(255), nullable=True, index=True)
 
     @classmethod
     def find_object_by_hash(cls, hash: str) -> JsonDataModel:
+        """Returns the row with its data decompressed so callers can keep reading data like they always have."""
         json_data_model: JsonDataModel | None = JsonDataModel.query.filter_by(hash=hash).first()
         if json_data_model is None:
             raise JsonDataModelNotFoundError(f"Could not find a json data model entry with hash: {hash}")
+        if json_data_model.data is None and json_data_model.codec is not None and json_data_model.compressed_data is not None:
+            # set it as if it had been loaded so the row is not written back uncompressed on the next flush
+            set_committed_value(  # type: ignore
+                json_data_model,
+                "data",
+                JsonDataCompression.decompress(json_data_model.codec, json_data_model.compressed_data),
+            )
         return json_data_model
 
     @classmethod
     def find_data_dict_by_hash(cls, hash: str) -> dict:
-        return cls.find_object_by_hash(hash).data
+        data_dicts = cls.find_data_dicts_by_hashes([hash])
+        if hash not in data_dicts:
+            raise JsonDataModelNotFoundError(f"Could not find a json data model entry with hash: {hash}")
+        return data_dicts[hash]
+
+    @classmethod
+    def find_data_dicts_by_hashes(cls, hashes: set[str] | list[str]) -> dict[str, dict]:
+        """Returns hash to data mappings without loading orm objects.
+
+        Delta records are resolved to the full data. The returned dicts are not shared with anything
+        in the session so callers may mutate them freely.
+        """
+        raw_data_by_hash: dict[str, dict] = {}
+        hashes_to_query = set(hashes)
+        while hashes_to_query:
+            rows = (
+                db.session.query(JsonDataModel.hash, JsonDataModel.data, JsonDataModel.codec, JsonDataModel.compressed_data)  # type: ignore
+                .filter(JsonDataModel.hash.in_(hashes_to_query))  # type: ignore
+                .all()
+            )
+            hashes_to_query = set()
+            for row in rows:
+                raw_data = cls._data_from_row(row.data, row.codec, row.compressed_data)
+                raw_data_by_hash[row.hash] = raw_data
+                if cls.is_delta(raw_data):
+                    base_hash = raw_data[DELTA_KEY]["base"]
+                    if base_hash not in raw_data_by_hash:
+                        hashes_to_query.add(base_hash)
+
+        data_dicts: dict[str, dict] = {}
+        for hash in hashes:
+            if hash in raw_data_by_hash and hash not in data_dicts:
+                data_dicts[hash] = cls._resolve_data(hash, raw_data_by_hash, data_dicts)
+        return {hash: data_dicts[hash] for hash in hashes if hash in data_dicts}
+
+    @classmethod
+    def is_delta(cls, data: dict) -> bool:
+        return len(data) == 1 and DELTA_KEY in data
+
+    @classmethod
+    def delta_json_data_dict(cls, base_hash: str, base_data: dict, data: dict, base_depth: int) -> JsonDataDict | None:
+        """Returns a delta record for the given data or None if it shares nothing with the base."""
+        changed = {key: value for key, value in data.items() if key not in base_data or base_data[key] != value}
+        if len(changed) == len(data):
+            return None
+        removed = sorted(key for key in base_data if key not in data)
+        delta_data = {DELTA_KEY: {"base": base_hash, "depth": base_depth + 1, "changed": changed, "removed": removed}}
+        return {"hash": content_hash(delta_data), "data": delta_data}
+
+    @classmethod
+    def resolved_data_size(cls, base_data: dict, base_size: int, delta_data: dict) -> int:
+        """Returns the size of the canonical json of the data a delta resolves to.
+
+        Only the top level entries that the delta changes or removes are serialized, so the size of the
+        whole data is found without serializing all of it.
+        """
+        delta = delta_data[DELTA_KEY]
+        item_separator_size = len(canonical_json({"a": 0, "b": 0})) - 2 * len(canonical_json({"a": 0})) + 2
+
+        def entry_size(key: str, value: object) -> int:
+            return len(canonical_json({key: value})) - 2
+
+        # the size of the entries plus a separator after each one, ignoring the surrounding braces
+        entries_size = base_size - 2 + item_separator_size if base_data else 0
+        entry_count = len(base_data)
+        for key in delta["removed"]:
+            entries_size -= entry_size(key, base_data[key]) + item_separator_size
+            entry_count -= 1
+        for key, value in delta["changed"].items():
+            if key in base_data:
+                entries_size += entry_size(key, value) - entry_size(key, base_data[key])
+            else:
+                entries_size += entry_size(key, value) + item_separator_size
+                entry_count += 1
+        return 2 + entries_size - item_separator_size if entry_count > 0 else 2
+
+    @classmethod
+    def _resolve_data(cls, hash: str, raw_data_by_hash: dict[str, dict], data_dicts: dict[str, dict]) -> dict:
+        raw_data = raw_data_by_hash[hash]
+        if not cls.is_delta(raw_data):
+            return raw_data
+        delta = raw_data[DELTA_KEY]
+        base_hash = delta["base"]
+        if base_hash not in raw_data_by_hash:
+            raise JsonDataModelNotFoundError(f"Could not find base json data entry '{base_hash}' for delta entry '{hash}'")
+        if base_hash not in data_dicts:
+            data_dicts[base_hash] = cls._resolve_data(base_hash, raw_data_by_hash, data_dicts)
+        # the base may be returned to the caller as well so do not share anything with it
+        resolved_data: dict = copy.deepcopy(data_dicts[base_hash])
+        for key in delta["removed"]:
+            resolved_data.pop(key, None)
+        resolved_data.update(delta["changed"])
+        return resolved_data
+
+    @classmethod
+    def _data_from_row(cls, data: dict | None, codec: str | None, compressed_data: bytes | None) -> dict:
+        if codec is not None and compressed_data is not None:
+            return JsonDataCompression.decompress(codec, compressed_data)
+        return data or {}
+
+    @classmethod
+    def row_dict_from_json_data_dict(cls, json_data_dict: JsonDataDict) -> dict:
+        """Returns the column values to store for the given json data, compressing it if it is configured and worth it.
+
+        Delta records are small and are never compressed.
+        """
+        data = json_data_dict["data"]
+        if cls.is_delta(data):
+            return {
+                "hash": json_data_dict["hash"],
+                "data": data,
+                "codec": None,
+                "compressed_data": None,
+                "delta_base_hash": data[DELTA_KEY]["base"],
+            }
+        compressed = JsonDataCompression.compress(data)
+        if compressed is None:
+            return {"hash": json_data_dict["hash"], "data": data, "codec": None, "compressed_data": None, "delta_base_hash": None}
+        codec, compressed_data = compressed
+        return {
+            "hash": json_data_dict["hash"],
+            "data": None,
+            "codec": codec,
+            "compressed_data": compressed_data,
+            "delta_base_hash": None,
+        }
 
     @classmethod
     def insert_or_update_json_data_records(cls, json_data_hash_to_json_data_dict_mapping: dict[str, JsonDataDict]) -> None:
-        list_of_dicts = [*json_data_hash_to_json_data_dict_mapping.values()]
+        list_of_dicts = [cls.row_dict_from_json_data_dict(d) for d in json_data_hash_to_json_data_dict_mapping.values()]
         if len(list_of_dicts) > 0:
             on_duplicate_key_stmt = None
             if current_app.config["SPIFFWORKFLOW_BACKEND_DATABASE_TYPE"] == "mysql":
                 insert_stmt = mysql_insert(JsonDataModel).values(list_of_dicts)
-                on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(data=insert_stmt.inserted.data)
+                on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+                    data=insert_stmt.inserted.data,
+                    codec=insert_stmt.inserted.codec,
+                    compressed_data=insert_stmt.inserted.compressed_data,
+                )
             else:
                 insert_stmt = postgres_insert(JsonDataModel).values(list_of_dicts)
                 on_duplicate_key_stmt = insert_stmt.on_conflict_do_nothing(index_elements=["hash"])
             db.session.execute(on_duplicate_key_stmt)
+            if current_app.config["SPIFFWORKFLOW_BACKEND_DATABASE_TYPE"] == "postgres":
+                cls._lock_rows_for_reuse(list_of_dicts)
+
+    @classmethod
+    def _lock_rows_for_reuse(cls, list_of_dicts: list[dict]) -> None:
+        """Keeps garbage collection from deleting existing rows we are about to reference until we commit.
+
+        Unlike on duplicate key update in mysql, on conflict do nothing does not lock the existing row. A key share
+        lock does not block other saves but makes garbage collection skip the row. If garbage collection got to a
+        row first and deleted it while we waited for the lock then the row is inserted again.
+        """
+        row_dicts_by_hash = {d["hash"]: d for d in list_of_dicts}
+        while len(row_dicts_by_hash) > 0:
+            locked_hashes = {
+                row.hash
+                for row in db.session.query(JsonDataModel.hash)  # type: ignore
+                .filter(JsonDataModel.hash.in_(row_dicts_by_hash.keys()))  # type: ignore
+                .with_for_update(read=True, key_share=True)
+                .all()
+            }
+            row_dicts_by_hash = {hash: d for hash, d in row_dicts_by_hash.items() if hash not in locked_hashes}
+            if len(row_dicts_by_hash) > 0:
+                insert_stmt = postgres_insert(JsonDataModel).values(list(row_dicts_by_hash.values()))
+                db.session.execute(insert_stmt.on_conflict_do_nothing(index_elements=["hash"]))
+
+    @classmethod
+    def compact_json_data_records(cls, after_hash: str | None = None, batch_size: int = 500) -> tuple[str | None, int]:
+        """Rewrites a batch of rows so they are compressed or not based on the current config.
+
+        Returns the last hash that was looked at, or None if there were no rows left, and how many rows were rewritten.
+        Pass the returned hash back in to continue with the next batch.
+        """
+        query = db.session.query(JsonDataModel.hash, JsonDataModel.data, JsonDataModel.codec, JsonDataModel.compressed_data)  # type: ignore
+        if after_hash is not None:
+            query = query.filter(JsonDataModel.hash > after_hash)
+        rows = query.order_by(JsonDataModel.hash).limit(batch_size).all()
+        if len(rows) == 0:
+            return (None, 0)
+
+        row_dicts_to_update = []
+        for row in rows:
+            data = cls._data_from_row(row.data, row.codec, row.compressed_data)
+            row_dict = cls.row_dict_from_json_data_dict({"hash": row.hash, "data": data})
+            if row_dict["codec"] != row.codec:
+                row_dicts_to_update.append(row_dict)
+        if len(row_dicts_to_update) > 0:
+            db.session.bulk_update_mappings(JsonDataModel, row_dicts_to_update)  # type: ignore
+        return (rows[-1].hash, len(row_dicts_to_update))
 
     @classmethod
     def insert_or_update_json_data_dict(cls, json_data_dict: JsonDataDict) -> None:
@@ -85,7 +272,11 @@ class JsonDataModel(SpiffworkflowBaseDBModel):
 
     @classmethod
     def json_data_dict_from_dict(cls, data: dict) -> JsonDataDict:
-        task_data_json = json.dumps(data, sort_keys=True)
-        task_data_hash: str = sha256(task_data_json.encode("utf8")).hexdigest()
-        json_data_dict: JsonDataDict = {"hash": task_data_hash, "data": data}
-        return json_data_dict
+        return cls.json_data_dict_and_size_from_dict(data)[0]
+
+    @classmethod
+    def json_data_dict_and_size_from_dict(cls, data: dict) -> tuple[JsonDataDict, int]:
+        """Also returns the size in bytes of the serialized data."""
+        hash, size = content_hash_and_size(data)
+        json_data_dict: JsonDataDict = {"hash": hash, "data": data}
+        return (json_data_dict, size)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import relationship
+
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+
+# retrieval_expressions_hash for rows that match sends with exactly the same correlation_keys as the receive
+CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH = "correlation_keys"
+
+
+@dataclass
+class MessageInstanceCorrelationValueModel(SpiffworkflowBaseDBModel):
+    """The values a send message must produce to correlate with a receive message.
+
+    These only exist for receive messages and are written when the receive message is created so sends
+    can be matched with an indexed lookup instead of comparing them against every receive message.
+    There is one row for each correlation key of the receive message. retrieval_expressions maps the
+    correlation property names of that key to the expressions to evaluate against a send's payload and
+    expected_values_hash is the hash of the values they must evaluate to. There is also one row whose
+    retrieval_expressions_hash is CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH and whose expected_values_hash
+    is the hash of the correlation_keys of the receive message.
+    """
+
+    __tablename__ = "message_instance_correlation_value"
+    __table_args__ = (
+        db.Index(
+            "message_instance_correlation_value_lookup",
+            "message_name",
+            "retrieval_expressions_hash",
+            "expected_values_hash",
+        ),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    message_instance_id: int = db.Column(ForeignKey(MessageInstanceModel.id), nullable=False, index=True)  # type: ignore
+    message_name: str = db.Column(db.String(255), nullable=False)
+    correlation_key_name: str | None = db.Column(db.String(255), nullable=True)
+    # canonical json so it can be selected distinct on every database
+    retrieval_expressions: str | None = db.Column(db.Text, nullable=True)
+    retrieval_expressions_hash: str = db.Column(db.String(255), nullable=False)
+    expected_values_hash: str = db.Column(db.String(255), nullable=False)
+
+    message_instance = relationship("MessageInstanceModel", back_populates="correlation_values")
@@ -102,6 +102,12 @@ class ProcessInstanceModel(SpiffworkflowBaseDBModel):
     bpmn_version_control_identifier: str | None = db.Column(db.String(255))
     last_milestone_bpmn_name: str | None = db.Column(db.String(255))
 
+    # sizes in bytes of the serialized task data of all of the instance's tasks and of the python environment
+    # as of the last save. they are kept up to date by the TaskService as tasks are saved. task_data_size is
+    # null for instances that were started before it was tracked.
+    task_data_size: int | None = db.Column(db.BigInteger, default=0)
+    python_env_size: int | None = db.Column(db.BigInteger)
+
     bpmn_xml_file_contents: str | None = None
     bpmn_xml_file_contents_retrieval_error: str | None = None
     process_model_with_diagram_identifier: str | None = None
@@ -151,6 +157,8 @@ class ProcessInstanceModel(SpiffworkflowBaseDBModel):
             "process_model_identifier": self.process_model_identifier,
             "start_in_seconds": self.start_in_seconds,
             "status": self.status,
+            "task_data_size": self.task_data_size,
+            "python_env_size": self.python_env_size,
             "task_updated_at_in_seconds": self.task_updated_at_in_seconds,
             "updated_at_in_seconds": self.updated_at_in_seconds,
         }
@@ -1,6 +1,10 @@
+import time
 from dataclasses import dataclass
 
+from flask import current_app
 from sqlalchemy import ForeignKey
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
 
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
@@ -19,3 +23,33 @@ class ProcessInstanceMetadataModel(SpiffworkflowBaseDBModel):
 
     updated_at_in_seconds: int = db.Column(db.Integer, nullable=False)
     created_at_in_seconds: int = db.Column(db.Integer, nullable=False)
+
+    @classmethod
+    def insert_or_update_metadata(cls, process_instance_id: int, metadata: dict[str, str]) -> None:
+        """Upserts all of the given key/value pairs for the process instance in one statement."""
+        if len(metadata) == 0:
+            return
+        current_time = round(time.time())
+        metadata_rows = [
+            {
+                "process_instance_id": process_instance_id,
+                "key": key,
+                "value": value,
+                "updated_at_in_seconds": current_time,
+                "created_at_in_seconds": current_time,
+            }
+            for key, value in metadata.items()
+        ]
+        on_duplicate_key_stmt = None
+        if current_app.config["SPIFFWORKFLOW_BACKEND_DATABASE_TYPE"] == "mysql":
+            insert_stmt = mysql_insert(ProcessInstanceMetadataModel).values(metadata_rows)
+            on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+                value=insert_stmt.inserted.value, updated_at_in_seconds=insert_stmt.inserted.updated_at_in_seconds
+            )
+        else:
+            insert_stmt = postgres_insert(ProcessInstanceMetadataModel).values(metadata_rows)
+            on_duplicate_key_stmt = insert_stmt.on_conflict_do_update(
+                index_elements=["process_instance_id", "key"],
+                set_={"value": insert_stmt.excluded.value, "updated_at_in_seconds": insert_stmt.excluded.updated_at_in_seconds},
+            )
+        db.session.execute(on_duplicate_key_stmt)
@@ -22,6 +22,8 @@ PROCESS_MODEL_SUPPORTED_KEYS_FOR_DISK_SERIALIZATION = [
     "fault_or_suspend_on_exception",
     "exception_notification_addresses",
     "metadata_extraction_paths",
+    "task_data_size_soft_limit_in_bytes",
+    "task_data_size_hard_limit_in_bytes",
 ]
 
 
@@ -44,6 +46,10 @@ class ProcessModelInfo:
     exception_notification_addresses: list[str] = field(default_factory=list)
     metadata_extraction_paths: list[dict[str, str]] | None = None
 
+    # override SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_SOFT_LIMIT_IN_BYTES and _HARD_LIMIT_IN_BYTES for this model
+    task_data_size_soft_limit_in_bytes: int | None = None
+    task_data_size_hard_limit_in_bytes: int | None = None
+
     process_group: Any | None = None
     files: list[File] | None = field(default_factory=list[File])
 
@@ -113,6 +119,8 @@ class ProcessModelInfoSchema(Schema):
             required=False,
         )
     )
+    task_data_size_soft_limit_in_bytes = marshmallow.fields.Integer(allow_none=True)
+    task_data_size_hard_limit_in_bytes = marshmallow.fields.Integer(allow_none=True)
 
     @post_load
     def make_spec(self, data: dict[str, str | bool | int | NotificationType], **_: Any) -> ProcessModelInfo:
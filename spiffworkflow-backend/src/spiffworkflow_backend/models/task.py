@@ -64,6 +64,8 @@ class TaskModel(SpiffworkflowBaseDBModel):
 
     json_data_hash: str = db.Column(db.String(255), nullable=False, index=True)
     python_env_data_hash: str = db.Column(db.String(255), nullable=False, index=True)
+    # size in bytes of the serialized task data. see ProcessInstanceModel.task_data_size
+    json_data_size: int | None = db.Column(db.BigInteger)
 
     runtime_info: dict | None = db.Column(db.JSON)
     start_in_seconds: float | None = db.Column(db.DECIMAL(17, 6))
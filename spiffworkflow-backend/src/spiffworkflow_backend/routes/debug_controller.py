@@ -8,8 +8,12 @@ from flask import request
 from flask.wrappers import Response
 
 from spiffworkflow_backend.exceptions.api_error import ApiError
+from spiffworkflow_backend.helpers.json_data_compression import JsonDataCompression
 from spiffworkflow_backend.services.authentication_service import AuthenticationService
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheService
 from spiffworkflow_backend.services.monitoring_service import get_version_info_data
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 
 
 def test_raise_error() -> Response:
@@ -35,6 +39,18 @@ def url_info() -> Response:
     )
 
 
+def cache_stats() -> Response:
+    return make_response(
+        {
+            "spec_cache": SpecCacheService.stats(),
+            "bpmn_process_definition_cache": BpmnProcessDefinitionCacheService.stats(),
+            "json_data_compression": JsonDataCompression.stats(),
+            "process_model_index": ProcessModelIndexService.stats(),
+        },
+        200,
+    )
+
+
 def celery_backend_results(
     process_instance_id: int,
     include_all_failures: bool = True,
@@ -5,6 +5,7 @@ from spiffworkflow_backend.helpers.spiff_enum import ProcessInstanceExecutionMod
 
 import json
 from typing import Any
+from typing import cast
 
 import flask.wrappers
 from flask import current_app
@@ -34,6 +35,7 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModelSc
 from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
 from spiffworkflow_backend.models.process_instance_report import ProcessInstanceReportModel
 from spiffworkflow_backend.models.process_instance_report import Report
+from spiffworkflow_backend.models.process_instance_report import ReportMetadata
 from spiffworkflow_backend.models.process_model import ProcessModelInfo
 from spiffworkflow_backend.models.reference_cache import ReferenceCacheModel
 from spiffworkflow_backend.models.reference_cache import ReferenceNotFoundError
@@ -157,6 +159,8 @@ def process_instance_list_for_me(
     process_model_identifier: str | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count_mode: str = "cached",
 ) -> flask.wrappers.Response:
     ProcessInstanceReportService.add_or_update_filter(
         body["report_metadata"]["filter_by"], {"field_name": "with_relation_to_me", "field_value": True}
@@ -165,6 +169,8 @@ def process_instance_list_for_me(
         process_model_identifier=process_model_identifier,
         page=page,
         per_page=per_page,
+        cursor=cursor,
+        total_count_mode=total_count_mode,
         body=body,
     )
 
@@ -174,11 +180,15 @@ def process_instance_list(
     process_model_identifier: str | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count_mode: str = "cached",
 ) -> flask.wrappers.Response:
     response_json = ProcessInstanceReportService.run_process_instance_report(
         report_metadata=body["report_metadata"],
         page=page,
         per_page=per_page,
+        cursor=cursor,
+        total_count_mode=total_count_mode,
         user=g.user,
     )
 
@@ -202,8 +212,8 @@ def process_instance_report_show(
         )
     response_result: Report | ProcessInstanceReportModel | None = None
     if report_hash is not None:
-        json_data = JsonDataModel.query.filter_by(hash=report_hash).first()
-        if json_data is None:
+        report_metadata = JsonDataModel.find_data_dicts_by_hashes([report_hash]).get(report_hash)
+        if report_metadata is None:
             raise ApiError(
                 error_code="report_metadata_not_found",
                 message=f"Could not find report metadata for {report_hash}.",
@@ -212,7 +222,7 @@ def process_instance_report_show(
             "id": 0,
             "identifier": "custom",
             "name": "custom",
-            "report_metadata": json_data.data,
+            "report_metadata": cast(ReportMetadata, report_metadata),
         }
     else:
         response_result = ProcessInstanceReportService.report_with_identifier(g.user, report_id, report_identifier)
@@ -56,6 +56,8 @@ def process_model_create(
         "metadata_extraction_paths",
         "fault_or_suspend_on_exception",
         "exception_notification_addresses",
+        "task_data_size_soft_limit_in_bytes",
+        "task_data_size_hard_limit_in_bytes",
     ]
     body_filtered = {include_item: body[include_item] for include_item in body_include_list if include_item in body}
 
@@ -143,6 +145,8 @@ def process_model_update(
         "metadata_extraction_paths",
         "fault_or_suspend_on_exception",
         "exception_notification_addresses",
+        "task_data_size_soft_limit_in_bytes",
+        "task_data_size_hard_limit_in_bytes",
     ]
     body_filtered = {include_item: body[include_item] for include_item in body_include_list if include_item in body}
 
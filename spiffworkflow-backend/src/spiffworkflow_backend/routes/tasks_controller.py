@@ -37,6 +37,7 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModelSc
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
 from spiffworkflow_backend.models.process_instance import ProcessInstanceTaskDataCannotBeUpdatedError
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventType
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
 from spiffworkflow_backend.models.task import Task
 from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
@@ -57,6 +58,8 @@ from spiffworkflow_backend.services.authorization_service import AuthorizationSe
 from spiffworkflow_backend.services.error_handling_service import ErrorHandlingService
 from spiffworkflow_backend.services.jinja_service import JinjaService
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+from spiffworkflow_backend.services.process_instance_progress_service import ProcessInstanceProgressService
+from spiffworkflow_backend.services.process_instance_progress_service import ProcessInstanceProgressSubscription
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
@@ -490,10 +493,41 @@ def _render_instructions(spiff_task: SpiffTask, task_data: dict | None = None) -
     return JinjaService.render_instructions_for_end_user(spiff_task, task_data=task_data)
 
 
+def _process_instance_progress_state(process_instance_id: int) -> tuple | None:
+    """Returns the columns that change when a process instance makes progress. Much cheaper than loading a processor."""
+    row = (
+        db.session.query(  # type: ignore
+            ProcessInstanceModel.status,
+            ProcessInstanceModel.task_updated_at_in_seconds,
+            ProcessInstanceQueueModel.locked_by,
+        )
+        .outerjoin(ProcessInstanceQueueModel, ProcessInstanceQueueModel.process_instance_id == ProcessInstanceModel.id)
+        .filter(ProcessInstanceModel.id == process_instance_id)
+        .first()
+    )
+    return None if row is None else tuple(row)
+
+
+def _wait_for_process_instance_progress(
+    process_instance_id: int,
+    progress_subscription: ProcessInstanceProgressSubscription,
+    last_progress_state: tuple | None,
+) -> Generator[str, str | None, None]:
+    heartbeat_in_seconds = current_app.config["SPIFFWORKFLOW_BACKEND_INTERSTITIAL_HEARTBEAT_IN_SECONDS"]
+    while not progress_subscription.wait(heartbeat_in_seconds):
+        # the progress backend may not see workers in other processes so check the db as well
+        db.session.rollback()
+        if _process_instance_progress_state(process_instance_id) != last_progress_state:
+            return
+        # an sse comment. it keeps proxies from closing the connection and lets us notice when the client went away.
+        yield ": heartbeat\n\n"
+
+
 def _interstitial_stream(
     process_instance: ProcessInstanceModel,
     execute_tasks: bool = True,
     is_locked: bool = False,
+    progress_subscription: ProcessInstanceProgressSubscription | None = None,
 ) -> Generator[str, str | None, None]:
     def get_reportable_tasks(processor: ProcessInstanceProcessor) -> Any:
         return processor.bpmn_process_instance.get_tasks(
@@ -505,6 +539,9 @@ def _interstitial_stream(
         yield _render_data("unrunnable_instance", process_instance)
         return
 
+    progress_state = None
+    if progress_subscription is not None:
+        progress_state = _process_instance_progress_state(process_instance.id)
     processor = ProcessInstanceProcessor(process_instance)
     reported_ids = []  # A list of all the ids reported by this endpoint so far.
     tasks = get_reportable_tasks(processor)
@@ -567,6 +604,10 @@ def _interstitial_stream(
             if not is_locked:
                 break
 
+            if progress_subscription is not None:
+                # only rebuild the processor once whatever holds the lock has done something
+                yield from _wait_for_process_instance_progress(process_instance.id, progress_subscription, progress_state)
+
             # HACK: db.session.refresh doesn't seem to refresh without rollback or commit so use rollback.
             # we are not executing tasks so there shouldn't be anything to write anyway, so no harm in rollback.
             # https://stackoverflow.com/a/20361132/6090676
@@ -574,6 +615,8 @@ def _interstitial_stream(
             # and it is definitely committing its changes, but since we have already queried the data,
             # our session has stale results without the rollback.
             db.session.rollback()
+            if progress_subscription is not None:
+                progress_state = _process_instance_progress_state(process_instance.id)
             db.session.refresh(process_instance)
             processor = ProcessInstanceProcessor(process_instance)
 
@@ -590,13 +633,9 @@ def _interstitial_stream(
     if spiff_task is not None and spiff_task.id not in reported_ids:
         task_data = spiff_task.data
         if task_data is None or task_data == {}:
-            json_data = (
-                JsonDataModel.query.join(TaskModel, TaskModel.json_data_hash == JsonDataModel.hash)
-                .filter(TaskModel.guid == str(spiff_task.id))
-                .first()
-            )
-            if json_data is not None:
-                task_data = json_data.data
+            task_model = TaskModel.query.filter_by(guid=str(spiff_task.id)).first()
+            if task_model is not None:
+                task_data = JsonDataModel.find_data_dicts_by_hashes([task_model.json_data_hash]).get(task_model.json_data_hash)
         task = ProcessInstanceService.spiff_task_to_api_task(processor, spiff_task)
         try:
             instructions = _render_instructions(spiff_task, task_data=task_data)
@@ -631,7 +670,14 @@ def _dequeued_interstitial_stream(
                         ProcessInstanceMigrator.run(process_instance)
                         yield from _interstitial_stream(process_instance, execute_tasks=execute_tasks)
             except ProcessInstanceIsAlreadyLockedError:
-                yield from _interstitial_stream(process_instance, execute_tasks=False, is_locked=True)
+                # subscribe before reading anything so we do not miss progress made while the processor loads
+                progress_subscription = ProcessInstanceProgressService.subscribe(process_instance.id)
+                try:
+                    yield from _interstitial_stream(
+                        process_instance, execute_tasks=False, is_locked=True, progress_subscription=progress_subscription
+                    )
+                finally:
+                    progress_subscription.close()
         else:
             # attempt to run the migrator even for a readonly operation if the process instance is not newest
             if (
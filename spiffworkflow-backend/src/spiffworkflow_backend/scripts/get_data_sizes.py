@@ -1,5 +1,6 @@
 from typing import Any
 
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.script_attributes_context import ScriptAttributesContext
 from spiffworkflow_backend.scripts.script import Script
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
@@ -17,7 +18,7 @@ class GetDataSizes(Script):
 
     def get_description(self) -> str:
         return """Returns a dictionary of information about the size of task data and
-            the python environment for the currently running process."""
+            the python environment for the currently running process as of the last time it was saved."""
 
     def run(self, script_attributes_context: ScriptAttributesContext, *_args: Any, **kwargs: Any) -> Any:
         if script_attributes_context.task is None:
@@ -26,11 +27,21 @@ class GetDataSizes(Script):
                 "This script needs to be run from within the context of a task."
             )
         workflow = script_attributes_context.task.workflow
-        task_data_size = ProcessInstanceProcessor.get_task_data_size(workflow)
+        process_instance = None
+        if script_attributes_context.process_instance_id is not None:
+            process_instance = ProcessInstanceModel.query.filter_by(id=script_attributes_context.process_instance_id).first()
+
+        # sizes are tracked as tasks are saved. instances from before that have to serialize everything.
+        if process_instance is not None and process_instance.task_data_size is not None:
+            task_data_size = process_instance.task_data_size
+            python_env_size = process_instance.python_env_size or 0
+        else:
+            task_data_size = ProcessInstanceProcessor.get_task_data_size(workflow)
+            python_env_size = ProcessInstanceProcessor.get_python_env_size(workflow)
+
         task_data_keys_by_task = {
             t.task_spec.name: sorted(t.data.keys()) for t in ProcessInstanceProcessor.get_tasks_with_data(workflow)
         }
-        python_env_size = ProcessInstanceProcessor.get_python_env_size(workflow)
         python_env_keys = workflow.script_engine.environment.user_defined_state().keys()
         return {
             "python_env_size": python_env_size,
@@ -5,6 +5,9 @@ import os
 import pkgutil
 from abc import abstractmethod
 from collections.abc import Callable
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
 from spiffworkflow_backend.exceptions.api_error import ApiError
@@ -17,6 +20,12 @@ from spiffworkflow_backend.services.authorization_service import AuthorizationSe
 # This is here, because after loading the application this will never change under
 # any known condition, and it is expensive to calculate it everytime.
 SCRIPT_SUB_CLASSES = None
+SCRIPT_FUNCTIONS: dict[str, Callable] | None = None
+
+# a ContextVar rather than a global so every thread and every nested script engine call sees its own context
+CURRENT_SCRIPT_ATTRIBUTES_CONTEXT: ContextVar[ScriptAttributesContext | None] = ContextVar(
+    "current_script_attributes_context", default=None
+)
 
 
 class ScriptUnauthorizedForUserError(Exception):
@@ -35,6 +44,10 @@ class InvalidArgsGivenToScriptError(Exception):
     pass
 
 
+class ScriptAttributesContextMissingError(Exception):
+    pass
+
+
 class Script:
     """Provides an abstract class that defines how scripts should work, this must be extended in all Script Tasks."""
 
@@ -92,6 +105,8 @@ class Script:
 
         We may be able to remove the task for each of these calls if we are not using it other than potentially
         updating the task data.
+
+        Script engines that run often should use script_functions instead which does not build anything per call.
         """
 
         def make_closure(
@@ -109,28 +124,8 @@ class Script:
             """
             instance = subclass()
 
-            def check_script_permission() -> None:
-                if subclass.requires_privileged_permissions():
-                    script_function_name = get_script_function_name(subclass)
-                    uri = f"/can-run-privileged-script/{script_function_name}"
-                    process_instance = ProcessInstanceModel.query.filter_by(
-                        id=script_attributes_context.process_instance_id
-                    ).first()
-                    if process_instance is None:
-                        raise ProcessInstanceNotFoundError(
-                            "Could not find a process instance with id"
-                            f" '{script_attributes_context.process_instance_id}' when"
-                            f" running script '{script_function_name}'"
-                        )
-                    user = process_instance.process_initiator
-                    has_permission = AuthorizationService.user_has_permission(user=user, permission="create", target_uri=uri)
-                    if not has_permission:
-                        raise ScriptUnauthorizedForUserError(
-                            f"User {user.username} does not have access to run privileged script '{script_function_name}'"
-                        )
-
             def run_script_if_allowed(*ar: Any, **kw: Any) -> Any:
-                check_script_permission()
+                Script.check_script_permission(subclass, script_attributes_context)
                 return subclass.run(
                     instance,
                     script_attributes_context,
@@ -140,18 +135,78 @@ class Script:
 
             return run_script_if_allowed
 
-        def get_script_function_name(subclass: type[Script]) -> str:
-            return subclass.__module__.split(".")[-1]
-
         execlist = {}
         subclasses = Script.get_all_subclasses()
         for x in range(len(subclasses)):
             subclass = subclasses[x]
-            execlist[get_script_function_name(subclass)] = make_closure(
+            execlist[Script.get_script_function_name(subclass)] = make_closure(
                 subclass, script_attributes_context=script_attributes_context
             )
         return execlist
 
+    @classmethod
+    def script_functions(cls) -> dict[str, Callable]:
+        """Returns the same functions as generate_augmented_list but they are only built once.
+
+        Instead of being closed over a ScriptAttributesContext they use the one given to the innermost
+        with_script_attributes_context that is running in the current thread. Do not modify the returned dict.
+        """
+        global SCRIPT_FUNCTIONS  # noqa: PLW0603, allow global for performance
+        if SCRIPT_FUNCTIONS is None:
+            SCRIPT_FUNCTIONS = {
+                Script.get_script_function_name(subclass): Script._make_script_function(subclass)
+                for subclass in Script.get_all_subclasses()
+            }
+        return SCRIPT_FUNCTIONS
+
+    @staticmethod
+    @contextmanager
+    def with_script_attributes_context(script_attributes_context: ScriptAttributesContext) -> Generator[None, None, None]:
+        token = CURRENT_SCRIPT_ATTRIBUTES_CONTEXT.set(script_attributes_context)
+        try:
+            yield
+        finally:
+            CURRENT_SCRIPT_ATTRIBUTES_CONTEXT.reset(token)
+
+    @staticmethod
+    def _make_script_function(subclass: type[Script]) -> Callable:
+        instance = subclass()
+
+        def run_script_if_allowed(*ar: Any, **kw: Any) -> Any:
+            script_attributes_context = CURRENT_SCRIPT_ATTRIBUTES_CONTEXT.get()
+            if script_attributes_context is None:
+                raise ScriptAttributesContextMissingError(
+                    f"Script '{Script.get_script_function_name(subclass)}' can only be called while a script or"
+                    " expression is being run by the script engine."
+                )
+            Script.check_script_permission(subclass, script_attributes_context)
+            return subclass.run(instance, script_attributes_context, *ar, **kw)
+
+        return run_script_if_allowed
+
+    @staticmethod
+    def check_script_permission(subclass: type[Script], script_attributes_context: ScriptAttributesContext) -> None:
+        if subclass.requires_privileged_permissions():
+            script_function_name = Script.get_script_function_name(subclass)
+            uri = f"/can-run-privileged-script/{script_function_name}"
+            process_instance = ProcessInstanceModel.query.filter_by(id=script_attributes_context.process_instance_id).first()
+            if process_instance is None:
+                raise ProcessInstanceNotFoundError(
+                    "Could not find a process instance with id"
+                    f" '{script_attributes_context.process_instance_id}' when"
+                    f" running script '{script_function_name}'"
+                )
+            user = process_instance.process_initiator
+            has_permission = AuthorizationService.user_has_permission(user=user, permission="create", target_uri=uri)
+            if not has_permission:
+                raise ScriptUnauthorizedForUserError(
+                    f"User {user.username} does not have access to run privileged script '{script_function_name}'"
+                )
+
+    @staticmethod
+    def get_script_function_name(subclass: type[Script]) -> str:
+        return subclass.__module__.split(".")[-1]
+
     @classmethod
     def get_all_subclasses(cls) -> list[type[Script]]:
         # This is expensive to generate, never changes after we load up.
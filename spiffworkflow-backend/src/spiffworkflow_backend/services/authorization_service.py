@@ -39,6 +39,7 @@ from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
 from spiffworkflow_backend.models.user_group_assignment_waiting import UserGroupAssignmentWaitingModel
 from spiffworkflow_backend.routes.openid_blueprint import openid_blueprint
+from spiffworkflow_backend.services.permission_cache_service import PermissionCacheService
 from spiffworkflow_backend.services.user_service import UserService
 
 
@@ -116,6 +117,8 @@ class AuthorizationService:
     def has_permission(cls, principals: list[PrincipalModel], permission: str, target_uri: str) -> bool:
         principal_ids = [p.id for p in principals]
         target_uri_normalized = target_uri.removeprefix(V1_API_PATH_PREFIX)
+        if PermissionCacheService.enabled():
+            return PermissionCacheService.has_permission(set(principal_ids), permission, target_uri_normalized)
 
         permission_assignments = (
             PermissionAssignmentModel.query.filter(PermissionAssignmentModel.principal_id.in_(principal_ids))
@@ -149,6 +152,12 @@ class AuthorizationService:
 
     @classmethod
     def user_has_permission(cls, user: UserModel, permission: str, target_uri: str) -> bool:
+        if PermissionCacheService.enabled():
+            principal_ids = PermissionCacheService.principal_ids_for_user(user)
+            if principal_ids is not None:
+                return PermissionCacheService.has_permission(
+                    principal_ids, permission, target_uri.removeprefix(V1_API_PATH_PREFIX)
+                )
         principals = UserService.all_principals_for_user(user)
         return cls.has_permission(principals, permission, target_uri)
 
@@ -252,6 +261,7 @@ class AuthorizationService:
     def import_permissions_from_yaml_file(cls, user_model: UserModel | None = None) -> AddedPermissionDict:
         group_permissions = cls.parse_permissions_yaml_into_group_info()
         result = cls.add_permissions_from_group_permissions(group_permissions, user_model)
+        PermissionCacheService.invalidate()
         return result
 
     @classmethod
@@ -970,3 +980,5 @@ class AuthorizationService:
             initial_waiting_group_assignments,
             group_permissions_only=group_permissions_only,
         )
+        # commits that change permissions already do this but make sure nothing sees permissions from before the refresh
+        PermissionCacheService.invalidate()
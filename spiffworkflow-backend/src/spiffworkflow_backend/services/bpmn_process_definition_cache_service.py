@@ -0,0 +1,129 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
+
+
+@dataclass
+class BpmnProcessDefinitionCacheEntry:
+    # rows can be deleted and written again with a different id for the same hash so this is checked on each get
+    bpmn_process_definition_id: int
+
+    # the assembled "spec" and "subprocess_specs" portions of the serialized workflow. this is stored as a json string
+    # since spiff mutates the dict when deserializing and json.loads is cheaper than a deepcopy.
+    definitions_json: str
+
+    # detached copies of the rows used to assemble the definitions. these are never added to a session directly.
+    # use merge_into_session to get instances usable in the bpmn_definition_to_task_definitions_mappings.
+    bpmn_process_definitions: list[BpmnProcessDefinitionModel]
+    task_definitions: list[TaskDefinitionModel]
+
+    def definitions(self) -> dict:
+        definitions: dict = json.loads(self.definitions_json)
+        return definitions
+
+
+class BpmnProcessDefinitionCacheService:
+    """Per-worker cache of the spec portion of serialized workflows keyed by full_process_model_hash.
+
+    Bpmn process definitions are content addressed so the rows for a given hash do not change
+    once they are written, which lets us skip reloading every task_definition row each time a
+    process instance of the same process model is loaded. The row id is not used as the key
+    since ids can be handed out again once rows are deleted.
+    """
+
+    _cache: OrderedDict[str, BpmnProcessDefinitionCacheEntry] = OrderedDict()
+    _lock = threading.Lock()
+    _stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_PROCESS_DEFINITION_CACHE_ENABLED"] is True
+
+    @classmethod
+    def get(cls, bpmn_process_definition: BpmnProcessDefinitionModel) -> BpmnProcessDefinitionCacheEntry | None:
+        cache_key = bpmn_process_definition.full_process_model_hash
+        if not cls.enabled() or cache_key is None:
+            return None
+        with cls._lock:
+            entry = cls._cache.get(cache_key)
+            if entry is not None and entry.bpmn_process_definition_id != bpmn_process_definition.id:
+                del cls._cache[cache_key]
+                entry = None
+            if entry is None:
+                cls._stats["misses"] += 1
+            else:
+                cls._cache.move_to_end(cache_key)
+                cls._stats["hits"] += 1
+            return entry
+
+    @classmethod
+    def set(
+        cls,
+        bpmn_process_definition: BpmnProcessDefinitionModel,
+        definitions_json: str,
+        bpmn_process_definitions: list[BpmnProcessDefinitionModel],
+        task_definitions: list[TaskDefinitionModel],
+    ) -> None:
+        cache_key = bpmn_process_definition.full_process_model_hash
+        if not cls.enabled() or cache_key is None:
+            return
+
+        entry = BpmnProcessDefinitionCacheEntry(
+            bpmn_process_definition_id=bpmn_process_definition.id,
+            definitions_json=definitions_json,
+            bpmn_process_definitions=[cls._detached_copy(d) for d in bpmn_process_definitions],
+            task_definitions=[cls._detached_copy(d) for d in task_definitions],
+        )
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_PROCESS_DEFINITION_CACHE_MAX_ENTRIES"])
+        with cls._lock:
+            cls._cache[cache_key] = entry
+            cls._cache.move_to_end(cache_key)
+            while len(cls._cache) > max_entries:
+                cls._cache.popitem(last=False)
+                cls._stats["evictions"] += 1
+
+    @classmethod
+    def merge_into_session(cls, detached_model: SpiffworkflowBaseDBModel) -> SpiffworkflowBaseDBModel:
+        """Returns an instance attached to the current session without querying the database."""
+        return db.session.merge(detached_model, load=False)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {**cls._stats, "size": len(cls._cache)}
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _detached_copy(cls, db_model: SpiffworkflowBaseDBModel) -> SpiffworkflowBaseDBModel:
+        model_class = db_model.__class__
+        column_values = {attr.key: getattr(db_model, attr.key) for attr in inspect(model_class).column_attrs}
+        # the processor adds task_specs to the properties_json of the loaded bpmn process definitions
+        # so make sure our copy does not share or include any of that.
+        properties_json = copy.deepcopy(column_values["properties_json"])
+        if isinstance(db_model, BpmnProcessDefinitionModel):
+            properties_json.pop("task_specs", None)
+        column_values["properties_json"] = properties_json
+        detached_model = model_class(**column_values)
+        make_transient_to_detached(detached_model)
+        return detached_model
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from types import CodeType
+
+from flask import current_app
+
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class CompiledCodeCacheService:
+    """Per-worker LRU cache of the code objects for script task scripts and expressions.
+
+    The source of scripts and conditions is fixed in the bpmn so the same strings are compiled over and over.
+    Restricted mode only changes the globals the code runs with, so the code object is the same in either mode.
+    Code is compiled with the same filename and flags as eval and exec use for strings so errors still point
+    at "<string>" with the right line number.
+    """
+
+    _cache: OrderedDict[tuple[str, str], CodeType] = OrderedDict()
+    _lock = threading.Lock()
+    _stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def max_entries(cls) -> int:
+        # script engines are also used where there is no app, like when the processor module is imported.
+        # current_app is falsy outside of an app context. has_app_context is untyped in the flask stubs.
+        if not current_app:
+            return DEFAULT_MAX_ENTRIES
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_COMPILED_CODE_CACHE_MAX_ENTRIES"])
+
+    @classmethod
+    def compile(cls, source: str, mode: str) -> CodeType:
+        """Mode is either eval or exec. Raises SyntaxError like eval and exec would."""
+        if mode == "eval":
+            # eval strips leading spaces and tabs from strings but compile does not
+            source = source.lstrip(" \t")
+        key = (source, mode)
+        with cls._lock:
+            code = cls._cache.get(key)
+            if code is not None:
+                cls._cache.move_to_end(key)
+                cls._stats["hits"] += 1
+                return code
+            cls._stats["misses"] += 1
+
+        code = compile(source, "<string>", mode, dont_inherit=True)
+        max_entries = cls.max_entries()
+        if max_entries < 1:
+            return code
+        with cls._lock:
+            cls._cache[key] = code
+            while len(cls._cache) > max_entries:
+                cls._cache.popitem(last=False)
+                cls._stats["evictions"] += 1
+        return code
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {**cls._stats, "size": len(cls._cache)}
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
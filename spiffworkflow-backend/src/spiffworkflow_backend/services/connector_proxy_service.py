@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from typing import Any
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from spiffworkflow_backend.config import CONNECTOR_PROXY_COMMAND_TIMEOUT
+from spiffworkflow_backend.config import HTTP_REQUEST_TIMEOUT_SECONDS
+
+TASK_DATA_PARAMETER_ID = "spiff__task_data"
+
+
+class ConnectorProxyService:
+    """Talks to the connector proxy over requests sessions that keep their connections open between calls.
+
+    Each process gets its own sessions since pooled connections cannot be shared across a fork. Commands listed in
+    SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_IDEMPOTENT_COMMANDS are retried with backoff when the proxy is unavailable,
+    other commands are only retried when the connection could not be made so the command never ran.
+    """
+
+    _lock = threading.Lock()
+    _sessions: dict[bool, requests.Session] = {}
+    _sessions_pid: int | None = None
+
+    # the commands the connector proxy offers and when they were fetched
+    _commands: dict[str, dict] | None = None
+    _commands_fetched_at: float = 0.0
+
+    @classmethod
+    def connector_proxy_url(cls) -> Any:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_URL"]
+
+    @classmethod
+    def session(cls, idempotent: bool = False) -> requests.Session:
+        with cls._lock:
+            if cls._sessions_pid != os.getpid():
+                # the sessions were inherited from the parent process so let it keep its connections
+                cls._sessions = {}
+                cls._commands = None
+                cls._sessions_pid = os.getpid()
+            if idempotent not in cls._sessions:
+                cls._sessions[idempotent] = cls._build_session(idempotent)
+            return cls._sessions[idempotent]
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions = {}
+            cls._commands = None
+
+    @classmethod
+    def is_idempotent(cls, operator_identifier: str) -> bool:
+        idempotent_commands = current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_IDEMPOTENT_COMMANDS"] or ""
+        return operator_identifier in [command.strip() for command in idempotent_commands.split(",")]
+
+    @classmethod
+    def do_command(cls, operator_identifier: str, params: dict) -> requests.Response:
+        """Raises on ConnectionError - like a bad url, and maybe limited other scenarios."""
+        return cls.session(idempotent=cls.is_idempotent(operator_identifier)).post(
+            f"{cls.connector_proxy_url()}/v1/do/{operator_identifier}",
+            json=params,
+            timeout=(cls._connect_timeout(), CONNECTOR_PROXY_COMMAND_TIMEOUT),
+        )
+
+    @classmethod
+    def get(cls, path: str) -> requests.Response:
+        return cls.session().get(
+            f"{cls.connector_proxy_url()}{path}", timeout=(cls._connect_timeout(), HTTP_REQUEST_TIMEOUT_SECONDS)
+        )
+
+    @classmethod
+    def command_needs_task_data(cls, operator_identifier: str) -> bool:
+        """Commands declare that they use the task data by listing spiff__task_data as one of their parameters.
+
+        When the available commands cannot be fetched the task data is sent to be safe.
+        """
+        if current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TASK_DATA_MODE"] != "declared":
+            return True
+        commands = cls.commands_by_id()
+        if commands is None or operator_identifier not in commands:
+            return True
+        parameters = commands[operator_identifier].get("parameters") or []
+        return any(isinstance(parameter, dict) and parameter.get("id") == TASK_DATA_PARAMETER_ID for parameter in parameters)
+
+    @classmethod
+    def commands_by_id(cls) -> dict[str, dict] | None:
+        max_age_in_seconds = current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_COMMANDS_CACHE_MAX_AGE_IN_SECONDS"]
+        with cls._lock:
+            if cls._commands is not None and time.time() - cls._commands_fetched_at < max_age_in_seconds:
+                return cls._commands
+
+        try:
+            response = cls.get("/v1/commands")
+            if response.status_code != 200:
+                return None
+            commands = {command["id"]: command for command in json.loads(response.text) if "id" in command}
+        except Exception as exception:
+            current_app.logger.warning(f"Could not get the available connector proxy commands: {exception}")
+            return None
+
+        with cls._lock:
+            cls._commands = commands
+            cls._commands_fetched_at = time.time()
+        return commands
+
+    @classmethod
+    def _connect_timeout(cls) -> int:
+        connect_timeout: int = current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_CONNECT_TIMEOUT_IN_SECONDS"]
+        return connect_timeout
+
+    @classmethod
+    def _build_session(cls, idempotent: bool) -> requests.Session:
+        allowed_methods = Retry.DEFAULT_ALLOWED_METHODS
+        if idempotent:
+            allowed_methods = allowed_methods | frozenset(["POST"])
+        retry = Retry(
+            total=current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_RETRIES"],
+            backoff_factor=float(current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_RETRY_BACKOFF_FACTOR"]),
+            status_forcelist=[502, 503, 504],
+            allowed_methods=allowed_methods,
+            # return the last response so the caller can report the status code it got
+            raise_on_status=False,
+        )
+        pool_size = current_app.config["SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_POOL_SIZE"]
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
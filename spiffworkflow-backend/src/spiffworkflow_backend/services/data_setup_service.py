@@ -1,10 +1,12 @@
 import os
+import posixpath
 from typing import Any
 
 from flask import current_app
 
 from spiffworkflow_backend.data_stores.json import JSONDataStore
 from spiffworkflow_backend.data_stores.kkv import KKVDataStore
+from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.json_data_store import JSONDataStoreModel
 from spiffworkflow_backend.models.kkv_data_store import KKVDataStoreModel
@@ -27,6 +29,29 @@ class DataSetupService:
         These all exist within processes located on the file system, so we can quickly reference them
         from the database.
         """
+        return cls._save_process_models()
+
+    @classmethod
+    def save_changed_process_models(cls, changed_file_paths: list[str]) -> list:
+        """Like save_all_process_models but only parses the files of the process models that changed.
+
+        changed_file_paths are relative to the spec dir, like git diff --relative lists them, and should include
+        deleted files and both sides of renames. The references of all other process models are copied from the
+        newest reference cache generation. Falls back to the full rebuild if there is no generation to copy from.
+        """
+        previous_generation = CacheGenerationModel.newest_generation_for_table("reference_cache")
+        if previous_generation is None:
+            return cls.save_all_process_models()
+
+        changed_relative_locations = {posixpath.dirname(changed_file_path) for changed_file_path in changed_file_paths}
+        return cls._save_process_models(
+            previous_generation_id=previous_generation.id, changed_relative_locations=changed_relative_locations
+        )
+
+    @classmethod
+    def _save_process_models(
+        cls, previous_generation_id: int | None = None, changed_relative_locations: set[str] | None = None
+    ) -> list:
         current_app.logger.debug("DataSetupService.save_all_process_models() start")
 
         failing_process_models = []
@@ -37,6 +62,10 @@ class DataSetupService:
 
         for file in files:
             if FileSystemService.is_process_model_json_file(file):
+                if changed_relative_locations is not None:
+                    relative_location = FileSystemService.relative_location(file).replace(os.sep, "/")
+                    if relative_location not in changed_relative_locations:
+                        continue
                 process_model = ProcessModelService.get_process_model_from_path(file)
                 current_app.logger.debug(f"Process Model: {process_model.display_name}")
                 try:
@@ -47,7 +76,6 @@ class DataSetupService:
                         try:
                             reference_cache = ReferenceCacheModel.from_spec_reference(ref)
                             ReferenceCacheService.add_unique_reference_cache_object(reference_objects, reference_cache)
-                            db.session.commit()
                             references.append(ref)
                         except Exception as ex:
                             failing_process_models.append(
@@ -101,7 +129,11 @@ class DataSetupService:
 
         current_app.logger.debug("DataSetupService.save_all_process_models() end")
 
-        ReferenceCacheService.add_new_generation(reference_objects)
+        ReferenceCacheService.add_new_generation(
+            reference_objects,
+            previous_generation_id=previous_generation_id,
+            changed_relative_locations=changed_relative_locations,
+        )
         cls._sync_data_store_models_with_specifications(all_data_store_specifications)
 
         for ref in references:
@@ -11,6 +11,8 @@ from spiffworkflow_backend.config import ConfigurationError
 from spiffworkflow_backend.models.process_model import ProcessModelInfo
 from spiffworkflow_backend.services.data_setup_service import DataSetupService
 from spiffworkflow_backend.services.file_system_service import FileSystemService
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 from spiffworkflow_backend.services.spec_file_service import SpecFileService
 
 
@@ -44,6 +46,24 @@ class GitService:
         # The value includes a carriage return character at the end, so we don't grab the last character
         return cls.run_shell_command_to_get_stdout(git_command, context_directory=bpmn_spec_absolute_dir)
 
+    @classmethod
+    def get_changed_files_between_revisions(cls, from_revision: str, to_revision: str = "HEAD") -> list[str] | None:
+        """Returns the paths relative to the spec dir of files added, changed or deleted between the revisions.
+
+        Renames are listed as a deletion and an addition. Returns None if git cannot diff the revisions.
+        """
+        bpmn_spec_absolute_dir = current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"]
+        try:
+            # -z so paths with unusual characters are not quoted
+            stdout = cls.run_shell_command_to_get_stdout(
+                ["diff", "--name-only", "--no-renames", "--relative", "-z", from_revision, to_revision],
+                context_directory=bpmn_spec_absolute_dir,
+            )
+        except GitCommandError as exception:
+            current_app.logger.warning(f"Could not get the files changed between {from_revision} and {to_revision}: {exception}")
+            return None
+        return [path for path in stdout.split("\0") if path != ""]
+
     @classmethod
     def get_instance_file_contents_for_revision(
         cls,
@@ -245,7 +265,16 @@ class GitService:
         cls.run_shell_command(
             ["pull", "--rebase"], context_directory=current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"]
         )
-        DataSetupService.save_all_process_models()
+        SpecCacheService.clear()
+        ProcessModelIndexService.clear()
+
+        changed_file_paths = None
+        if current_app.config["SPIFFWORKFLOW_BACKEND_GIT_WEBHOOK_INCREMENTAL_REFERENCE_CACHE_ENABLED"]:
+            changed_file_paths = cls.get_changed_files_between_revisions(git_revision_before_pull)
+        if changed_file_paths is None:
+            DataSetupService.save_all_process_models()
+        else:
+            DataSetupService.save_changed_process_models(changed_file_paths)
         return True
 
     @classmethod
@@ -0,0 +1,150 @@
+import time
+
+from flask import current_app
+from sqlalchemy import and_
+from sqlalchemy import exists
+from sqlalchemy.orm import aliased
+
+from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.process_instance_report import ProcessInstanceReportModel
+from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
+from spiffworkflow_backend.models.task_draft_data import TaskDraftDataModel
+
+# every column that holds a json_data hash. add new ones here so their data does not get deleted out from under them.
+JSON_DATA_HASH_COLUMNS = [
+    TaskModel.json_data_hash,
+    TaskModel.python_env_data_hash,
+    BpmnProcessModel.json_data_hash,
+    ProcessInstanceReportModel.json_data_hash,
+    TaskDraftDataModel.saved_form_data_hash,
+]
+
+# ad hoc reports are looked up by the hash of their metadata, which is not stored anywhere else, so the links
+# people save to them would break if they were deleted. they are recognized by the keys of ReportMetadata.
+REPORT_METADATA_KEYS = {"columns", "filter_by", "order_by"}
+
+
+class JsonDataGarbageCollectionService:
+    """Deletes json_data rows that nothing references anymore.
+
+    json_data rows are shared by anything with the same data so nothing deletes them when tasks, bpmn processes
+    or reports go away. This walks json_data in hash order in batches and marks hashes that are not in any of
+    JSON_DATA_HASH_COLUMNS, are not the base of a delta record and are not report metadata. Marked hashes are
+    swept later, after a grace period. The sweep locks the rows it is about to delete, skipping any a save has
+    locked to reuse, and checks the references again once it has the locks. It commits after each batch to keep
+    locks short.
+    """
+
+    # state for the background scheduler so each run continues where the last one stopped
+    _cursor: str | None = None
+    _marked_hashes: list[str] = []
+
+    @classmethod
+    def collect(
+        cls,
+        batch_size: int,
+        grace_period_in_seconds: float,
+        after_hash: str | None = None,
+        max_batches: int | None = None,
+    ) -> tuple[int, str | None]:
+        """Marks orphaned json_data rows, waits for the grace period and sweeps them.
+
+        Returns how many rows were deleted and the hash to pass as after_hash to resume from,
+        which is None when the whole table was walked.
+        """
+        marked_hashes, after_hash = cls.mark(batch_size, after_hash=after_hash, max_batches=max_batches)
+        if len(marked_hashes) == 0:
+            return (0, after_hash)
+        time.sleep(grace_period_in_seconds)
+        return (cls.sweep(marked_hashes, batch_size), after_hash)
+
+    @classmethod
+    def run_scheduled_collection(cls) -> int:
+        """Sweeps what the previous run marked and then marks the next batches.
+
+        The time between scheduled runs is the grace period.
+        """
+        batch_size = current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_GARBAGE_COLLECTION_BATCH_SIZE"]
+        deleted_count = cls.sweep(cls._marked_hashes, batch_size)
+        cls._marked_hashes, cls._cursor = cls.mark(
+            batch_size,
+            after_hash=cls._cursor,
+            max_batches=current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_GARBAGE_COLLECTION_MAX_BATCHES_PER_RUN"],
+        )
+        if deleted_count > 0:
+            current_app.logger.info(f"Deleted {deleted_count} orphaned json_data rows")
+        return deleted_count
+
+    @classmethod
+    def mark(cls, batch_size: int, after_hash: str | None = None, max_batches: int | None = None) -> tuple[list[str], str | None]:
+        """Returns the orphaned hashes after the given hash and the hash to continue from next time."""
+        marked_hashes: list[str] = []
+        batch_count = 0
+        while max_batches is None or batch_count < max_batches:
+            query = db.session.query(JsonDataModel.hash)  # type: ignore
+            if after_hash is not None:
+                query = query.filter(JsonDataModel.hash > after_hash)
+            hashes = [row.hash for row in query.order_by(JsonDataModel.hash).limit(batch_size).all()]
+            if len(hashes) == 0:
+                return (marked_hashes, None)
+            referenced_hashes = cls.referenced_hashes(hashes)
+            orphaned_hashes = [h for h in hashes if h not in referenced_hashes]
+            report_metadata_hashes = cls.report_metadata_hashes(orphaned_hashes)
+            marked_hashes.extend(h for h in orphaned_hashes if h not in report_metadata_hashes)
+            after_hash = hashes[-1]
+            batch_count += 1
+        return (marked_hashes, after_hash)
+
+    @classmethod
+    def sweep(cls, hashes: list[str], batch_size: int) -> int:
+        """Deletes the given hashes that are still not referenced and returns how many were deleted."""
+        if len(hashes) == 0:
+            return 0
+        # the bases of delta records are referenced by other json_data rows
+        delta_record = aliased(JsonDataModel)
+        not_referenced = and_(
+            *[~exists().where(column == JsonDataModel.hash) for column in JSON_DATA_HASH_COLUMNS],  # type: ignore
+            ~exists().where(delta_record.delta_base_hash == JsonDataModel.hash),  # type: ignore
+        )
+        deleted_count = 0
+        for index in range(0, len(hashes), batch_size):
+            batch = hashes[index : index + batch_size]
+            # rows locked by saves that are about to reuse them are skipped. they will be marked again if they are
+            # still orphaned next time. references are checked after getting the locks so saves that committed
+            # while we waited for them are seen.
+            locked_hashes = [
+                row.hash
+                for row in db.session.query(JsonDataModel.hash)  # type: ignore
+                .filter(JsonDataModel.hash.in_(batch))  # type: ignore
+                .with_for_update(skip_locked=True)
+                .all()
+            ]
+            referenced_hashes = cls.referenced_hashes(locked_hashes)
+            hashes_to_delete = [h for h in locked_hashes if h not in referenced_hashes]
+            if len(hashes_to_delete) > 0:
+                deleted_count += (
+                    db.session.query(JsonDataModel)
+                    .filter(JsonDataModel.hash.in_(hashes_to_delete), not_referenced)  # type: ignore
+                    .delete(synchronize_session=False)
+                )
+            db.session.commit()
+        return deleted_count
+
+    @classmethod
+    def referenced_hashes(cls, hashes: list[str]) -> set[str]:
+        referenced_hashes: set[str] = set()
+        if len(hashes) == 0:
+            return referenced_hashes
+        for column in [*JSON_DATA_HASH_COLUMNS, JsonDataModel.delta_base_hash]:
+            rows = db.session.query(column).filter(column.in_(hashes)).distinct().all()  # type: ignore
+            referenced_hashes.update(row[0] for row in rows)
+        return referenced_hashes
+
+    @classmethod
+    def report_metadata_hashes(cls, hashes: list[str]) -> set[str]:
+        if len(hashes) == 0:
+            return set()
+        data_dicts = JsonDataModel.find_data_dicts_by_hashes(hashes)
+        return {hash for hash, data in data_dicts.items() if REPORT_METADATA_KEYS.issubset(data)}
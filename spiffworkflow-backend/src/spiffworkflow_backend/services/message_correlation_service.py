@@ -0,0 +1,207 @@
+import hashlib
+import json
+from typing import Any
+
+from flask import current_app
+from SpiffWorkflow.bpmn.script_engine import PythonScriptEngine  # type: ignore
+from sqlalchemy import and_
+from sqlalchemy import exists
+from sqlalchemy import or_
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+from spiffworkflow_backend.models.message_instance import MessageStatuses
+from spiffworkflow_backend.models.message_instance import MessageTypes
+from spiffworkflow_backend.models.message_instance_correlation import MessageInstanceCorrelationRuleModel
+from spiffworkflow_backend.models.message_instance_correlation_value import CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH
+from spiffworkflow_backend.models.message_instance_correlation_value import MessageInstanceCorrelationValueModel
+
+
+class MessageCorrelationService:
+    """Finds the receive message a send message correlates with using MessageInstanceCorrelationValueModel.
+
+    This gives the same answer as calling MessageInstanceModel.correlates on every ready receive message with
+    the same name but each send only evaluates each distinct set of retrieval expressions once and then looks
+    up matching receives by the hash of the values they produced. Numbers are normalized before they are hashed
+    so values that are == to each other, like 1, 1.0 and True, still match each other like they do in correlates.
+    """
+
+    @classmethod
+    def add_correlation_values(
+        cls,
+        message_instance_receive: MessageInstanceModel,
+        correlation_rules: list[MessageInstanceCorrelationRuleModel],
+    ) -> None:
+        """Adds the rows needed to find this receive message to the session."""
+        correlation_keys = message_instance_receive.correlation_keys
+        # a send with the same correlation keys always matches
+        cls._add_correlation_value(
+            message_instance_receive, None, None, CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH, cls._hash(correlation_keys)
+        )
+        if correlation_keys == {}:
+            # there is nothing to match on so any send with the same name matches
+            cls._add_correlation_value(message_instance_receive, None, {}, cls._hash({}), cls._hash({}))
+            return
+
+        # the receive matches a send if all of the non-null values of any one of its correlation keys match
+        for correlation_key_name, expected_values in correlation_keys.items():
+            if not isinstance(expected_values, dict):
+                continue
+            retrieval_expressions = {
+                rule.name: rule.retrieval_expression
+                for rule in correlation_rules
+                if expected_values.get(rule.name, None) is not None
+            }
+            values = {name: expected_values[name] for name in retrieval_expressions}
+            cls._add_correlation_value(
+                message_instance_receive,
+                correlation_key_name,
+                retrieval_expressions,
+                cls._hash(retrieval_expressions),
+                cls._hash(values),
+            )
+
+    @classmethod
+    def remove_correlation_values(cls, message_instance_receive: MessageInstanceModel) -> None:
+        """Receive messages can only be matched while they are ready so their rows are not needed afterwards."""
+        MessageInstanceCorrelationValueModel.query.filter_by(message_instance_id=message_instance_receive.id).delete()
+
+    @classmethod
+    def find_receive_message_instance(
+        cls, message_instance_send: MessageInstanceModel, expression_engine: PythonScriptEngine
+    ) -> MessageInstanceModel | None:
+        cls._add_missing_correlation_values(message_instance_send.name)
+
+        matching_values = []
+        if isinstance(message_instance_send.correlation_keys, dict):
+            matching_values.append(
+                and_(
+                    MessageInstanceCorrelationValueModel.retrieval_expressions_hash  # type: ignore
+                    == CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH,
+                    MessageInstanceCorrelationValueModel.expected_values_hash  # type: ignore
+                    == cls._hash(message_instance_send.correlation_keys),
+                )
+            )
+
+        retrieval_expressions_rows = (
+            db.session.query(  # type: ignore
+                MessageInstanceCorrelationValueModel.retrieval_expressions_hash,
+                MessageInstanceCorrelationValueModel.retrieval_expressions,
+            )
+            .filter(
+                MessageInstanceCorrelationValueModel.message_name == message_instance_send.name,
+                MessageInstanceCorrelationValueModel.retrieval_expressions_hash != CORRELATION_KEYS_RETRIEVAL_EXPRESSIONS_HASH,
+            )
+            .distinct()
+            .all()
+        )
+        for retrieval_expressions_hash, retrieval_expressions in retrieval_expressions_rows:
+            values_hash = cls._evaluate_retrieval_expressions(
+                json.loads(retrieval_expressions), message_instance_send.payload, expression_engine
+            )
+            if values_hash is not None:
+                matching_values.append(
+                    and_(
+                        MessageInstanceCorrelationValueModel.retrieval_expressions_hash == retrieval_expressions_hash,
+                        MessageInstanceCorrelationValueModel.expected_values_hash == values_hash,  # type: ignore
+                    )
+                )
+
+        if len(matching_values) == 0:
+            return None
+
+        # correlates was checked against every receive in id order and the last match won so keep doing that
+        message_instance_receive: MessageInstanceModel | None = (
+            MessageInstanceModel.query.join(
+                MessageInstanceCorrelationValueModel,
+                MessageInstanceCorrelationValueModel.message_instance_id == MessageInstanceModel.id,
+            )
+            .filter(
+                MessageInstanceCorrelationValueModel.message_name == message_instance_send.name,
+                or_(*matching_values),
+                MessageInstanceModel.name == message_instance_send.name,
+                MessageInstanceModel.status == MessageStatuses.ready.value,
+                MessageInstanceModel.message_type == MessageTypes.receive.value,
+            )
+            .order_by(MessageInstanceModel.id.desc())  # type: ignore
+            .first()
+        )
+        return message_instance_receive
+
+    @classmethod
+    def _evaluate_retrieval_expressions(
+        cls, retrieval_expressions: dict[str, str], payload: Any, expression_engine: PythonScriptEngine
+    ) -> str | None:
+        values = {}
+        for name, retrieval_expression in retrieval_expressions.items():
+            try:
+                values[name] = expression_engine.environment.evaluate(retrieval_expression, payload)
+            except Exception as e:
+                # the failure of a payload evaluation may not mean that matches for these
+                # message instances can't happen with other messages.  So don't error up.
+                current_app.logger.warning(
+                    "Error evaluating correlation key when comparing send and receive messages."
+                    + f"Expression {retrieval_expression} failed with the error "
+                    + str(e)
+                )
+                return None
+        try:
+            return cls._hash(values)
+        except (TypeError, ValueError):
+            # values that cannot be stored as json cannot be equal to an expected value from a receive message
+            return None
+
+    @classmethod
+    def _add_missing_correlation_values(cls, message_name: str) -> None:
+        """Indexes ready receive messages from before correlation values existed. Every receive message has at least one row.
+
+        The rows are only added to the session. The queries that look them up flush them and the caller commits them.
+        """
+        unindexed_receive_messages = MessageInstanceModel.query.filter(
+            MessageInstanceModel.name == message_name,
+            MessageInstanceModel.status == MessageStatuses.ready.value,
+            MessageInstanceModel.message_type == MessageTypes.receive.value,
+            ~exists().where(MessageInstanceCorrelationValueModel.message_instance_id == MessageInstanceModel.id),  # type: ignore
+        ).all()
+        for message_instance_receive in unindexed_receive_messages:
+            cls.add_correlation_values(message_instance_receive, message_instance_receive.correlation_rules)
+
+    @classmethod
+    def _add_correlation_value(
+        cls,
+        message_instance_receive: MessageInstanceModel,
+        correlation_key_name: str | None,
+        retrieval_expressions: dict | None,
+        retrieval_expressions_hash: str,
+        expected_values_hash: str,
+    ) -> None:
+        db.session.add(
+            MessageInstanceCorrelationValueModel(
+                message_instance=message_instance_receive,
+                message_name=message_instance_receive.name,
+                correlation_key_name=correlation_key_name,
+                retrieval_expressions=None
+                if retrieval_expressions is None
+                else json.dumps(retrieval_expressions, sort_keys=True),
+                retrieval_expressions_hash=retrieval_expressions_hash,
+                expected_values_hash=expected_values_hash,
+            )
+        )
+
+    @classmethod
+    def _hash(cls, value: Any) -> str:
+        # always sha256 so the hashes stay valid if SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM changes
+        return hashlib.sha256(json.dumps(cls._normalize(value), sort_keys=True).encode("utf8")).hexdigest()
+
+    @classmethod
+    def _normalize(cls, value: Any) -> Any:
+        """Turns bools and whole floats into ints since json would write 1, 1.0 and True differently."""
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, dict):
+            return {key: cls._normalize(item) for key, item in value.items()}
+        if isinstance(value, list | tuple):
+            return [cls._normalize(item) for item in value]
+        return value
@@ -15,10 +15,10 @@ from spiffworkflow_backend.helpers.spiff_enum import ProcessInstanceExecutionMod
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.message_instance import MessageInstanceModel
 from spiffworkflow_backend.models.message_instance import MessageStatuses
-from spiffworkflow_backend.models.message_instance import MessageTypes
 from spiffworkflow_backend.models.message_triggerable_process_model import MessageTriggerableProcessModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.message_correlation_service import MessageCorrelationService
 from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
@@ -51,17 +51,11 @@ class MessageService:
         db.session.add(message_instance_send)
         db.session.commit()
 
-        # Find available messages that might match
-        available_receive_messages = MessageInstanceModel.query.filter_by(
-            name=message_instance_send.name,
-            status=MessageStatuses.ready.value,
-            message_type=MessageTypes.receive.value,
-        ).all()
         message_instance_receive: MessageInstanceModel | None = None
         try:
-            for message_instance in available_receive_messages:
-                if message_instance.correlates(message_instance_send, CustomBpmnScriptEngine()):
-                    message_instance_receive = message_instance
+            message_instance_receive = MessageCorrelationService.find_receive_message_instance(
+                message_instance_send, CustomBpmnScriptEngine()
+            )
             if message_instance_receive is None:
                 # Check for a message triggerable process and start that to create a new message_instance_receive
                 message_triggerable_process_model = MessageTriggerableProcessModel.query.filter_by(
@@ -100,6 +94,7 @@ class MessageService:
                     message_instance_receive.status = "completed"
                     message_instance_receive.counterpart_id = message_instance_send.id
                     db.session.add(message_instance_receive)
+                    MessageCorrelationService.remove_correlation_values(message_instance_receive)
                     message_instance_send.status = "completed"
                     message_instance_send.counterpart_id = message_instance_receive.id
                     db.session.add(message_instance_send)
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
+from spiffworkflow_backend.models.cache_generation import CacheGenerationTable
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.group import GroupModel
+from spiffworkflow_backend.models.permission_assignment import PermissionAssignmentModel
+from spiffworkflow_backend.models.permission_target import PermissionTargetModel
+from spiffworkflow_backend.models.principal import PrincipalModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
+
+# changes to any of these change the compiled permissions
+PERMISSION_MODELS: tuple[type[SpiffworkflowBaseDBModel], ...] = (PermissionAssignmentModel, PermissionTargetModel)
+# changes to any of these change which principals a user has. those are cached on their own so logging in and syncing
+# groups only makes processes look up group memberships again instead of rebuilding the compiled permissions.
+MEMBERSHIP_MODELS: tuple[type[SpiffworkflowBaseDBModel], ...] = (UserGroupAssignmentModel, PrincipalModel)
+# deleting these can delete permission assignments and memberships through foreign keys without the orm knowing
+PERMISSION_OWNER_MODELS: tuple[type[SpiffworkflowBaseDBModel], ...] = (PrincipalModel, GroupModel, UserModel)
+PERMISSION_TABLE_NAMES = {model.__tablename__ for model in PERMISSION_MODELS}
+MEMBERSHIP_TABLE_NAMES = {model.__tablename__ for model in MEMBERSHIP_MODELS}
+PERMISSION_OWNER_TABLE_NAMES = {model.__tablename__ for model in PERMISSION_OWNER_MODELS}
+PERMISSIONS_CHANGED_SESSION_INFO_KEY = "permissions_changed"
+MEMBERSHIPS_CHANGED_SESSION_INFO_KEY = "permission_memberships_changed"
+
+# uris are split after each delimiter so "/process-groups/a:b" becomes ["/", "process-groups/", "a:", "b"]
+URI_TOKEN_REGEX = re.compile(r"[^/:]*[/:]|[^/:]+")
+
+NO_MATCH = 0
+PERMIT = 1
+DENY = 2
+
+
+class PermissionTrieNode:
+    __slots__ = ("children", "exact_grants", "prefix_grants", "partial_prefix_grants")
+
+    def __init__(self) -> None:
+        self.children: dict[str, PermissionTrieNode] = {}
+
+        # grants for targets that are exactly the uri up to this node
+        self.exact_grants: list[tuple[int, bool]] = []
+
+        # grants for wildcard targets whose prefix is the uri up to this node
+        self.prefix_grants: list[tuple[int, bool]] = []
+
+        # grants for wildcard targets whose prefix ends part way through the next token like "/process-models/a%"
+        self.partial_prefix_grants: dict[str, list[tuple[int, bool]]] = {}
+
+    def child(self, tokens: list[str]) -> PermissionTrieNode:
+        node = self
+        for token in tokens:
+            node = node.children.setdefault(token, PermissionTrieNode())
+        return node
+
+
+class CacheGenerationSnapshot:
+    """Something cached from the database along with when its CacheGenerationModel row was last touched."""
+
+    def __init__(self, generation: int, cache_generation_updated_at_in_seconds: int | None) -> None:
+        self.generation = generation
+        self.cache_generation_updated_at_in_seconds = cache_generation_updated_at_in_seconds
+        self.built_at = time.time()
+        self.cache_generation_checked_at = self.built_at
+
+
+class CompiledPermissions(CacheGenerationSnapshot):
+    """All permission assignments arranged as one token trie per permission.
+
+    Each grant in the trie is a (principal_id, is_deny) tuple so checking a user in many groups
+    is still a single walk down the uri.
+    """
+
+    def __init__(self, generation: int, cache_generation_updated_at_in_seconds: int | None) -> None:
+        super().__init__(generation, cache_generation_updated_at_in_seconds)
+        self.tries: dict[str, PermissionTrieNode] = {}
+
+    def add(self, principal_id: int, permission: str, grant_type: str, target_uri: str) -> None:
+        if grant_type not in ["permit", "deny"]:
+            raise Exception(f"Unknown grant type: {grant_type}")
+        grant = (principal_id, grant_type == "deny")
+        root = self.tries.setdefault(permission, PermissionTrieNode())
+
+        if not target_uri.endswith("%"):
+            root.child(self._tokens(target_uri)).exact_grants.append(grant)
+            return
+
+        prefix = target_uri.removesuffix("%")
+        tokens = self._tokens(prefix)
+        if len(tokens) == 0 or prefix.endswith(("/", ":")):
+            root.child(tokens).prefix_grants.append(grant)
+        else:
+            root.child(tokens[:-1]).partial_prefix_grants.setdefault(tokens[-1], []).append(grant)
+
+        # a wildcard also matches the uri without it so "/process-groups/a:%" matches "/process-groups/a"
+        if target_uri.endswith(("/%", ":%")):
+            root.child(self._tokens(target_uri[:-2])).exact_grants.append(grant)
+
+    def has_permission(self, principal_ids: frozenset[int] | set[int], permission: str, target_uri: str) -> bool:
+        """Any matching deny wins over any matching permit and no matches means no permission."""
+        node = self.tries.get(permission)
+        if node is None:
+            return False
+
+        result = NO_MATCH
+        for token in self._tokens(target_uri):
+            result = max(result, self._check(node.prefix_grants, principal_ids))
+            for partial_token, grants in node.partial_prefix_grants.items():
+                if token.startswith(partial_token):
+                    result = max(result, self._check(grants, principal_ids))
+            if result == DENY:
+                return False
+            next_node = node.children.get(token)
+            if next_node is None:
+                return result == PERMIT
+            node = next_node
+
+        result = max(result, self._check(node.prefix_grants, principal_ids), self._check(node.exact_grants, principal_ids))
+        return result == PERMIT
+
+    @classmethod
+    def _check(cls, grants: list[tuple[int, bool]], principal_ids: frozenset[int] | set[int]) -> int:
+        result = NO_MATCH
+        for principal_id, is_deny in grants:
+            if principal_id in principal_ids:
+                if is_deny:
+                    return DENY
+                result = PERMIT
+        return result
+
+    @classmethod
+    def _tokens(cls, uri: str) -> list[str]:
+        return URI_TOKEN_REGEX.findall(uri)
+
+
+class CachedMemberships(CacheGenerationSnapshot):
+    """The principal ids of each user that was checked, least recently used first."""
+
+    def __init__(self, generation: int, cache_generation_updated_at_in_seconds: int | None) -> None:
+        super().__init__(generation, cache_generation_updated_at_in_seconds)
+        self.principal_ids_by_user_id: OrderedDict[int, frozenset[int]] = OrderedDict()
+
+
+class PermissionCacheService:
+    """Per-process compiled copy of every permission assignment so permission checks do not hit the database.
+
+    The compiled permissions are rebuilt the next time they are used after the generation changes.
+    Commits that change any of the PERMISSION_MODELS bump the generation in this process and touch the
+    single permission CacheGenerationModel row so other processes notice within
+    SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_GENERATION_CHECK_INTERVAL_IN_SECONDS. The principal ids of
+    each user are cached the same way and forgotten when any of the MEMBERSHIP_MODELS change.
+
+    Target uris are matched literally so unlike the LIKE query this replaces, "_" is not a wildcard
+    and matching is case sensitive on every database. That is why it is off by default.
+    """
+
+    _lock = threading.Lock()
+    _generation = 0
+    _compiled: CompiledPermissions | None = None
+    _membership_generation = 0
+    _memberships: CachedMemberships | None = None
+    _session_listeners_registered = False
+    _stats: dict[str, int] = {"builds": 0, "membership_hits": 0, "membership_misses": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED"] is True
+
+    @classmethod
+    def register_session_listeners(cls) -> None:
+        """Starts tracking commits that change permissions or memberships.
+
+        This looks at every flush and commit in the app so it is only done once the cache is enabled.
+        """
+        if cls._session_listeners_registered:
+            return
+        with cls._lock:
+            # another thread may have registered them while we waited for the lock
+            if not event.contains(Session, "after_commit", _invalidate_permission_caches):
+                event.listen(Session, "do_orm_execute", _track_permission_statements)
+                event.listen(Session, "after_flush", _track_permission_flushes)
+                event.listen(Session, "before_commit", _update_permission_cache_generations)
+                event.listen(Session, "after_commit", _invalidate_permission_caches)
+                event.listen(Session, "after_rollback", _discard_permission_changes)
+            cls._session_listeners_registered = True
+
+    @classmethod
+    def has_permission(cls, principal_ids: frozenset[int] | set[int], permission: str, target_uri: str) -> bool:
+        return cls.compiled_permissions().has_permission(principal_ids, permission, target_uri)
+
+    @classmethod
+    def principal_ids_for_user(cls, user: UserModel) -> frozenset[int] | None:
+        """Returns None if the user or one of its groups does not have a principal."""
+        memberships = cls.cached_memberships()
+        with cls._lock:
+            principal_ids = memberships.principal_ids_by_user_id.get(user.id)
+            if principal_ids is not None:
+                memberships.principal_ids_by_user_id.move_to_end(user.id)
+                cls._stats["membership_hits"] += 1
+                return principal_ids
+
+        principal_ids = cls._load_principal_ids_for_user(user)
+        if principal_ids is None:
+            return None
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_MEMBERSHIPS_MAX_ENTRIES"])
+        with cls._lock:
+            cls._stats["membership_misses"] += 1
+            # memberships that changed while these were loaded may not be in them so only keep them if nothing did
+            if cls._memberships is memberships and memberships.generation == cls._membership_generation:
+                memberships.principal_ids_by_user_id[user.id] = principal_ids
+                while len(memberships.principal_ids_by_user_id) > max_entries:
+                    memberships.principal_ids_by_user_id.popitem(last=False)
+        return principal_ids
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._generation += 1
+            cls._membership_generation += 1
+
+    @classmethod
+    def invalidate_memberships(cls) -> None:
+        with cls._lock:
+            cls._membership_generation += 1
+
+    @classmethod
+    def compiled_permissions(cls) -> CompiledPermissions:
+        cls.register_session_listeners()
+        stale_compiled = cls._compiled
+        if (
+            stale_compiled is not None
+            and stale_compiled.generation == cls._generation
+            and not cls._cache_generation_changed(stale_compiled, CacheGenerationTable.permission.value)
+        ):
+            return stale_compiled
+
+        with cls._lock:
+            # another thread may have rebuilt them while we waited for the lock
+            compiled = cls._compiled
+            if compiled is None or compiled is stale_compiled or compiled.generation != cls._generation:
+                compiled = cls._build(cls._generation)
+                cls._compiled = compiled
+                cls._stats["builds"] += 1
+            return compiled
+
+    @classmethod
+    def cached_memberships(cls) -> CachedMemberships:
+        cls.register_session_listeners()
+        cache_table = CacheGenerationTable.permission_membership.value
+        stale_memberships = cls._memberships
+        if (
+            stale_memberships is not None
+            and stale_memberships.generation == cls._membership_generation
+            and not cls._cache_generation_changed(stale_memberships, cache_table)
+        ):
+            return stale_memberships
+
+        with cls._lock:
+            memberships = cls._memberships
+            if memberships is None or memberships is stale_memberships or memberships.generation != cls._membership_generation:
+                memberships = CachedMemberships(
+                    cls._membership_generation, cls._cache_generation_updated_at_in_seconds(cache_table)
+                )
+                cls._memberships = memberships
+            return memberships
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {**cls._stats, "generation": cls._generation}
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _cache_generation_changed(cls, snapshot: CacheGenerationSnapshot, cache_table: str) -> bool:
+        check_interval = float(current_app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_GENERATION_CHECK_INTERVAL_IN_SECONDS"])
+        if time.time() - snapshot.cache_generation_checked_at < check_interval:
+            return False
+        snapshot.cache_generation_checked_at = time.time()
+        updated_at_in_seconds = cls._cache_generation_updated_at_in_seconds(cache_table)
+        if updated_at_in_seconds != snapshot.cache_generation_updated_at_in_seconds:
+            return True
+        # updated_at_in_seconds is rounded to the second so a change made around the time the snapshot was built
+        # may not have changed it. rebuild until the row was last touched well before a build.
+        return updated_at_in_seconds is not None and updated_at_in_seconds >= snapshot.built_at - 1
+
+    @classmethod
+    def _cache_generation_updated_at_in_seconds(cls, cache_table: str) -> int | None:
+        cache_generation = CacheGenerationModel.newest_generation_for_table(cache_table)
+        return None if cache_generation is None else cache_generation.updated_at_in_seconds
+
+    @classmethod
+    def _load_principal_ids_for_user(cls, user: UserModel) -> frozenset[int] | None:
+        group_ids = select(UserGroupAssignmentModel.group_id).where(UserGroupAssignmentModel.user_id == user.id)
+        principal_rows = (
+            db.session.query(PrincipalModel.id, PrincipalModel.group_id)
+            .filter(or_(PrincipalModel.user_id == user.id, PrincipalModel.group_id.in_(group_ids)))
+            .all()
+        )
+        group_count = db.session.query(UserGroupAssignmentModel).filter(UserGroupAssignmentModel.user_id == user.id).count()
+        group_principal_count = len([row for row in principal_rows if row.group_id is not None])
+        # leave these out so checks fall back to UserService.all_principals_for_user which raises the usual error
+        if group_principal_count == len(principal_rows) or group_principal_count != group_count:
+            return None
+        return frozenset(row.id for row in principal_rows)
+
+    @classmethod
+    def _build(cls, generation: int) -> CompiledPermissions:
+        compiled = CompiledPermissions(
+            generation, cls._cache_generation_updated_at_in_seconds(CacheGenerationTable.permission.value)
+        )
+
+        permission_rows = (
+            db.session.query(  # type: ignore
+                PermissionAssignmentModel.principal_id,
+                PermissionAssignmentModel.permission,
+                PermissionAssignmentModel.grant_type,
+                PermissionTargetModel.uri,
+            )
+            .join(PermissionTargetModel, PermissionTargetModel.id == PermissionAssignmentModel.permission_target_id)
+            .all()
+        )
+        for principal_id, permission, grant_type, uri in permission_rows:
+            compiled.add(principal_id, permission, grant_type, uri)
+        return compiled
+
+
+def _touch_permission_cache_generation(session: Session, cache_table: str) -> None:
+    """Updates the one cache generation row for the table instead of adding a row for every change."""
+    cache_generation = (
+        session.query(CacheGenerationModel)
+        .filter_by(cache_table=cache_table)
+        .order_by(CacheGenerationModel.id.desc())  # type: ignore
+        .first()
+    )
+    if cache_generation is None:
+        cache_generation = CacheGenerationModel(cache_table=cache_table)
+    cache_generation.updated_at_in_seconds = round(time.time())
+    session.add(cache_generation)
+
+
+def _has_changes(session: Session, models: tuple[type[SpiffworkflowBaseDBModel], ...]) -> bool:
+    return (
+        any(isinstance(instance, models) for instance in session.new)
+        or any(isinstance(instance, models) and session.is_modified(instance) for instance in session.dirty)
+        or any(isinstance(instance, models + PERMISSION_OWNER_MODELS) for instance in session.deleted)
+    )
+
+
+# the session info key that marks changes to each cache along with what changes it and its cache generation row
+TRACKED_PERMISSION_CACHES: list[tuple[str, tuple[type[SpiffworkflowBaseDBModel], ...], set[str], str]] = [
+    (
+        PERMISSIONS_CHANGED_SESSION_INFO_KEY,
+        PERMISSION_MODELS,
+        PERMISSION_TABLE_NAMES,
+        CacheGenerationTable.permission.value,
+    ),
+    (
+        MEMBERSHIPS_CHANGED_SESSION_INFO_KEY,
+        MEMBERSHIP_MODELS,
+        MEMBERSHIP_TABLE_NAMES,
+        CacheGenerationTable.permission_membership.value,
+    ),
+]
+
+
+def _track_permission_statements(orm_execute_state: ORMExecuteState) -> None:
+    # bulk statements like query.delete() and table.delete() skip the flush events
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table_name = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+        for session_info_key, _models, table_names, _cache_table in TRACKED_PERMISSION_CACHES:
+            if table_name in table_names or (orm_execute_state.is_delete and table_name in PERMISSION_OWNER_TABLE_NAMES):
+                orm_execute_state.session.info.setdefault(session_info_key, "pending")
+
+
+def _track_permission_flushes(session: Session, flush_context: Any) -> None:
+    for session_info_key, models, _table_names, _cache_table in TRACKED_PERMISSION_CACHES:
+        if not session.info.get(session_info_key) and _has_changes(session, models):
+            session.info[session_info_key] = "pending"
+
+
+def _update_permission_cache_generations(session: Session) -> None:
+    # the generation rows cannot be touched from after_flush or do_orm_execute so changes are only marked there.
+    # pending changes are flushed after this runs so check for those as well.
+    for session_info_key, models, _table_names, cache_table in TRACKED_PERMISSION_CACHES:
+        changed = session.info.get(session_info_key)
+        if changed == "pending" or (not changed and _has_changes(session, models)):
+            session.info[session_info_key] = True
+            _touch_permission_cache_generation(session, cache_table)
+
+
+def _invalidate_permission_caches(session: Session) -> None:
+    if session.info.pop(PERMISSIONS_CHANGED_SESSION_INFO_KEY, None):
+        PermissionCacheService.invalidate()
+    if session.info.pop(MEMBERSHIPS_CHANGED_SESSION_INFO_KEY, None):
+        PermissionCacheService.invalidate_memberships()
+
+
+def _discard_permission_changes(session: Session) -> None:
+    session.info.pop(PERMISSIONS_CHANGED_SESSION_INFO_KEY, None)
+    session.info.pop(MEMBERSHIPS_CHANGED_SESSION_INFO_KEY, None)
@@ -3,6 +3,7 @@
 import _strptime  # type: ignore
 import copy
 import decimal
+import glob
 import json
 import logging
 import os
@@ -11,10 +12,10 @@ import re
 import time
 import uuid
 from collections.abc import Callable
+from contextlib import ExitStack
 from contextlib import suppress
 from datetime import datetime
 from datetime import timedelta
-from hashlib import sha256
 from typing import Any
 from typing import NewType
 from typing import TypedDict
@@ -64,6 +65,9 @@ from spiffworkflow_backend.data_stores.typeahead import TypeaheadDataStore
 from spiffworkflow_backend.data_stores.typeahead import TypeaheadDataStoreConverter
 from spiffworkflow_backend.exceptions.api_error import ApiError
 from spiffworkflow_backend.exceptions.error import TaskMismatchError
+from spiffworkflow_backend.exceptions.process_entity_not_found_error import ProcessEntityNotFoundError
+from spiffworkflow_backend.helpers.benchmarking import PhaseTimings
+from spiffworkflow_backend.helpers.content_hash import content_hash
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
 from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
 from spiffworkflow_backend.models.bpmn_process_definition_relationship import BpmnProcessDefinitionRelationshipModel
@@ -89,6 +93,9 @@ from spiffworkflow_backend.models.task import TaskNotFoundError
 from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.scripts.script import Script
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheEntry
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheService
+from spiffworkflow_backend.services.compiled_code_cache_service import CompiledCodeCacheService
 from spiffworkflow_backend.services.custom_parser import MyCustomParser
 from spiffworkflow_backend.services.file_system_service import FileSystemService
 from spiffworkflow_backend.services.jinja_service import JinjaHelpers
@@ -97,6 +104,9 @@ from spiffworkflow_backend.services.process_instance_tmp_service import ProcessI
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
 from spiffworkflow_backend.services.service_task_service import CustomServiceTask
 from spiffworkflow_backend.services.service_task_service import ServiceTaskDelegate
+from spiffworkflow_backend.services.spec_cache_service import ProcessModelSettingsCacheEntry
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
+from spiffworkflow_backend.services.spec_cache_service import SpecDependencies
 from spiffworkflow_backend.services.spec_file_service import SpecFileService
 from spiffworkflow_backend.services.task_service import StartAndEndTimes
 from spiffworkflow_backend.services.task_service import TaskService
@@ -104,6 +114,7 @@ from spiffworkflow_backend.services.user_service import UserService
 from spiffworkflow_backend.services.workflow_execution_service import ExecutionStrategy
 from spiffworkflow_backend.services.workflow_execution_service import ExecutionStrategyNotConfiguredError
 from spiffworkflow_backend.services.workflow_execution_service import SkipOneExecutionStrategy
+from spiffworkflow_backend.services.workflow_execution_service import TaskChangeTracker
 from spiffworkflow_backend.services.workflow_execution_service import TaskModelSavingDelegate
 from spiffworkflow_backend.services.workflow_execution_service import TaskRunnability
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionService
@@ -168,13 +179,21 @@ class TaskDataBasedScriptEngineEnvironment(TaskDataEnvironment):  # type: ignore
         self._non_user_defined_keys = {"__annotations__"}
         super().__init__(environment_globals)
 
+    def evaluate(
+        self,
+        expression: str,
+        context: dict[str, Any],
+        external_context: dict[str, Any] | None = None,
+    ) -> Any:
+        return super().evaluate(CompiledCodeCacheService.compile(expression, "eval"), context, external_context)
+
     def execute(
         self,
         script: str,
         context: dict[str, Any],
         external_context: dict[str, Any] | None = None,
     ) -> bool:
-        super().execute(script, context, external_context)
+        super().execute(CompiledCodeCacheService.compile(script, "exec"), context, external_context)
         for key in self._non_user_defined_keys:
             if key in context:
                 context.pop(key)
@@ -222,7 +241,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
         state.update(external_context or {})
         state.update(self.state)
         state.update(context)
-        return eval(expression, state)  # noqa
+        return eval(CompiledCodeCacheService.compile(expression, "eval"), state)  # noqa
 
     def execute(
         self,
@@ -234,7 +253,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
         self.state.update(external_context or {})
         self.state.update(context)
         try:
-            exec(script, self.state)  # noqa
+            exec(CompiledCodeCacheService.compile(script, "exec"), self.state)  # noqa
             return True
         finally:
             # since the task data is not directly mutated when the script executes, need to determine which keys
@@ -249,6 +268,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
             # the task data needs to be updated with the current state so data references can be resolved properly.
             # the state will be removed later once the task is completed.
             context.update(self.state)
+            TaskChangeTracker.mark_data_changed(self)
 
     def user_defined_state(self, external_context: dict[str, Any] | None = None) -> dict[str, Any]:
         keys_to_filter = self.non_user_defined_keys
@@ -262,6 +282,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
 
     def clear_state(self) -> None:
         self.state = {}
+        TaskChangeTracker.mark_data_changed(self)
 
     def preserve_state(self, bpmn_process_instance: BpmnWorkflow) -> None:
         key = self.PYTHON_ENVIRONMENT_STATE_KEY
@@ -271,6 +292,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
     def restore_state(self, bpmn_process_instance: BpmnWorkflow) -> None:
         key = self.PYTHON_ENVIRONMENT_STATE_KEY
         self.state = bpmn_process_instance.data.get(key, {})
+        TaskChangeTracker.mark_data_changed(self)
 
     def finalize_result(self, bpmn_process_instance: BpmnWorkflow) -> None:
         bpmn_process_instance.data.update(self.user_defined_state())
@@ -283,6 +305,8 @@ class NonTaskDataBasedScriptEngineEnvironment(BasePythonScriptEngineEnvironment)
 
         self.state = {k: v for k, v in self.state.items() if k not in state_keys_to_remove}
         task.data = {k: v for k, v in task.data.items() if k in task_data_keys_to_keep}
+        TaskChangeTracker.mark_data_changed(self)
+        TaskChangeTracker.mark_data_changed(task)
 
         if hasattr(task.task_spec, "_result_variable"):
             result_variable = task.task_spec._result_variable(task)
@@ -337,7 +361,7 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
         environment = CustomScriptEngineEnvironment(default_globals)
         super().__init__(environment=environment)
 
-    def __get_augment_methods(self, task: SpiffTask | None) -> dict[str, Callable]:
+    def __get_script_attributes_context(self, task: SpiffTask | None) -> ScriptAttributesContext:
         tld = current_app.config.get("THREAD_LOCAL_DATA")
         process_model_identifier = None
         process_instance_id = None
@@ -346,22 +370,27 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
                 process_model_identifier = tld.process_model_identifier
             if hasattr(tld, "process_instance_id"):
                 process_instance_id = tld.process_instance_id
-        script_attributes_context = ScriptAttributesContext(
+        return ScriptAttributesContext(
             task=task,
             environment_identifier=current_app.config["ENV_IDENTIFIER"],
             process_instance_id=process_instance_id,
             process_model_identifier=process_model_identifier,
         )
-        return Script.generate_augmented_list(script_attributes_context)
+
+    def __get_augment_methods(self, external_context: dict[str, Any] | None) -> dict[str, Callable]:
+        # the script functions are shared so only copy them when something needs to be added
+        methods = Script.script_functions()
+        if external_context:
+            methods = {**methods, **external_context}
+        return methods
 
     def evaluate(self, task: SpiffTask, expression: str, external_context: dict[str, Any] | None = None) -> Any:
         """Evaluate the given expression, within the context of the given task and return the result."""
-        methods = self.__get_augment_methods(task)
-        if external_context:
-            methods.update(external_context)
+        methods = self.__get_augment_methods(external_context)
 
         try:
-            return super().evaluate(task, expression, external_context=methods)
+            with Script.with_script_attributes_context(self.__get_script_attributes_context(task)):
+                return super().evaluate(task, expression, external_context=methods)
         except Exception as exception:
             if task is None:
                 raise WorkflowException(
@@ -377,13 +406,13 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
     def execute(self, task: SpiffTask, script: str, external_context: Any = None) -> bool:
         try:
             # reset failing task just in case
-            methods = self.__get_augment_methods(task)
-            if external_context:
-                methods.update(external_context)
+            methods = self.__get_augment_methods(external_context)
 
             # do not run script if it is blank
             if script:
-                super().execute(task, script, methods)
+                with Script.with_script_attributes_context(self.__get_script_attributes_context(task)):
+                    super().execute(task, script, methods)
+                TaskChangeTracker.mark_data_changed(task)
             return True
         except WorkflowException as e:
             raise e
@@ -446,8 +475,8 @@ class ProcessInstanceProcessor:
         tld.process_model_identifier = f"{process_instance_model.process_model_identifier}"
 
         self.process_instance_model = process_instance_model
+        self.engine_step_timings = PhaseTimings()
         bpmn_process_spec = None
-        self.full_bpmn_process_dict: dict = {}
 
         # this caches the bpmn_process_definition_identifier and task_identifier back to the bpmn_process_id
         # in the database. This is to cut down on database queries while adding new tasks to the database.
@@ -475,7 +504,6 @@ class ProcessInstanceProcessor:
         try:
             (
                 self.bpmn_process_instance,
-                self.full_bpmn_process_dict,
                 self.bpmn_definition_to_task_definitions_mappings,
             ) = self.__get_bpmn_process_instance(
                 process_instance_model,
@@ -486,6 +514,13 @@ class ProcessInstanceProcessor:
             )
             self.set_script_engine(self.bpmn_process_instance, self._script_engine)
 
+            # tasks that came from the database do not need to be persisted again until they change
+            self.task_change_tracker: TaskChangeTracker | None = None
+            if current_app.config["SPIFFWORKFLOW_BACKEND_TASK_CHANGE_TRACKING_ENABLED"]:
+                self.task_change_tracker = TaskChangeTracker()
+                if process_instance_model.spiffworkflow_fully_initialized():
+                    self.task_change_tracker.record(self.bpmn_process_instance.get_tasks(), self.bpmn_process_instance)
+
         except MissingSpecError as ke:
             raise ApiError(
                 error_code="unexpected_process_instance_structure",
@@ -516,6 +551,7 @@ class ProcessInstanceProcessor:
             force_update_definitions=True,
         )
 
+        # the serializer modifies the dict it is given and this one belongs to the caller so copy all of it
         process_copy = copy.deepcopy(bpmn_process_dict)
         bpmn_process_instance = cls._serializer.from_dict(process_copy)
         bpmn_process_instance.script_engine = cls._default_script_engine
@@ -658,6 +694,82 @@ class ProcessInstanceProcessor:
                 task_definition.bpmn_identifier
             ] = task_definition.properties_json
 
+    @classmethod
+    def _set_definition_dicts_for_process_instance(
+        cls,
+        process_instance_model: ProcessInstanceModel,
+        spiff_bpmn_process_dict: dict,
+        bpmn_definition_to_task_definitions_mappings: dict,
+    ) -> bool:
+        """Sets the spec and subprocess_specs on the given dict and returns False if the definition could not be found."""
+        if process_instance_model.bpmn_process_definition_id is None:
+            return False
+        bpmn_process_definition = process_instance_model.bpmn_process_definition
+        if bpmn_process_definition is None:
+            return False
+
+        cache_entry = BpmnProcessDefinitionCacheService.get(bpmn_process_definition)
+        if cache_entry is not None:
+            spiff_bpmn_process_dict.update(cache_entry.definitions())
+            cls._set_bpmn_definition_mappings_from_cache_entry(cache_entry, bpmn_definition_to_task_definitions_mappings)
+            return True
+
+        definitions: dict = {
+            "spec": cls._get_definition_dict_for_bpmn_process_definition(
+                bpmn_process_definition,
+                bpmn_definition_to_task_definitions_mappings,
+            ),
+            "subprocess_specs": {},
+        }
+        cls._set_definition_dict_for_bpmn_subprocess_definitions(
+            bpmn_process_definition,
+            definitions,
+            bpmn_definition_to_task_definitions_mappings,
+        )
+        # the definitions are built from the properties_json of the models in the session and the serializer
+        # modifies the dicts it is given so hand it a copy. this also gives us what we need to cache.
+        definitions_json = json.dumps(definitions)
+        spiff_bpmn_process_dict.update(json.loads(definitions_json))
+
+        bpmn_process_definitions = []
+        task_definitions = []
+        for definition_mappings in bpmn_definition_to_task_definitions_mappings.values():
+            for key, db_model in definition_mappings.items():
+                if key == "bpmn_process_definition":
+                    bpmn_process_definitions.append(db_model)
+                else:
+                    task_definitions.append(db_model)
+        BpmnProcessDefinitionCacheService.set(
+            bpmn_process_definition,
+            definitions_json,
+            bpmn_process_definitions,
+            task_definitions,
+        )
+        return True
+
+    @classmethod
+    def _set_bpmn_definition_mappings_from_cache_entry(
+        cls,
+        cache_entry: BpmnProcessDefinitionCacheEntry,
+        bpmn_definition_to_task_definitions_mappings: dict,
+    ) -> None:
+        bpmn_identifiers_by_definition_id = {}
+        for detached_bpmn_process_definition in cache_entry.bpmn_process_definitions:
+            bpmn_process_definition = BpmnProcessDefinitionCacheService.merge_into_session(detached_bpmn_process_definition)
+            bpmn_identifiers_by_definition_id[bpmn_process_definition.id] = bpmn_process_definition.bpmn_identifier
+            cls._update_bpmn_definition_mappings(
+                bpmn_definition_to_task_definitions_mappings,
+                bpmn_process_definition.bpmn_identifier,
+                bpmn_process_definition=bpmn_process_definition,
+            )
+        for detached_task_definition in cache_entry.task_definitions:
+            task_definition = BpmnProcessDefinitionCacheService.merge_into_session(detached_task_definition)
+            cls._update_bpmn_definition_mappings(
+                bpmn_definition_to_task_definitions_mappings,
+                bpmn_identifiers_by_definition_id[task_definition.bpmn_process_definition_id],
+                task_definition=task_definition,
+            )
+
     @classmethod
     def _get_bpmn_process_dict(
         cls,
@@ -665,9 +777,10 @@ class ProcessInstanceProcessor:
         get_tasks: bool = False,
         include_task_data_for_completed_tasks: bool = False,
     ) -> dict:
-        json_data = JsonDataModel.query.filter_by(hash=bpmn_process.json_data_hash).first()
-        bpmn_process_dict = {"data": json_data.data, "tasks": {}}
-        bpmn_process_dict.update(bpmn_process.properties_json)
+        json_data_mappings = JsonDataModel.find_data_dicts_by_hashes([bpmn_process.json_data_hash])
+        bpmn_process_dict = {"data": json_data_mappings[bpmn_process.json_data_hash], "tasks": {}}
+        # this is small and can contain serialized objects like bpmn_events which the serializer modifies
+        bpmn_process_dict.update(copy.deepcopy(bpmn_process.properties_json))
         if get_tasks:
             tasks = TaskModel.query.filter_by(bpmn_process_id=bpmn_process.id).all()
             cls._get_tasks_dict(
@@ -714,16 +827,17 @@ class ProcessInstanceProcessor:
                 json_data_hashes.add(task.json_data_hash)
                 task_guids_to_add.add(task.guid)
 
-        json_data_records = JsonDataModel.query.filter(JsonDataModel.hash.in_(json_data_hashes)).all()  # type: ignore
-        json_data_mappings = {}
-        for json_data_record in json_data_records:
-            json_data_mappings[json_data_record.hash] = json_data_record.data
+        json_data_mappings = JsonDataModel.find_data_dicts_by_hashes(json_data_hashes)
         for task in tasks:
             tasks_dict = spiff_bpmn_process_dict["tasks"]
             if bpmn_subprocess_id_to_guid_mappings:
                 bpmn_subprocess_guid = bpmn_subprocess_id_to_guid_mappings[task.bpmn_process_id]
                 tasks_dict = spiff_bpmn_process_dict["subprocesses"][bpmn_subprocess_guid]["tasks"]
-            tasks_dict[task.guid] = task.properties_json
+            # copy so the serializer does not modify the properties_json on the task model in the session.
+            # internal_data is the only nested value the serializer can modify in place.
+            tasks_dict[task.guid] = dict(task.properties_json)
+            if tasks_dict[task.guid].get("internal_data"):
+                tasks_dict[task.guid]["internal_data"] = copy.deepcopy(tasks_dict[task.guid]["internal_data"])
             task_data = {}
             if task.guid in task_guids_to_add:
                 task_data = json_data_mappings[task.json_data_hash]
@@ -746,18 +860,12 @@ class ProcessInstanceProcessor:
             "subprocess_specs": {},
             "subprocesses": {},
         }
-        bpmn_process_definition = process_instance_model.bpmn_process_definition
-        if bpmn_process_definition is not None:
-            spiff_bpmn_process_dict["spec"] = cls._get_definition_dict_for_bpmn_process_definition(
-                bpmn_process_definition,
-                bpmn_definition_to_task_definitions_mappings,
-            )
-            cls._set_definition_dict_for_bpmn_subprocess_definitions(
-                bpmn_process_definition,
-                spiff_bpmn_process_dict,
-                bpmn_definition_to_task_definitions_mappings,
-            )
-
+        has_bpmn_process_definition = cls._set_definition_dicts_for_process_instance(
+            process_instance_model,
+            spiff_bpmn_process_dict,
+            bpmn_definition_to_task_definitions_mappings,
+        )
+        if has_bpmn_process_definition:
             bpmn_process = process_instance_model.bpmn_process
             if bpmn_process is not None:
                 single_bpmn_process_dict = cls._get_bpmn_process_dict(
@@ -826,8 +934,7 @@ class ProcessInstanceProcessor:
         subprocesses: IdToBpmnProcessSpecMapping | None = None,
         include_task_data_for_completed_tasks: bool = False,
         include_completed_subprocesses: bool = False,
-    ) -> tuple[BpmnWorkflow, dict, dict]:
-        full_bpmn_process_dict = {}
+    ) -> tuple[BpmnWorkflow, dict]:
         bpmn_definition_to_task_definitions_mappings: dict = {}
         if process_instance_model.spiffworkflow_fully_initialized():
             # turn off logging to avoid duplicated spiff logs
@@ -836,15 +943,15 @@ class ProcessInstanceProcessor:
             spiff_logger.setLevel(logging.WARNING)
 
             try:
+                # the assembled dict does not share anything with the models in the session
+                # so the serializer can take ownership of it without making a copy first
                 full_bpmn_process_dict = ProcessInstanceProcessor._get_full_bpmn_process_dict(
                     process_instance_model,
                     bpmn_definition_to_task_definitions_mappings,
                     include_completed_subprocesses=include_completed_subprocesses,
                     include_task_data_for_completed_tasks=include_task_data_for_completed_tasks,
                 )
-                # FIXME: the from_dict entrypoint in spiff will one day do this copy instead
-                process_copy = copy.deepcopy(full_bpmn_process_dict)
-                bpmn_process_instance = ProcessInstanceProcessor._serializer.from_dict(process_copy)
+                bpmn_process_instance = ProcessInstanceProcessor._serializer.from_dict(full_bpmn_process_dict)
                 bpmn_process_instance.get_tasks()
             except Exception as err:
                 raise err
@@ -855,7 +962,6 @@ class ProcessInstanceProcessor:
 
         return (
             bpmn_process_instance,
-            full_bpmn_process_dict,
             bpmn_definition_to_task_definitions_mappings,
         )
 
@@ -929,14 +1035,16 @@ class ProcessInstanceProcessor:
         #   metadata_extraction_process_model_version
         #     process_model_version_id
         #     metadata_extraction_id
-        process_model_info = ProcessModelService.get_process_model(self.process_instance_model.process_model_identifier)
-        metadata_extraction_paths = process_model_info.metadata_extraction_paths
+        metadata_extraction_paths = self.metadata_extraction_paths_for_process_model(
+            self.process_instance_model.process_model_identifier
+        )
         if metadata_extraction_paths is None:
             return
         if len(metadata_extraction_paths) <= 0:
             return
 
         current_data = self.get_current_data()
+        metadata = {}
         for metadata_extraction_path in metadata_extraction_paths:
             key = metadata_extraction_path["key"]
             path = metadata_extraction_path["path"]
@@ -950,18 +1058,46 @@ class ProcessInstanceProcessor:
                     break
 
             if data_for_key is not None:
-                pim = ProcessInstanceMetadataModel.query.filter_by(
-                    process_instance_id=self.process_instance_model.id,
-                    key=key,
-                ).first()
-                if pim is None:
-                    pim = ProcessInstanceMetadataModel(
-                        process_instance_id=self.process_instance_model.id,
-                        key=key,
-                    )
-                pim.value = str(data_for_key)[0:255]
-                db.session.add(pim)
-                db.session.commit()
+                metadata[key] = str(data_for_key)[0:255]
+
+        if len(metadata) == 0:
+            return
+
+        # only write the values that changed since most saves do not change any of them
+        existing_metadata = dict(
+            db.session.query(ProcessInstanceMetadataModel.key, ProcessInstanceMetadataModel.value)  # type: ignore
+            .filter(ProcessInstanceMetadataModel.process_instance_id == self.process_instance_model.id)
+            .all()
+        )
+        changed_metadata = {key: value for key, value in metadata.items() if existing_metadata.get(key) != value}
+        ProcessInstanceMetadataModel.insert_or_update_metadata(self.process_instance_model.id, changed_metadata)
+
+    @classmethod
+    def metadata_extraction_paths_for_process_model(cls, process_model_identifier: str) -> list[dict[str, str]] | None:
+        return cls.process_model_settings(process_model_identifier).metadata_extraction_paths
+
+    @classmethod
+    def process_model_settings(cls, process_model_identifier: str) -> ProcessModelSettingsCacheEntry:
+        """Only stats the process_model.json file instead of loading the process model when it has not changed."""
+        process_model_json_path = os.path.join(
+            FileSystemService.full_path_from_id(process_model_identifier), ProcessModelService.PROCESS_MODEL_JSON_FILE
+        )
+        process_model_json_mtime_ns = SpecCacheService.mtime_ns_for_file(process_model_json_path)
+        if process_model_json_mtime_ns is not None:
+            cache_entry = SpecCacheService.get_process_model_settings(process_model_identifier, process_model_json_mtime_ns)
+            if cache_entry is not None:
+                return cache_entry
+
+        process_model_info = ProcessModelService.get_process_model(process_model_identifier)
+        settings = ProcessModelSettingsCacheEntry(
+            metadata_extraction_paths=process_model_info.metadata_extraction_paths,
+            task_data_size_soft_limit_in_bytes=process_model_info.task_data_size_soft_limit_in_bytes,
+            task_data_size_hard_limit_in_bytes=process_model_info.task_data_size_hard_limit_in_bytes,
+            process_model_json_mtime_ns=process_model_json_mtime_ns or 0,
+        )
+        if process_model_json_mtime_ns is not None:
+            SpecCacheService.set_process_model_settings(process_model_identifier, settings)
+        return settings
 
     @classmethod
     def _store_bpmn_process_definition(
@@ -976,10 +1112,10 @@ class ProcessInstanceProcessor:
         process_bpmn_name = process_bpmn_properties["description"]
 
         bpmn_process_definition: BpmnProcessDefinitionModel | None = None
-        single_process_hash = sha256(json.dumps(process_bpmn_properties, sort_keys=True).encode("utf8")).hexdigest()
+        single_process_hash = content_hash(process_bpmn_properties)
         full_process_model_hash = None
         if full_bpmn_spec_dict is not None:
-            full_process_model_hash = sha256(json.dumps(full_bpmn_spec_dict, sort_keys=True).encode("utf8")).hexdigest()
+            full_process_model_hash = content_hash(full_bpmn_spec_dict)
             bpmn_process_definition = BpmnProcessDefinitionModel.query.filter_by(
                 full_process_model_hash=full_process_model_hash
             ).first()
@@ -1218,6 +1354,7 @@ class ProcessInstanceProcessor:
                 serializer=self._serializer,
                 process_instance=self.process_instance_model,
                 bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
+                task_change_tracker=self.task_change_tracker,
             )
             execution_strategy = SkipOneExecutionStrategy(task_model_delegate, {"spiff_task": spiff_task})
             self.do_engine_steps(save=True, execution_strategy=execution_strategy)
@@ -1307,10 +1444,18 @@ class ProcessInstanceProcessor:
             )
         return os.path.abspath(bpmn_file_full_path)
 
+    @staticmethod
+    def bpmn_file_full_path_if_resolvable(bpmn_process_identifier: str) -> str | None:
+        try:
+            return ProcessInstanceProcessor.bpmn_file_full_path_from_bpmn_process_identifier(bpmn_process_identifier)
+        except ApiError:
+            return None
+
     @staticmethod
     def update_spiff_parser_with_all_process_dependency_files(
         parser: SpiffBpmnParser,
         processed_identifiers: set[str] | None = None,
+        dependencies: SpecDependencies | None = None,
     ) -> None:
         if processed_identifiers is None:
             processed_identifiers = set()
@@ -1335,10 +1480,15 @@ class ProcessInstanceProcessor:
             dmn_file_glob = os.path.join(os.path.dirname(new_bpmn_file_full_path), "*.dmn")
             parser.add_dmn_files_by_glob(dmn_file_glob)
             processed_identifiers.add(bpmn_process_identifier)
+            if dependencies is not None:
+                dependencies.bpmn_file_paths_by_identifier[bpmn_process_identifier] = new_bpmn_file_full_path
+                dependencies.dmn_file_paths_by_glob[dmn_file_glob] = sorted(glob.glob(dmn_file_glob))
 
         if new_bpmn_files:
             parser.add_bpmn_files(new_bpmn_files)
-            ProcessInstanceProcessor.update_spiff_parser_with_all_process_dependency_files(parser, processed_identifiers)
+            ProcessInstanceProcessor.update_spiff_parser_with_all_process_dependency_files(
+                parser, processed_identifiers, dependencies=dependencies
+            )
 
     @staticmethod
     def get_spec(
@@ -1351,8 +1501,34 @@ class ProcessInstanceProcessor:
 
         process_id = process_id_to_run or process_model_info.primary_process_id
 
+        # only bpmn and dmn files affect the spec so those are all we need to read and digest
+        spec_file_data: dict[str, bytes] = {}
+        own_file_digests: dict[str, str] = {}
         for file in files:
+            if file.type not in [FileType.bpmn.value, FileType.dmn.value]:
+                continue
             data = SpecFileService.get_data(process_model_info, file.name)
+            spec_file_data[file.name] = data
+            own_file_digests[SpecFileService.full_file_path(process_model_info, file.name)] = SpecCacheService.digest(data)
+
+        if process_id:
+            spec_cache_entry = SpecCacheService.get(
+                process_model_info.id,
+                process_id,
+                own_file_digests,
+                bpmn_file_path_for_identifier=ProcessInstanceProcessor.bpmn_file_full_path_if_resolvable,
+            )
+            if spec_cache_entry is not None:
+                # hand out a copy of the mapping so callers cannot change what is in the cache
+                return (
+                    spec_cache_entry.bpmn_process_spec,
+                    IdToBpmnProcessSpecMapping(dict(spec_cache_entry.subprocesses)),
+                )
+
+        for file in files:
+            if file.name not in spec_file_data:
+                continue
+            data = spec_file_data[file.name]
             try:
                 if file.type == FileType.bpmn.value:
                     bpmn: etree.Element = SpecFileService.get_etree_from_xml_bytes(data)
@@ -1372,7 +1548,8 @@ class ProcessInstanceProcessor:
                     message=f"There is no primary BPMN process id defined for process_model {process_model_info.id}",
                 )
             )
-        ProcessInstanceProcessor.update_spiff_parser_with_all_process_dependency_files(parser)
+        dependencies = SpecDependencies()
+        ProcessInstanceProcessor.update_spiff_parser_with_all_process_dependency_files(parser, dependencies=dependencies)
 
         try:
             bpmn_process_spec = parser.get_spec(process_id)
@@ -1388,6 +1565,15 @@ class ProcessInstanceProcessor:
                 task_id=ve.id,
                 tag=ve.tag,
             ) from ve
+
+        SpecCacheService.set(
+            process_model_info.id,
+            process_id,
+            bpmn_process_spec,
+            dict(subprocesses),
+            own_file_digests=own_file_digests,
+            dependencies=dependencies,
+        )
         return (bpmn_process_spec, subprocesses)
 
     @staticmethod
@@ -1428,19 +1614,27 @@ class ProcessInstanceProcessor:
         execution_strategy_name: str | None = None,
         execution_strategy: ExecutionStrategy | None = None,
     ) -> TaskRunnability:
-        if self.process_instance_model.persistence_level != "none":
-            with ProcessInstanceQueueService.dequeued(self.process_instance_model):
-                # TODO: ideally we just lock in the execution service, but not sure
-                # about _add_bpmn_process_definitions and if that needs to happen in
-                # the same lock like it does on main
-                return self._do_engine_steps(exit_at, save, execution_strategy_name, execution_strategy)
-        else:
-            return self._do_engine_steps(
-                exit_at,
-                save=False,
-                execution_strategy_name=execution_strategy_name,
-                execution_strategy=execution_strategy,
-            )
+        # how long each part took is logged so it is easy to see which one got slower
+        self.engine_step_timings = PhaseTimings()
+        try:
+            if self.process_instance_model.persistence_level != "none":
+                with ExitStack() as dequeued_stack:
+                    with self.engine_step_timings.phase("lock"):
+                        dequeued_stack.enter_context(ProcessInstanceQueueService.dequeued(self.process_instance_model))
+                    # TODO: ideally we just lock in the execution service, but not sure
+                    # about _add_bpmn_process_definitions and if that needs to happen in
+                    # the same lock like it does on main
+                    task_runnability = self._do_engine_steps(exit_at, save, execution_strategy_name, execution_strategy)
+                return task_runnability
+            else:
+                return self._do_engine_steps(
+                    exit_at,
+                    save=False,
+                    execution_strategy_name=execution_strategy_name,
+                    execution_strategy=execution_strategy,
+                )
+        finally:
+            self._log_engine_step_timings()
 
     def _do_engine_steps(
         self,
@@ -1449,16 +1643,23 @@ class ProcessInstanceProcessor:
         execution_strategy_name: str | None = None,
         execution_strategy: ExecutionStrategy | None = None,
     ) -> TaskRunnability:
-        self._add_bpmn_process_definitions(
-            self.serialize(),
-            bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
-            process_instance_model=self.process_instance_model,
-        )
+        self.check_task_data_size()
+
+        with self.engine_step_timings.phase("definitions"):
+            self.preserve_script_engine_state()
+            # definitions are only stored once so only serialize the spec when they have not been
+            if not self.process_instance_model.spiffworkflow_fully_initialized():
+                self._add_bpmn_process_definitions(
+                    self.serialize_spec(),
+                    bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
+                    process_instance_model=self.process_instance_model,
+                )
 
         task_model_delegate = TaskModelSavingDelegate(
             serializer=self._serializer,
             process_instance=self.process_instance_model,
             bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
+            task_change_tracker=self.task_change_tracker,
         )
 
         if execution_strategy is None:
@@ -1476,11 +1677,23 @@ class ProcessInstanceProcessor:
             execution_strategy,
             self._script_engine.environment.finalize_result,
             self.save,
+            phase_timings=self.engine_step_timings,
         )
         task_runnability = execution_service.run_and_save(exit_at, save)
         self.check_all_tasks()
         return task_runnability
 
+    def _log_engine_step_timings(self) -> None:
+        message = (
+            f"Engine step timings in seconds for process instance {self.process_instance_model.id}: "
+            f"{self.engine_step_timings.summary()}"
+        )
+        slow_threshold = current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_SLOW_LOG_THRESHOLD_IN_SECONDS"]
+        if self.engine_step_timings.total_in_seconds() >= slow_threshold:
+            current_app.logger.info(message)
+        else:
+            current_app.logger.debug(message)
+
     @classmethod
     def get_tasks_with_data(cls, bpmn_process_instance: BpmnWorkflow) -> list[SpiffTask]:
         return [task for task in bpmn_process_instance.get_tasks(state=TaskState.FINISHED_MASK) if len(task.data) > 0]
@@ -1504,26 +1717,61 @@ class ProcessInstanceProcessor:
         except Exception:
             return 0
 
-    def check_task_data_size(self) -> None:
-        task_data_len = self.get_task_data_size(self.bpmn_process_instance)
+    def task_data_size(self) -> int:
+        """Returns the size that is kept up to date as tasks are saved.
 
-        # Not sure what the number here should be but this now matches the mysql
-        # max_allowed_packet variable on dev - 1073741824
-        task_data_limit = 1024**3
+        Instances that were started before sizes were tracked fall back to serializing all of their task data.
+        """
+        if self.process_instance_model.task_data_size is not None:
+            return self.process_instance_model.task_data_size
+        return self.get_task_data_size(self.bpmn_process_instance)
+
+    def task_data_size_limits(self) -> tuple[int, int]:
+        """Returns the soft and hard limits on the task data size for this instance. 0 means there is no limit."""
+        soft_limit = current_app.config["SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_SOFT_LIMIT_IN_BYTES"]
+        hard_limit = current_app.config["SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_HARD_LIMIT_IN_BYTES"]
+        try:
+            settings = self.process_model_settings(self.process_instance_model.process_model_identifier)
+        except ProcessEntityNotFoundError:
+            # instances can outlive their process models and should still be able to use the defaults
+            return (soft_limit, hard_limit)
+        if settings.task_data_size_soft_limit_in_bytes is not None:
+            soft_limit = settings.task_data_size_soft_limit_in_bytes
+        if settings.task_data_size_hard_limit_in_bytes is not None:
+            hard_limit = settings.task_data_size_hard_limit_in_bytes
+        return (soft_limit, hard_limit)
 
-        if task_data_len > task_data_limit:
+    def check_task_data_size(self) -> None:
+        task_data_len = self.task_data_size()
+        soft_limit, hard_limit = self.task_data_size_limits()
+
+        if hard_limit > 0 and task_data_len > hard_limit:
             raise (
                 ApiError(
                     error_code="task_data_size_exceeded",
-                    message=f"Maximum task data size of {task_data_limit} exceeded.",
+                    message=f"Maximum task data size of {hard_limit} exceeded.",
                 )
             )
+        if soft_limit > 0 and task_data_len > soft_limit:
+            current_app.logger.warning(
+                f"Task data size of {task_data_len} for process instance {self.process_instance_model.id} "
+                f"is over the soft limit of {soft_limit}."
+            )
 
     def serialize(self) -> dict:
         self.check_task_data_size()
         self.preserve_script_engine_state()
         return self._serializer.to_dict(self.bpmn_process_instance)  # type: ignore
 
+    def serialize_spec(self) -> dict:
+        """Returns only the spec and subprocess_specs portions of serialize which is all that definitions are built from."""
+        return {
+            "spec": self._serializer.to_dict(self.bpmn_process_instance.spec),
+            "subprocess_specs": {
+                str(name): self._serializer.to_dict(spec) for name, spec in self.bpmn_process_instance.subprocess_specs.items()
+            },
+        }
+
     def next_user_tasks(self) -> list[SpiffTask]:
         return self.bpmn_process_instance.get_tasks(state=TaskState.READY, manual=True)  # type: ignore
 
@@ -1777,6 +2025,7 @@ class ProcessInstanceProcessor:
         ).all()
         for task in tasks_no_longer_in_spiff:
             db.session.delete(task)
+        TaskService.remove_task_data_sizes_from_process_instance(self.process_instance_model, tasks_no_longer_in_spiff)
 
         self.save()
 
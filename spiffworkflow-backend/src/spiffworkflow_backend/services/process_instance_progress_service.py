@@ -0,0 +1,186 @@
+import threading
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
+import redis
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+
+PROCESS_INSTANCE_PROGRESS_BACKENDS = ["local", "redis"]
+PENDING_PROGRESS_SESSION_INFO_KEY = "process_instance_progress_ids"
+
+
+class UnknownProcessInstanceProgressBackendError(Exception):
+    pass
+
+
+class ProcessInstanceProgressSubscription(ABC):
+    """Receives progress notifications for one process instance.
+
+    Anything published after the subscription was created is remembered until the next call to wait.
+    """
+
+    @abstractmethod
+    def wait(self, timeout: float) -> bool:
+        """Returns True as soon as progress was published or False if the timeout passed without any."""
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class LocalProcessInstanceProgressSubscription(ProcessInstanceProgressSubscription):
+    def __init__(self, backend: "LocalProcessInstanceProgressBackend", process_instance_id: int) -> None:
+        self.backend = backend
+        self.process_instance_id = process_instance_id
+        self.last_seen_version = backend.version(process_instance_id)
+        self.closed = False
+
+    def wait(self, timeout: float) -> bool:
+        with self.backend.condition:
+            changed = self.backend.condition.wait_for(
+                lambda: self.backend.version(self.process_instance_id) != self.last_seen_version, timeout=timeout
+            )
+            self.last_seen_version = self.backend.version(self.process_instance_id)
+        return changed
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.backend.unsubscribe(self.process_instance_id)
+
+
+class LocalProcessInstanceProgressBackend:
+    """Only sees progress published in this python process. Good for tests and when everything runs in one process."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        # only process instances that someone is subscribed to are tracked so these do not grow forever
+        self.versions: dict[int, int] = {}
+        self.subscriber_counts: dict[int, int] = {}
+
+    def version(self, process_instance_id: int) -> int:
+        return self.versions.get(process_instance_id, 0)
+
+    def publish(self, process_instance_id: int) -> None:
+        with self.condition:
+            if process_instance_id in self.subscriber_counts:
+                self.versions[process_instance_id] = self.version(process_instance_id) + 1
+                self.condition.notify_all()
+
+    def subscribe(self, process_instance_id: int) -> ProcessInstanceProgressSubscription:
+        with self.condition:
+            self.subscriber_counts[process_instance_id] = self.subscriber_counts.get(process_instance_id, 0) + 1
+            return LocalProcessInstanceProgressSubscription(self, process_instance_id)
+
+    def unsubscribe(self, process_instance_id: int) -> None:
+        with self.condition:
+            self.subscriber_counts[process_instance_id] -= 1
+            if self.subscriber_counts[process_instance_id] == 0:
+                del self.subscriber_counts[process_instance_id]
+                self.versions.pop(process_instance_id, None)
+
+
+class RedisProcessInstanceProgressSubscription(ProcessInstanceProgressSubscription):
+    def __init__(self, client: Any, channel: str) -> None:
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def wait(self, timeout: float) -> bool:
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return False
+        # several tasks may have completed since we last looked. one reload covers all of them.
+        while self.pubsub.get_message(timeout=0) is not None:
+            pass
+        return True
+
+    def close(self) -> None:
+        self.pubsub.close()
+
+
+class RedisProcessInstanceProgressBackend:
+    """Uses redis pub/sub so web processes see progress made by background workers in other processes."""
+
+    def __init__(self, url: str) -> None:
+        self.client = redis.Redis.from_url(url)
+
+    @classmethod
+    def channel(cls, process_instance_id: int) -> str:
+        return f"spiffworkflow_backend:process_instance_progress:{process_instance_id}"
+
+    def publish(self, process_instance_id: int) -> None:
+        self.client.publish(self.channel(process_instance_id), "progress")
+
+    def subscribe(self, process_instance_id: int) -> ProcessInstanceProgressSubscription:
+        return RedisProcessInstanceProgressSubscription(self.client, self.channel(process_instance_id))
+
+
+class ProcessInstanceProgressService:
+    """Lets things like the interstitial page wait for a process instance to make progress instead of polling the db.
+
+    Workers call notify_progress when they complete tasks or release a process instance. The notification is
+    published once the session commits so subscribers never wake up before they can see the new state.
+    """
+
+    _lock = threading.Lock()
+    _backends: dict[str, Any] = {}
+
+    @classmethod
+    def backend(cls) -> Any:
+        backend_name = current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_PROGRESS_BACKEND"]
+        if backend_name not in PROCESS_INSTANCE_PROGRESS_BACKENDS:
+            raise UnknownProcessInstanceProgressBackendError(
+                f"Unknown process instance progress backend: '{backend_name}'. "
+                f"Valid backends are: {PROCESS_INSTANCE_PROGRESS_BACKENDS}"
+            )
+        with cls._lock:
+            if backend_name not in cls._backends:
+                if backend_name == "redis":
+                    url = (
+                        current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_PROGRESS_REDIS_URL"]
+                        or current_app.config["SPIFFWORKFLOW_BACKEND_CELERY_BROKER_URL"]
+                    )
+                    cls._backends[backend_name] = RedisProcessInstanceProgressBackend(url)
+                else:
+                    cls._backends[backend_name] = LocalProcessInstanceProgressBackend()
+            return cls._backends[backend_name]
+
+    @classmethod
+    def notify_progress(cls, process_instance_id: int) -> None:
+        """Publishes progress for the process instance after the current db session commits.
+
+        The notification belongs to the current transaction and is dropped if it rolls back. A transaction is begun
+        if there is none yet since rolling back a session that has not begun one does not fire after_rollback.
+        """
+        session = db.session()
+        if not session.in_transaction():
+            session.begin()
+        session.info.setdefault(PENDING_PROGRESS_SESSION_INFO_KEY, set()).add(process_instance_id)
+
+    @classmethod
+    def publish(cls, process_instance_id: int) -> None:
+        try:
+            cls.backend().publish(process_instance_id)
+        except Exception as exception:
+            # subscribers fall back to checking the db so a failed publish only slows them down
+            current_app.logger.warning(f"Could not publish progress for process instance {process_instance_id}: {exception}")
+
+    @classmethod
+    def subscribe(cls, process_instance_id: int) -> ProcessInstanceProgressSubscription:
+        return cls.backend().subscribe(process_instance_id)  # type: ignore
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_progress(session: Session) -> None:
+    for process_instance_id in session.info.pop(PENDING_PROGRESS_SESSION_INFO_KEY, set()):
+        ProcessInstanceProgressService.publish(process_instance_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_progress(session: Session) -> None:
+    session.info.pop(PENDING_PROGRESS_SESSION_INFO_KEY, None)
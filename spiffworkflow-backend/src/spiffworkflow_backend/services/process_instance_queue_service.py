@@ -1,6 +1,15 @@
 import contextlib
+import threading
 import time
 from collections.abc import Generator
+from typing import Any
+
+from sqlalchemy import and_
+from sqlalchemy import case
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
 
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
@@ -9,6 +18,7 @@ from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQ
 from spiffworkflow_backend.services.error_handling_service import ErrorHandlingService
 from spiffworkflow_backend.services.process_instance_lock_service import ExpectedLockNotFoundError
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_progress_service import ProcessInstanceProgressService
 from spiffworkflow_backend.services.process_instance_tmp_service import ProcessInstanceTmpService
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionServiceError
 
@@ -22,6 +32,10 @@ class ProcessInstanceIsAlreadyLockedError(Exception):
 
 
 class ProcessInstanceQueueService:
+    # lets things in this process like the ProcessInstanceQueueDispatcher wait for entries to be enqueued instead of polling
+    _enqueued_condition = threading.Condition()
+    _enqueued_generation = 0
+
     @classmethod
     def _configure_and_save_queue_entry(
         cls, process_instance: ProcessInstanceModel, queue_entry: ProcessInstanceQueueModel
@@ -32,7 +46,27 @@ class ProcessInstanceQueueService:
         queue_entry.locked_at_in_seconds = None
 
         db.session.add(queue_entry)
+        # things watching the process instance need to know it was released even if no tasks completed
+        ProcessInstanceProgressService.notify_progress(process_instance.id)
         db.session.commit()
+        cls._notify_enqueued()
+
+    @classmethod
+    def _notify_enqueued(cls) -> None:
+        with cls._enqueued_condition:
+            cls._enqueued_generation += 1
+            cls._enqueued_condition.notify_all()
+
+    @classmethod
+    def enqueued_generation(cls) -> int:
+        """Returns a number that changes every time something is enqueued in this process."""
+        return cls._enqueued_generation
+
+    @classmethod
+    def wait_for_enqueued(cls, generation: int, timeout: float) -> None:
+        """Waits until something is enqueued after enqueued_generation returned the given generation or the timeout passes."""
+        with cls._enqueued_condition:
+            cls._enqueued_condition.wait_for(lambda: cls._enqueued_generation != generation, timeout=timeout)
 
     @classmethod
     def enqueue_new_process_instance(cls, process_instance: ProcessInstanceModel, run_at_in_seconds: int) -> None:
@@ -164,3 +198,207 @@ class ProcessInstanceQueueService:
         queue_entries = cls.entries_with_status(status_value, None, run_at_in_seconds_threshold, min_age_in_seconds)
         ids_with_status = [entry.process_instance_id for entry in queue_entries]
         return ids_with_status
+
+    @classmethod
+    def dequeue_many(
+        cls,
+        n: int,
+        status_value: str,
+        locked_by: str | None = None,
+        run_at_in_seconds_threshold: int | None = None,
+        min_age_in_seconds: int = 0,
+    ) -> list[ProcessInstanceQueueModel]:
+        """Locks up to n unlocked entries with the given status in a single statement and returns them.
+
+        The claimed process instances are registered with the ProcessInstanceLockService for this thread, so dequeued
+        reenters their locks instead of taking them again. Release them with enqueue_many.
+        """
+        current_time = round(time.time())
+        if run_at_in_seconds_threshold is None:
+            run_at_in_seconds_threshold = current_time
+        return cls._claim_entries(
+            and_(
+                ProcessInstanceQueueModel.locked_by.is_(None),  # type: ignore
+                ProcessInstanceQueueModel.status == status_value,
+                ProcessInstanceQueueModel.updated_at_in_seconds <= current_time - min_age_in_seconds,
+                ProcessInstanceQueueModel.run_at_in_seconds <= run_at_in_seconds_threshold,
+            ),
+            n,
+            locked_by or ProcessInstanceLockService.locked_by(),
+            current_time,
+        )
+
+    @classmethod
+    def enqueue_many(cls, process_instances: list[ProcessInstanceModel]) -> None:
+        """Unlocks process instances claimed with dequeue_many in a single statement.
+
+        This does the same thing as _enqueue does for one process instance. The queue entry status is set
+        from each process instance so make sure they are not stale.
+        """
+        queue_entry_ids = []
+        status_by_process_instance_id = {}
+        for process_instance in process_instances:
+            queue_entry_ids.append(ProcessInstanceLockService.unlock(process_instance.id))
+            status_by_process_instance_id[process_instance.id] = process_instance.status
+        if len(queue_entry_ids) == 0:
+            return
+
+        current_time = round(time.time())
+        db.session.execute(
+            update(ProcessInstanceQueueModel)
+            .where(ProcessInstanceQueueModel.id.in_(queue_entry_ids))  # type: ignore
+            .values(
+                priority=2,
+                status=case(status_by_process_instance_id, value=ProcessInstanceQueueModel.process_instance_id),
+                locked_by=None,
+                locked_at_in_seconds=None,
+                run_at_in_seconds=case(
+                    (ProcessInstanceQueueModel.run_at_in_seconds < current_time, current_time),  # type: ignore
+                    else_=ProcessInstanceQueueModel.run_at_in_seconds,
+                ),
+                updated_at_in_seconds=current_time,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        for process_instance_id in status_by_process_instance_id:
+            ProcessInstanceProgressService.notify_progress(process_instance_id)
+        db.session.commit()
+        cls._notify_enqueued()
+
+    @classmethod
+    def claim_ready_entries(cls, min_age_in_seconds_by_status: dict[str, int], limit: int) -> list[ProcessInstanceQueueModel]:
+        """Locks up to limit unlocked entries that are ready to run and returns them.
+
+        Unlike dequeue_many this does not register the locks with the ProcessInstanceLockService since the
+        entries are handed to other threads to run.
+        """
+        current_time = round(time.time())
+        return cls._claim_entries(
+            and_(
+                cls._ready_entries_filter(min_age_in_seconds_by_status, current_time),
+                ProcessInstanceQueueModel.run_at_in_seconds <= current_time,
+            ),
+            limit,
+            ProcessInstanceLockService.locked_by(),
+            current_time,
+            register_locks=False,
+        )
+
+    @classmethod
+    def _claim_entries(
+        cls,
+        entries_filter: Any,
+        limit: int,
+        locked_by: str,
+        current_time: int,
+        register_locks: bool = True,
+    ) -> list[ProcessInstanceQueueModel]:
+        """Sets locked_by on up to limit unlocked entries matching the filter in one update statement.
+
+        Entries are claimed in priority and then run_at_in_seconds order. On postgres and mysql, rows that another
+        worker is in the middle of claiming are skipped instead of waited on. mysql does not allow selecting from the
+        table being updated in a subquery so the candidate ids are selected first and stay locked until the commit.
+        Everywhere, the update only touches rows that are still unlocked so an entry is never claimed by two workers.
+        """
+        if limit < 1:
+            return []
+        unlocked = ProcessInstanceQueueModel.locked_by.is_(None)  # type: ignore
+        dialect = db.session.get_bind().dialect
+        candidate_ids_query = (
+            select(ProcessInstanceQueueModel.id)  # type: ignore
+            .where(entries_filter)
+            .order_by(
+                ProcessInstanceQueueModel.priority,
+                ProcessInstanceQueueModel.run_at_in_seconds,
+                ProcessInstanceQueueModel.id,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        candidate_ids: Any = candidate_ids_query
+        if dialect.name == "mysql":
+            # the rows selected for update stay locked until the commit below so nothing else claims them meanwhile
+            candidate_ids = [row.id for row in db.session.execute(candidate_ids_query)]
+        statement = (
+            update(ProcessInstanceQueueModel)
+            .where(ProcessInstanceQueueModel.id.in_(candidate_ids), unlocked)  # type: ignore
+            .values(locked_by=locked_by, locked_at_in_seconds=current_time)
+            .execution_options(synchronize_session=False)
+        )
+        if dialect.update_returning:
+            claimed_ids = {row.id for row in db.session.execute(statement.returning(ProcessInstanceQueueModel.id))}  # type: ignore
+        else:
+            # without returning, the rows we claimed are the ones locked by us now that were not before
+            previously_locked_ids = cls._ids_locked_by(locked_by)
+            db.session.execute(statement)
+            claimed_ids = cls._ids_locked_by(locked_by) - previously_locked_ids
+        db.session.commit()
+        if len(claimed_ids) == 0:
+            return []
+
+        queue_entries: list[ProcessInstanceQueueModel] = (
+            db.session.query(ProcessInstanceQueueModel)
+            .filter(ProcessInstanceQueueModel.id.in_(claimed_ids))  # type: ignore
+            .order_by(
+                ProcessInstanceQueueModel.priority,
+                ProcessInstanceQueueModel.run_at_in_seconds,
+                ProcessInstanceQueueModel.id,
+            )
+            .all()
+        )
+        if register_locks:
+            for queue_entry in queue_entries:
+                ProcessInstanceLockService.lock(queue_entry.process_instance_id, queue_entry)
+        return queue_entries
+
+    @classmethod
+    def _ids_locked_by(cls, locked_by: str) -> set[int]:
+        rows = db.session.query(ProcessInstanceQueueModel.id).filter(ProcessInstanceQueueModel.locked_by == locked_by).all()  # type: ignore
+        return {row.id for row in rows}
+
+    @classmethod
+    def seconds_until_next_ready_entry(cls, min_age_in_seconds_by_status: dict[str, int]) -> float | None:
+        """Returns how long until an unlocked entry becomes ready to claim or None if there are no unlocked entries."""
+        # rounded the same way claim_ready_entries rounds it so an entry it would claim is reported as ready now
+        current_time = round(time.time())
+        next_ready_times = []
+        for status_value, min_age_in_seconds in min_age_in_seconds_by_status.items():
+            old_enough_at = ProcessInstanceQueueModel.updated_at_in_seconds + min_age_in_seconds
+            next_ready_time: float | None = (
+                db.session.query(
+                    func.min(
+                        case(
+                            (  # type: ignore
+                                ProcessInstanceQueueModel.run_at_in_seconds > old_enough_at,
+                                ProcessInstanceQueueModel.run_at_in_seconds,
+                            ),
+                            else_=old_enough_at,
+                        )
+                    )
+                )
+                .filter(
+                    ProcessInstanceQueueModel.status == status_value,
+                    ProcessInstanceQueueModel.locked_by.is_(None),  # type: ignore
+                )
+                .scalar()
+            )
+            if next_ready_time is not None:
+                next_ready_times.append(next_ready_time)
+        if len(next_ready_times) == 0:
+            return None
+        return max(0.0, min(next_ready_times) - current_time)
+
+    @classmethod
+    def _ready_entries_filter(cls, min_age_in_seconds_by_status: dict[str, int], current_time: int) -> Any:
+        return and_(
+            ProcessInstanceQueueModel.locked_by.is_(None),  # type: ignore
+            or_(
+                *[
+                    and_(
+                        ProcessInstanceQueueModel.status == status_value,
+                        ProcessInstanceQueueModel.updated_at_in_seconds <= current_time - min_age_in_seconds,
+                    )
+                    for status_value, min_age_in_seconds in min_age_in_seconds_by_status.items()
+                ]
+            ),
+        )
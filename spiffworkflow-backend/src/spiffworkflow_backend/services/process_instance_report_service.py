@@ -1,15 +1,26 @@
+import base64
 import copy
+import json
 import re
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Generator
+from hashlib import sha256
+from math import ceil
 from typing import Any
 
 import sqlalchemy
 from flask import current_app
 from flask_sqlalchemy.query import Query
 from sqlalchemy import and_
+from sqlalchemy import event
 from sqlalchemy import func
 from sqlalchemy import or_
+from sqlalchemy.orm import Mapper
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import aliased
+from sqlalchemy.orm import object_session
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.util import AliasedClass
 
@@ -30,6 +41,9 @@ from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
 
+PROCESS_INSTANCE_REPORT_TOTAL_COUNT_MODES = ["exact", "cached"]
+PROCESS_INSTANCES_ADDED_OR_REMOVED_SESSION_INFO_KEY = "process_instances_added_or_removed"
+
 
 class ProcessInstanceReportNotFoundError(Exception):
     pass
@@ -44,8 +58,16 @@ class ProcessInstanceReportCannotBeRunError(Exception):
 
 
 class ProcessInstanceReportService:
+    # compiled count query hash -> (total, time it was counted)
+    _total_count_cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+    _total_count_cache_lock = threading.Lock()
+
     @classmethod
     def system_metadata_map(cls, metadata_key: str) -> ReportMetadata | None:
+        return cls.system_metadata_maps().get(metadata_key)
+
+    @classmethod
+    def system_metadata_maps(cls) -> dict[str, ReportMetadata]:
         # TODO replace with system reports that are loaded on launch (or similar)
         terminal_status_values = ",".join(ProcessInstanceModel.terminal_statuses())
         non_terminal_status_values = ",".join(ProcessInstanceModel.non_terminal_statuses())
@@ -165,7 +187,7 @@ class ProcessInstanceReportService:
             "order_by": ["-start_in_seconds", "-id"],
         }
 
-        temp_system_metadata_map = {
+        temp_system_metadata_map: dict[str, ReportMetadata] = {
             "default": default,
             "system_report_completed_instances_initiated_by_me": system_report_completed_instances_initiated_by_me,
             "system_report_completed_instances_with_tasks_completed_by_me": (
@@ -176,10 +198,7 @@ class ProcessInstanceReportService:
             "system_report_in_progress_instances_with_tasks_for_me": system_report_in_progress_instances_with_tasks_for_me,
             "system_report_in_progress_instances_with_tasks": system_report_in_progress_instances_with_tasks,
         }
-        if metadata_key not in temp_system_metadata_map:
-            return None
-        return_value: ReportMetadata = temp_system_metadata_map[metadata_key]
-        return return_value
+        return temp_system_metadata_map
 
     @classmethod
     def process_instance_metadata_as_columns(cls, process_model_identifier: str | None = None) -> list[ReportMetadataColumn]:
@@ -280,32 +299,51 @@ class ProcessInstanceReportService:
             "potential_owner_usernames",
             "assigned_user_group_identifier",
         ]
-        for process_instance_dict in process_instance_dicts:
-            assigned_user = aliased(UserModel)
-            human_task_query = (
-                HumanTaskModel.query.filter_by(process_instance_id=process_instance_dict["id"], completed=False)
-                .group_by(HumanTaskModel.id)
-                .outerjoin(
-                    HumanTaskUserModel,
-                    HumanTaskModel.id == HumanTaskUserModel.human_task_id,
-                )
-                .outerjoin(assigned_user, assigned_user.id == HumanTaskUserModel.user_id)
-                .outerjoin(GroupModel, GroupModel.id == HumanTaskModel.lane_assignment_id)
+        process_instance_ids = [process_instance_dict["id"] for process_instance_dict in process_instance_dicts]
+        if len(process_instance_ids) == 0:
+            return process_instance_dicts
+
+        # find the oldest open human task for every process instance on the page at once
+        oldest_human_task_ids_query = (
+            db.session.query(func.min(HumanTaskModel.id))
+            .filter(
+                HumanTaskModel.process_instance_id.in_(process_instance_ids),  # type: ignore
+                HumanTaskModel.completed == False,  # noqa: E712
             )
-            if restrict_human_tasks_to_user is not None:
-                human_task_query = human_task_query.filter(HumanTaskUserModel.user_id == restrict_human_tasks_to_user.id)
-            potential_owner_usernames_from_group_concat_or_similar = cls._get_potential_owner_usernames(assigned_user)
-            human_task = (
-                human_task_query.add_columns(
-                    HumanTaskModel.task_id,
-                    HumanTaskModel.task_name,
-                    HumanTaskModel.task_title,
-                    func.max(GroupModel.identifier).label("assigned_user_group_identifier"),
-                    potential_owner_usernames_from_group_concat_or_similar,
-                )
-                .order_by(HumanTaskModel.id.asc())  # type: ignore
-                .first()
+            .group_by(HumanTaskModel.process_instance_id)
+        )
+        if restrict_human_tasks_to_user is not None:
+            oldest_human_task_ids_query = oldest_human_task_ids_query.join(
+                HumanTaskUserModel,
+                HumanTaskModel.id == HumanTaskUserModel.human_task_id,
+            ).filter(HumanTaskUserModel.user_id == restrict_human_tasks_to_user.id)
+
+        assigned_user = aliased(UserModel)
+        human_task_query = (
+            HumanTaskModel.query.filter(HumanTaskModel.id.in_(oldest_human_task_ids_query.scalar_subquery()))  # type: ignore
+            .group_by(HumanTaskModel.id)
+            .outerjoin(
+                HumanTaskUserModel,
+                HumanTaskModel.id == HumanTaskUserModel.human_task_id,
             )
+            .outerjoin(assigned_user, assigned_user.id == HumanTaskUserModel.user_id)
+            .outerjoin(GroupModel, GroupModel.id == HumanTaskModel.lane_assignment_id)
+        )
+        if restrict_human_tasks_to_user is not None:
+            human_task_query = human_task_query.filter(HumanTaskUserModel.user_id == restrict_human_tasks_to_user.id)
+        potential_owner_usernames_from_group_concat_or_similar = cls._get_potential_owner_usernames(assigned_user)
+        human_tasks = human_task_query.add_columns(
+            HumanTaskModel.process_instance_id,
+            HumanTaskModel.task_id,
+            HumanTaskModel.task_name,
+            HumanTaskModel.task_title,
+            func.max(GroupModel.identifier).label("assigned_user_group_identifier"),
+            potential_owner_usernames_from_group_concat_or_similar,
+        ).all()
+
+        human_tasks_by_process_instance_id = {human_task.process_instance_id: human_task for human_task in human_tasks}
+        for process_instance_dict in process_instance_dicts:
+            human_task = human_tasks_by_process_instance_id.get(process_instance_dict["id"])
             if human_task is not None:
                 for field in fields_to_return:
                     process_instance_dict[field] = getattr(human_task, field)
@@ -564,8 +602,133 @@ class ProcessInstanceReportService:
                     order_by_query_array.append(func.max(instance_metadata_aliases[attribute].value).desc())
                 else:
                     order_by_query_array.append(func.max(instance_metadata_aliases[attribute].value).asc())
+
+        # ties are always broken by id so pages do not overlap and cursors have a single place to continue from
+        if "id" not in [re.sub("^-", "", o) for o in order_by_array]:
+            descending = len(order_by_array) > 0 and order_by_array[-1].startswith("-")
+            order_by_query_array.append(ProcessInstanceModel.id.desc() if descending else ProcessInstanceModel.id.asc())  # type: ignore
         return order_by_query_array
 
+    @classmethod
+    def keyset_order_by_columns(cls, report_metadata: ReportMetadata) -> list[tuple[str, bool]] | None:
+        """Returns the (column name, descending) pairs the report is ordered by.
+
+        Returns None if it is ordered by metadata since those can only be compared after grouping.
+        """
+        order_by_array = report_metadata["order_by"]
+        if len(order_by_array) < 1:
+            order_by_array = ProcessInstanceReportModel.default_order_by()
+        order_by_columns = []
+        for order_by_option in order_by_array:
+            attribute = re.sub("^-", "", order_by_option)
+            if attribute in cls.process_instance_stock_columns():
+                order_by_columns.append((attribute, order_by_option.startswith("-")))
+            elif attribute not in cls.non_metadata_columns():
+                return None
+        if "id" not in [attribute for attribute, _ in order_by_columns]:
+            descending = len(order_by_array) > 0 and order_by_array[-1].startswith("-")
+            order_by_columns.append(("id", descending))
+        return order_by_columns
+
+    @classmethod
+    def encode_cursor(cls, order_by_columns: list[tuple[str, bool]], process_instance: ProcessInstanceModel) -> str:
+        cursor = {
+            "order_by": order_by_columns,
+            "values": [getattr(process_instance, attribute) for attribute, _ in order_by_columns],
+        }
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf8")).decode("utf8")
+
+    @classmethod
+    def decode_cursor(cls, cursor: str, order_by_columns: list[tuple[str, bool]]) -> list[Any]:
+        try:
+            decoded_cursor = json.loads(base64.urlsafe_b64decode(cursor.encode("utf8")))
+            order_by = [tuple(order_by_column) for order_by_column in decoded_cursor["order_by"]]
+            values: list[Any] = decoded_cursor["values"]
+        except (ValueError, TypeError, KeyError) as exception:
+            raise ApiError(
+                error_code="process_instance_report_cursor_invalid",
+                message=f"The cursor could not be read: {exception}",
+                status_code=400,
+            ) from exception
+        if order_by != order_by_columns or len(values) != len(order_by_columns):
+            raise ApiError(
+                error_code="process_instance_report_cursor_invalid",
+                message="The cursor was created for a report with a different order.",
+                status_code=400,
+            )
+        return values
+
+    @classmethod
+    def keyset_filter(cls, order_by_columns: list[tuple[str, bool]], cursor_values: list[Any]) -> Any:
+        """Matches the rows that sort after the cursor values in the given order.
+
+        Postgres sorts nulls as larger than any value while mysql and sqlite sort them as smaller.
+        """
+        nulls_are_largest = db.engine.dialect.name == "postgresql"
+        or_conditions = []
+        for index, (attribute, descending) in enumerate(order_by_columns):
+            equal_conditions = [cls._keyset_equal_condition(order_by_columns[i][0], cursor_values[i]) for i in range(index)]
+            after_condition = cls._keyset_after_condition(attribute, descending, cursor_values[index], nulls_are_largest)
+            if after_condition is not None:
+                or_conditions.append(and_(*equal_conditions, after_condition))
+        return or_(*or_conditions)
+
+    @classmethod
+    def _keyset_equal_condition(cls, attribute: str, value: Any) -> Any:
+        column = ProcessInstanceModel.__table__.c[attribute]
+        return column.is_(None) if value is None else column == value
+
+    @classmethod
+    def _keyset_after_condition(cls, attribute: str, descending: bool, value: Any, nulls_are_largest: bool) -> Any:
+        column = ProcessInstanceModel.__table__.c[attribute]
+        # nulls come after every value when they are the largest and we go up or they are the smallest and we go down
+        nulls_come_after_values = nulls_are_largest != descending
+        if value is None:
+            return None if nulls_come_after_values else column.is_not(None)
+        after_value = column < value if descending else column > value
+        if column.nullable and nulls_come_after_values:
+            return or_(after_value, column.is_(None))
+        return after_value
+
+    @classmethod
+    def total_count(cls, process_instance_query: Query, total_count_mode: str) -> int:
+        """Counts the results of a report query. In cached mode a count from the last few seconds may be used."""
+        if total_count_mode not in PROCESS_INSTANCE_REPORT_TOTAL_COUNT_MODES:
+            raise ApiError(
+                error_code="process_instance_report_total_count_mode_invalid",
+                message=(
+                    f"Invalid total count mode: '{total_count_mode}'. "
+                    f"Valid modes are: {PROCESS_INSTANCE_REPORT_TOTAL_COUNT_MODES}"
+                ),
+                status_code=400,
+            )
+        count_query = process_instance_query.order_by(None)
+        max_age = float(current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_REPORT_TOTAL_COUNT_CACHE_MAX_AGE_IN_SECONDS"])
+        if total_count_mode == "exact" or max_age <= 0:
+            return count_query.count()
+
+        compiled_statement = count_query.statement.compile(dialect=db.engine.dialect)
+        cache_key = sha256(f"{compiled_statement}{sorted(compiled_statement.params.items())}".encode()).hexdigest()
+        with cls._total_count_cache_lock:
+            cached_total = cls._total_count_cache.get(cache_key)
+            if cached_total is not None and time.time() - cached_total[1] <= max_age:
+                cls._total_count_cache.move_to_end(cache_key)
+                return cached_total[0]
+
+        total = count_query.count()
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_REPORT_TOTAL_COUNT_CACHE_MAX_ENTRIES"])
+        with cls._total_count_cache_lock:
+            cls._total_count_cache[cache_key] = (total, time.time())
+            cls._total_count_cache.move_to_end(cache_key)
+            while len(cls._total_count_cache) > max_entries:
+                cls._total_count_cache.popitem(last=False)
+        return total
+
+    @classmethod
+    def clear_total_count_cache(cls) -> None:
+        with cls._total_count_cache_lock:
+            cls._total_count_cache.clear()
+
     @classmethod
     def get_basic_query(
         cls,
@@ -621,7 +784,62 @@ class ProcessInstanceReportService:
         user: UserModel | None = None,
         page: int = 1,
         per_page: int = 100,
+        cursor: str | None = None,
+        total_count_mode: str = "cached",
     ) -> dict:
+        """Runs the report and returns one page of results.
+
+        Pages are found with an offset unless a cursor from the next_cursor of a previous page is given.
+        Cursors continue right after the last row of the previous page so deep pages stay fast.
+        """
+        process_instance_query, restrict_human_tasks_to_user = cls.build_process_instance_report_query(report_metadata, user)
+        filters = report_metadata["filter_by"]
+
+        order_by_columns = cls.keyset_order_by_columns(report_metadata)
+        page_query = process_instance_query
+        if cursor is not None:
+            if order_by_columns is None:
+                raise ApiError(
+                    error_code="process_instance_report_cursor_not_supported",
+                    message="Reports ordered by metadata columns cannot be paged with a cursor.",
+                    status_code=400,
+                )
+            cursor_values = cls.decode_cursor(cursor, order_by_columns)
+            page_query = page_query.filter(cls.keyset_filter(order_by_columns, cursor_values))
+            page = 1
+        process_instances = page_query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+        total = cls.total_count(process_instance_query, total_count_mode)
+
+        next_cursor = None
+        if order_by_columns is not None and len(process_instances.items) == process_instances.per_page:
+            next_cursor = cls.encode_cursor(order_by_columns, process_instances.items[-1][0])
+
+        results = cls.add_metadata_columns_to_process_instance(process_instances.items, report_metadata["columns"])
+
+        for value in cls.check_filter_value(filters, "with_oldest_open_task"):
+            if value is True:
+                results = cls.add_human_task_fields(results, restrict_human_tasks_to_user=restrict_human_tasks_to_user)
+
+        report_metadata["filter_by"] = filters
+        response_json = {
+            "report_metadata": report_metadata,
+            "results": results,
+            "pagination": {
+                "count": len(results),
+                "total": total,
+                "pages": ceil(total / process_instances.per_page),
+                "next_cursor": next_cursor,
+            },
+        }
+        return response_json
+
+    @classmethod
+    def build_process_instance_report_query(
+        cls,
+        report_metadata: ReportMetadata,
+        user: UserModel | None = None,
+    ) -> tuple[Query, UserModel | None]:
+        """Returns the ordered query for the report and the user to restrict human tasks to, if any."""
         restrict_human_tasks_to_user = None
         filters = report_metadata["filter_by"]
         process_instance_query = cls.get_basic_query(filters)
@@ -712,26 +930,41 @@ class ProcessInstanceReportService:
         )
         order_by_query_array = cls.generate_order_by_query_array(report_metadata, instance_metadata_aliases)
 
-        process_instances = (
+        process_instance_query = (
             process_instance_query.group_by(ProcessInstanceModel.id)  # type: ignore
             .add_columns(ProcessInstanceModel.id)
             .order_by(*order_by_query_array)
-            .paginate(page=page, per_page=per_page, error_out=False)
         )
-        results = cls.add_metadata_columns_to_process_instance(process_instances.items, report_metadata["columns"])
+        return (process_instance_query, restrict_human_tasks_to_user)
 
-        for value in cls.check_filter_value(filters, "with_oldest_open_task"):
-            if value is True:
-                results = cls.add_human_task_fields(results, restrict_human_tasks_to_user=restrict_human_tasks_to_user)
+    @classmethod
+    def explain_process_instance_report(cls, report_metadata: ReportMetadata, user: UserModel | None = None) -> dict[str, str]:
+        """Returns the sql for the first page of the report and the plan the database would use to run it."""
+        process_instance_query, _ = cls.build_process_instance_report_query(report_metadata, user)
+        sql = str(
+            process_instance_query.limit(100).statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        )
+        explain_prefix = "EXPLAIN QUERY PLAN" if db.engine.dialect.name == "sqlite" else "EXPLAIN"
+        explain_rows = db.session.execute(sqlalchemy.text(f"{explain_prefix} {sql}")).all()
+        explain = "\n".join(" | ".join(str(value) for value in row) for row in explain_rows)
+        return {"sql": sql, "explain": explain}
 
-        report_metadata["filter_by"] = filters
-        response_json = {
-            "report_metadata": report_metadata,
-            "results": results,
-            "pagination": {
-                "count": len(results),
-                "total": process_instances.total,
-                "pages": process_instances.pages,
-            },
-        }
-        return response_json
+
+@event.listens_for(ProcessInstanceModel, "after_insert")
+@event.listens_for(ProcessInstanceModel, "after_delete")
+def _track_process_instances_added_or_removed(mapper: Mapper, connection: Any, process_instance: ProcessInstanceModel) -> None:
+    session = object_session(process_instance)
+    if session is not None:
+        session.info[PROCESS_INSTANCES_ADDED_OR_REMOVED_SESSION_INFO_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_total_counts(session: Session) -> None:
+    # cached totals would be off until they expire so forget them once the new or deleted instances are visible
+    if session.info.pop(PROCESS_INSTANCES_ADDED_OR_REMOVED_SESSION_INFO_KEY, False):
+        ProcessInstanceReportService.clear_total_count_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_process_instances_added_or_removed(session: Session) -> None:
+    session.info.pop(PROCESS_INSTANCES_ADDED_OR_REMOVED_SESSION_INFO_KEY, None)
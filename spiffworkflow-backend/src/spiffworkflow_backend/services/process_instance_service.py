@@ -45,6 +45,7 @@ from spiffworkflow_backend.services.error_handling_service import ErrorHandlingS
 from spiffworkflow_backend.services.git_service import GitCommandError
 from spiffworkflow_backend.services.git_service import GitService
 from spiffworkflow_backend.services.jinja_service import JinjaService
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
 from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
@@ -52,6 +53,7 @@ from spiffworkflow_backend.services.process_instance_queue_service import Proces
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
 from spiffworkflow_backend.services.process_instance_tmp_service import ProcessInstanceTmpService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.workflow_execution_service import TaskChangeTracker
 from spiffworkflow_backend.services.workflow_execution_service import TaskRunnability
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionServiceError
 from spiffworkflow_backend.services.workflow_service import WorkflowService
@@ -245,34 +247,50 @@ class ProcessInstanceService:
     def do_waiting(cls, status_value: str) -> None:
         run_at_in_seconds_threshold = round(time.time())
         min_age_in_seconds = 60  # to avoid conflicts with the interstitial page, we wait 60 seconds before processing
-        process_instance_ids_to_check = ProcessInstanceQueueService.peek_many(
-            status_value, run_at_in_seconds_threshold, min_age_in_seconds
-        )
-        if len(process_instance_ids_to_check) == 0:
-            return
-
-        records = (
-            db.session.query(ProcessInstanceModel)
-            .filter(ProcessInstanceModel.id.in_(process_instance_ids_to_check))  # type: ignore
-            .all()
-        )
+        batch_size = current_app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DEQUEUE_BATCH_SIZE"]
         execution_strategy_name = current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_DEFAULT_STRATEGY_BACKGROUND"]
-        for process_instance in records:
-            current_app.logger.info(f"Processor {status_value}: Processing process_instance {process_instance.id}")
+        while True:
+            # entries we run are enqueued again with a new updated_at_in_seconds so they are too young to be claimed twice
+            queue_entries = ProcessInstanceQueueService.dequeue_many(
+                batch_size,
+                status_value,
+                run_at_in_seconds_threshold=run_at_in_seconds_threshold,
+                min_age_in_seconds=min_age_in_seconds,
+            )
+            if len(queue_entries) == 0:
+                return
+
+            process_instances_to_run = (
+                db.session.query(ProcessInstanceModel)
+                .filter(ProcessInstanceModel.id.in_([e.process_instance_id for e in queue_entries]))  # type: ignore
+                .order_by(ProcessInstanceModel.id)
+                .all()
+            )
             try:
-                cls.run_process_instance_with_processor(
-                    process_instance, status_value=status_value, execution_strategy_name=execution_strategy_name
-                )
-            except ProcessInstanceIsAlreadyLockedError:
-                # we will try again later
-                continue
-            except Exception as exception:
-                db.session.rollback()  # in case the above left the database with a bad transaction
-                new_exception = Exception(
-                    f"Error running {status_value} task for process_instance {process_instance.id}"
-                    + f"({process_instance.process_model_identifier}). {exception.__class__.__name__}: {str(exception)}"
-                )
-                current_app.logger.exception(new_exception, stack_info=True)
+                while len(process_instances_to_run) > 0:
+                    process_instance = process_instances_to_run.pop(0)
+                    current_app.logger.info(f"Processor {status_value}: Processing process_instance {process_instance.id}")
+                    try:
+                        # we already hold the lock so this does not dequeue the process instance again
+                        cls.run_process_instance_with_processor(
+                            process_instance, status_value=status_value, execution_strategy_name=execution_strategy_name
+                        )
+                    except Exception as exception:
+                        db.session.rollback()  # in case the above left the database with a bad transaction
+                        new_exception = Exception(
+                            f"Error running {status_value} task for process_instance {process_instance.id}"
+                            + f"({process_instance.process_model_identifier}). {exception.__class__.__name__}: {str(exception)}"
+                        )
+                        current_app.logger.exception(new_exception, stack_info=True)
+                    finally:
+                        # do not keep it locked while the rest of the batch runs
+                        ProcessInstanceQueueService.enqueue_many([process_instance])
+            finally:
+                # anything we did not get to, like when the loop above was interrupted, is released all at once
+                ProcessInstanceQueueService.enqueue_many(process_instances_to_run)
+                # the process instance may have been deleted while we were waiting to claim it
+                for queue_entry in queue_entries:
+                    ProcessInstanceLockService.try_unlock(queue_entry.process_instance_id)
 
     @classmethod
     def run_process_instance_with_processor(
@@ -460,6 +478,7 @@ class ProcessInstanceService:
             process_instance.id,
         )
         DeepMerge.merge(spiff_task.data, data)
+        TaskChangeTracker.mark_data_changed(spiff_task)
 
     @classmethod
     def complete_form_task(
@@ -613,6 +632,7 @@ class ProcessInstanceService:
                 processor.do_engine_steps(save=save_to_db, execution_strategy_name="run_current_ready_tasks")
                 next_task = processor.next_task()
                 DeepMerge.merge(next_task.data, data_to_inject)
+                TaskChangeTracker.mark_data_changed(next_task)
             processor.do_engine_steps(save=save_to_db, execution_strategy_name="greedy")
         except (
             ApiError,
@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from flask import current_app
+
+# file system timestamps come from a coarse clock so a change made right after a read can leave the modification
+# time as it was. like git does with its index, entries read within this window of their modification time are
+# not trusted and get read again until the modification time is old enough to tell changes apart.
+RACY_MODIFICATION_WINDOW_IN_NS = 2_000_000_000
+
+
+@dataclass
+class DirectoryListingEntry:
+    directory_names: tuple[str, ...]
+    file_names: tuple[str, ...]
+
+    # a directory's modification time changes whenever an entry is added to, removed from or renamed in it
+    mtime_ns: int
+    read_at_ns: int
+    validated_at_in_seconds: float = field(default_factory=time.time)
+
+
+@dataclass
+class JsonFileEntry:
+    # the text is kept instead of the parsed dict so every caller gets its own objects back.
+    # parsing a small json string is cheaper than deep copying the dict it turns into.
+    contents: str
+    mtime_ns: int
+    size: int
+    read_at_ns: int
+    validated_at_in_seconds: float = field(default_factory=time.time)
+
+
+class ProcessModelIndexService:
+    """Per-worker index of the process group and process model directories in the bpmn spec dir.
+
+    Listing the process models or groups used to walk the whole spec dir and read every process_model.json and
+    process_group.json on each request. This keeps the directory listings and the contents of those json files
+    and only reads them again from disk once their modification times change, so changes made by other workers
+    or by hand are still picked up. Changes made through this worker call invalidate so they are seen right away.
+    """
+
+    _directory_listings: dict[str, DirectoryListingEntry] = {}
+    _json_files: dict[str, JsonFileEntry] = {}
+    _lock = threading.Lock()
+    _stats: dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_ENABLED"] is True
+
+    @classmethod
+    def list_directory(cls, directory_path: str) -> tuple[tuple[str, ...], tuple[str, ...]] | None:
+        """Returns the sorted names of the directories and of the files in the directory or None if it does not exist."""
+        directory_path = os.path.abspath(directory_path)
+        if not cls.enabled():
+            return cls._scan_directory(directory_path)
+
+        with cls._lock:
+            entry = cls._directory_listings.get(directory_path)
+        if entry is not None and cls._recently_validated(entry.validated_at_in_seconds):
+            return cls._hit_for_directory_listing(entry)
+
+        read_at_ns = time.time_ns()
+        try:
+            mtime_ns = os.stat(directory_path).st_mtime_ns
+        except OSError:
+            cls._forget(directory_path)
+            return None
+
+        if entry is not None and entry.mtime_ns == mtime_ns and cls._is_settled(entry.mtime_ns, entry.read_at_ns):
+            entry.validated_at_in_seconds = time.time()
+            return cls._hit_for_directory_listing(entry)
+
+        listing = cls._scan_directory(directory_path)
+        if listing is None:
+            cls._forget(directory_path)
+            return None
+        directory_names, file_names = listing
+        with cls._lock:
+            cls._stats["misses"] += 1
+            if entry is not None:
+                # forget anything cached for directories that went away since the last time this one was listed
+                for removed_directory_name in set(entry.directory_names) - set(directory_names):
+                    cls._remove_entries_at_or_under(os.path.join(directory_path, removed_directory_name))
+            cls._directory_listings[directory_path] = DirectoryListingEntry(
+                directory_names=directory_names, file_names=file_names, mtime_ns=mtime_ns, read_at_ns=read_at_ns
+            )
+        return (directory_names, file_names)
+
+    @classmethod
+    def read_json_file(cls, file_path: str) -> Any | None:
+        """Returns the parsed contents of the json file or None if it does not exist.
+
+        Raises JSONDecodeError like json.load does if the file is corrupted.
+        """
+        file_path = os.path.abspath(file_path)
+        if not cls.enabled():
+            contents = cls._read_file(file_path)
+            return None if contents is None else json.loads(contents)
+
+        with cls._lock:
+            entry = cls._json_files.get(file_path)
+        if entry is not None and cls._recently_validated(entry.validated_at_in_seconds):
+            return cls._hit_for_json_file(entry)
+
+        read_at_ns = time.time_ns()
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            with cls._lock:
+                cls._json_files.pop(file_path, None)
+            return None
+
+        if (
+            entry is not None
+            and entry.mtime_ns == stat_result.st_mtime_ns
+            and entry.size == stat_result.st_size
+            and cls._is_settled(entry.mtime_ns, entry.read_at_ns)
+        ):
+            entry.validated_at_in_seconds = time.time()
+            return cls._hit_for_json_file(entry)
+
+        contents = cls._read_file(file_path)
+        if contents is None:
+            return None
+        data = json.loads(contents)
+        with cls._lock:
+            cls._stats["misses"] += 1
+            cls._json_files[file_path] = JsonFileEntry(
+                contents=contents, mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size, read_at_ns=read_at_ns
+            )
+        return data
+
+    @classmethod
+    def invalidate(cls, path: str) -> None:
+        """Forgets everything at or under the path along with the listing of the directory it is in."""
+        path = os.path.abspath(path)
+        with cls._lock:
+            cls._remove_entries_at_or_under(path)
+            if cls._directory_listings.pop(os.path.dirname(path), None) is not None:
+                cls._stats["invalidations"] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._stats["invalidations"] += len(cls._directory_listings) + len(cls._json_files)
+            cls._directory_listings.clear()
+            cls._json_files.clear()
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {
+                **cls._stats,
+                "directories": len(cls._directory_listings),
+                "json_files": len(cls._json_files),
+            }
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _recently_validated(cls, validated_at_in_seconds: float) -> bool:
+        revalidate_interval = float(
+            current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_MODEL_INDEX_REVALIDATE_INTERVAL_IN_SECONDS"]
+        )
+        return revalidate_interval > 0 and time.time() - validated_at_in_seconds < revalidate_interval
+
+    @classmethod
+    def _is_settled(cls, mtime_ns: int, read_at_ns: int) -> bool:
+        return read_at_ns - mtime_ns > RACY_MODIFICATION_WINDOW_IN_NS
+
+    @classmethod
+    def _hit_for_directory_listing(cls, entry: DirectoryListingEntry) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        with cls._lock:
+            cls._stats["hits"] += 1
+        return (entry.directory_names, entry.file_names)
+
+    @classmethod
+    def _hit_for_json_file(cls, entry: JsonFileEntry) -> Any:
+        with cls._lock:
+            cls._stats["hits"] += 1
+        return json.loads(entry.contents)
+
+    @classmethod
+    def _forget(cls, path: str) -> None:
+        """Drops what is cached for a path that was found to be gone without counting it as a change."""
+        with cls._lock:
+            cls._remove_entries_at_or_under(path)
+
+    @classmethod
+    def _remove_entries_at_or_under(cls, path: str) -> None:
+        """Must be called while holding the lock."""
+        prefix = os.path.join(path, "")
+        entries_by_path: list[dict[str, Any]] = [cls._directory_listings, cls._json_files]
+        for entries in entries_by_path:
+            keys_to_remove = [key for key in entries if key == path or key.startswith(prefix)]
+            for key in keys_to_remove:
+                del entries[key]
+            cls._stats["invalidations"] += len(keys_to_remove)
+
+    @classmethod
+    def _scan_directory(cls, directory_path: str) -> tuple[tuple[str, ...], tuple[str, ...]] | None:
+        directory_names = []
+        file_names = []
+        try:
+            with os.scandir(directory_path) as directory_items:
+                for item in directory_items:
+                    if item.is_dir():
+                        directory_names.append(item.name)
+                    else:
+                        file_names.append(item.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return (tuple(sorted(directory_names)), tuple(sorted(file_names)))
+
+    @classmethod
+    def _read_file(cls, file_path: str) -> str | None:
+        try:
+            with open(file_path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
@@ -26,6 +26,7 @@ from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.authorization_service import AuthorizationService
 from spiffworkflow_backend.services.file_system_service import FileSystemService
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
 from spiffworkflow_backend.services.user_service import UserService
 
 T = TypeVar("T")
@@ -52,10 +53,7 @@ class ProcessModelService(FileSystemService):
 
     @classmethod
     def is_process_group(cls, path: str) -> bool:
-        group_json_path = os.path.join(path, cls.PROCESS_GROUP_JSON_FILE)
-        if os.path.exists(group_json_path):
-            return True
-        return False
+        return cls.__directory_has_file(path, cls.PROCESS_GROUP_JSON_FILE)
 
     @classmethod
     def is_process_group_identifier(cls, process_group_identifier: str) -> bool:
@@ -67,10 +65,12 @@ class ProcessModelService(FileSystemService):
 
     @classmethod
     def is_process_model(cls, path: str) -> bool:
-        model_json_path = os.path.join(path, cls.PROCESS_MODEL_JSON_FILE)
-        if os.path.exists(model_json_path):
-            return True
-        return False
+        return cls.__directory_has_file(path, cls.PROCESS_MODEL_JSON_FILE)
+
+    @classmethod
+    def __directory_has_file(cls, directory_path: str, file_name: str) -> bool:
+        listing = ProcessModelIndexService.list_directory(directory_path)
+        return listing is not None and file_name in listing[1]
 
     @classmethod
     def is_process_model_identifier(cls, process_model_identifier: str) -> bool:
@@ -84,6 +84,7 @@ class ProcessModelService(FileSystemService):
     def write_json_file(file_path: str, json_data: dict, indent: int = 4, sort_keys: bool = True) -> None:
         with open(file_path, "w") as h_open:
             json.dump(json_data, h_open, indent=indent, sort_keys=sort_keys)
+        ProcessModelIndexService.invalidate(file_path)
 
     @staticmethod
     def get_batch(
@@ -135,6 +136,8 @@ class ProcessModelService(FileSystemService):
             if key not in PROCESS_MODEL_SUPPORTED_KEYS_FOR_DISK_SERIALIZATION:
                 del json_data[key]
         cls.write_json_file(json_path, json_data)
+        # the directory may be new so the listing of the group it is in has to be read again too
+        ProcessModelIndexService.invalidate(process_model_path)
 
     @classmethod
     def process_model_delete(cls, process_model_id: str) -> None:
@@ -146,6 +149,7 @@ class ProcessModelService(FileSystemService):
         process_model = cls.get_process_model(process_model_id)
         path = cls.process_model_full_path(process_model)
         shutil.rmtree(path)
+        ProcessModelIndexService.invalidate(path)
 
     @classmethod
     def process_model_move(cls, original_process_model_id: str, new_location: str) -> ProcessModelInfo:
@@ -155,6 +159,8 @@ class ProcessModelService(FileSystemService):
         new_relative_path = os.path.join(new_location, model_id)
         new_model_path = os.path.abspath(os.path.join(FileSystemService.root_path(), new_relative_path))
         shutil.move(original_model_path, new_model_path)
+        ProcessModelIndexService.invalidate(original_model_path)
+        ProcessModelIndexService.invalidate(new_model_path)
         new_process_model = cls.get_process_model(new_relative_path)
         return new_process_model
 
@@ -198,14 +204,8 @@ class ProcessModelService(FileSystemService):
         if recursive is None:
             recursive = False
 
-        process_model_files = FileSystemService.walk_files(
-            root_path,
-            FileSystemService.standard_directory_predicate(recursive),
-            FileSystemService.is_process_model_json_file,
-        )
-
-        for file in process_model_files:
-            process_model = cls.get_process_model_from_path(file)
+        for process_model_path in cls.__find_process_model_directories(root_path, recursive):
+            process_model = cls.__scan_process_model(process_model_path)
 
             if include_files:
                 files = FileSystemService.get_sorted_files(process_model)
@@ -217,6 +217,27 @@ class ProcessModelService(FileSystemService):
         process_models.sort()
         return process_models
 
+    @classmethod
+    def __find_process_model_directories(cls, start_dir: str, recursive: bool) -> list[str]:
+        """Same directories walk_files would find with the standard directory predicate but from the index."""
+        process_model_paths = []
+        directories_to_list = [(start_dir, 0)]
+        while directories_to_list:
+            directory_path, depth = directories_to_list.pop()
+            listing = ProcessModelIndexService.list_directory(directory_path)
+            if listing is None:
+                continue
+            directory_names, file_names = listing
+            if cls.PROCESS_MODEL_JSON_FILE in file_names:
+                process_model_paths.append(directory_path)
+            if recursive or depth == 0:
+                directories_to_list.extend(
+                    (os.path.join(directory_path, directory_name), depth + 1)
+                    for directory_name in directory_names
+                    if directory_name != ".git"
+                )
+        return process_model_paths
+
     @classmethod
     def get_process_models_for_api(
         cls,
@@ -499,6 +520,8 @@ class ProcessModelService(FileSystemService):
             if key not in PROCESS_GROUP_SUPPORTED_KEYS_FOR_DISK_SERIALIZATION:
                 del serialized_process_group[key]
         cls.write_json_file(json_path, serialized_process_group)
+        # the directory may be new so the listing of the group it is in has to be read again too
+        ProcessModelIndexService.invalidate(cat_path)
         return process_group
 
     @classmethod
@@ -508,6 +531,8 @@ class ProcessModelService(FileSystemService):
         new_root = os.path.join(FileSystemService.root_path(), new_location)
         new_group_path = os.path.abspath(os.path.join(FileSystemService.root_path(), new_root, original_group_id))
         destination = shutil.move(original_group_path, new_group_path)
+        ProcessModelIndexService.invalidate(original_group_path)
+        ProcessModelIndexService.invalidate(new_group_path)
         new_process_group = cls.get_process_group(destination)
         return new_process_group
 
@@ -541,6 +566,7 @@ class ProcessModelService(FileSystemService):
                     f" {problem_models}"
                 )
             shutil.rmtree(path)
+            ProcessModelIndexService.invalidate(path)
 
     @classmethod
     def __scan_process_groups(cls, process_group_id: str | None = None) -> list[ProcessGroup]:
@@ -551,14 +577,17 @@ class ProcessModelService(FileSystemService):
         else:
             scan_path = FileSystemService.root_path()
 
-        with os.scandir(scan_path) as directory_items:
-            process_groups = []
-            for item in directory_items:
-                # if item.is_dir() and not item.name[0] == ".":
-                if item.is_dir() and cls.is_process_group(item):  # type: ignore
-                    scanned_process_group = cls.find_or_create_process_group(item.path)
-                    process_groups.append(scanned_process_group)
-            return process_groups
+        listing = ProcessModelIndexService.list_directory(scan_path)
+        if listing is None:
+            raise FileNotFoundError(f"No such directory: '{scan_path}'")
+        directory_names, _file_names = listing
+        process_groups = []
+        for directory_name in directory_names:
+            directory_path = os.path.join(scan_path, directory_name)
+            if cls.is_process_group(directory_path):
+                scanned_process_group = cls.find_or_create_process_group(directory_path)
+                process_groups.append(scanned_process_group)
+        return process_groups
 
     @classmethod
     def restrict_dict(cls, data: dict[str, Any]) -> dict[str, Any]:
@@ -574,19 +603,18 @@ class ProcessModelService(FileSystemService):
     ) -> ProcessGroup:
         """Reads the process_group.json file, and any nested directories."""
         cat_path = os.path.join(dir_path, cls.PROCESS_GROUP_JSON_FILE)
-        if os.path.exists(cat_path):
-            with open(cat_path) as cat_json:
-                data = json.load(cat_json)
-                # we don't store `id` in the json files, so we add it back in here
-                relative_path = os.path.relpath(dir_path, FileSystemService.root_path())
-                data["id"] = cls.path_to_id(relative_path)
-                restricted_data = cls.restrict_dict(data)
-                process_group = ProcessGroup(**restricted_data)
-                if process_group is None:
-                    raise ApiError(
-                        error_code="process_group_could_not_be_loaded_from_disk",
-                        message=f"We could not load the process_group from disk from: {dir_path}",
-                    )
+        data = ProcessModelIndexService.read_json_file(cat_path)
+        if data is not None:
+            # we don't store `id` in the json files, so we add it back in here
+            relative_path = os.path.relpath(dir_path, FileSystemService.root_path())
+            data["id"] = cls.path_to_id(relative_path)
+            restricted_data = cls.restrict_dict(data)
+            process_group = ProcessGroup(**restricted_data)
+            if process_group is None:
+                raise ApiError(
+                    error_code="process_group_could_not_be_loaded_from_disk",
+                    message=f"We could not load the process_group from disk from: {dir_path}",
+                )
         else:
             process_group_id = cls.path_to_id(dir_path.replace(FileSystemService.root_path(), ""))
             process_group = ProcessGroup(
@@ -604,24 +632,30 @@ class ProcessModelService(FileSystemService):
             return process_group
 
         if find_all_nested_items:
-            with os.scandir(dir_path) as nested_items:
-                for nested_item in nested_items:
-                    if nested_item.is_dir():
-                        # TODO: check whether this is a group or model
-                        if cls.is_process_group(nested_item.path):
-                            # This is a nested group
-                            process_group.process_groups.append(
-                                cls.find_or_create_process_group(nested_item.path, find_all_nested_items=find_all_nested_items)
-                            )
-                        elif ProcessModelService.is_process_model(nested_item.path):
-                            process_group.process_models.append(
-                                cls.__scan_process_model(
-                                    nested_item.path,
-                                    nested_item.name,
-                                )
-                            )
-                process_group.process_models.sort()
-                process_group.process_groups.sort()
+            listing = ProcessModelIndexService.list_directory(dir_path)
+            if listing is None:
+                raise FileNotFoundError(f"No such directory: '{dir_path}'")
+            nested_directory_names, _file_names = listing
+            for nested_directory_name in nested_directory_names:
+                nested_path = os.path.join(dir_path, nested_directory_name)
+                nested_listing = ProcessModelIndexService.list_directory(nested_path)
+                if nested_listing is None:
+                    continue
+                _nested_directory_names, nested_file_names = nested_listing
+                if cls.PROCESS_GROUP_JSON_FILE in nested_file_names:
+                    # This is a nested group
+                    process_group.process_groups.append(
+                        cls.find_or_create_process_group(nested_path, find_all_nested_items=find_all_nested_items)
+                    )
+                elif cls.PROCESS_MODEL_JSON_FILE in nested_file_names:
+                    process_group.process_models.append(
+                        cls.__scan_process_model(
+                            nested_path,
+                            nested_directory_name,
+                        )
+                    )
+            process_group.process_models.sort()
+            process_group.process_groups.sort()
         return process_group
 
     # path might have backslashes on windows, not sure
@@ -635,26 +669,25 @@ class ProcessModelService(FileSystemService):
     ) -> ProcessModelInfo:
         json_file_path = os.path.join(path, cls.PROCESS_MODEL_JSON_FILE)
 
-        if os.path.exists(json_file_path):
-            with open(json_file_path) as wf_json:
-                try:
-                    data = json.load(wf_json)
-                except JSONDecodeError as jde:
-                    raise ApiError(
-                        error_code="process_model_json_file_corrupted",
-                        message=f"The process_model json file {json_file_path} is corrupted.",
-                    ) from jde
-                if "process_group_id" in data:
-                    data.pop("process_group_id")
-                # we don't save `id` in the json file, so we add it back in here.
-                relative_path = os.path.relpath(path, FileSystemService.root_path())
-                data["id"] = cls.path_to_id(relative_path)
-                process_model_info = ProcessModelInfo(**data)
-                if process_model_info is None:
-                    raise ApiError(
-                        error_code="process_model_could_not_be_loaded_from_disk",
-                        message=f"We could not load the process_model from disk with data: {data}",
-                    )
+        try:
+            data = ProcessModelIndexService.read_json_file(json_file_path)
+        except JSONDecodeError as jde:
+            raise ApiError(
+                error_code="process_model_json_file_corrupted",
+                message=f"The process_model json file {json_file_path} is corrupted.",
+            ) from jde
+        if data is not None:
+            if "process_group_id" in data:
+                data.pop("process_group_id")
+            # we don't save `id` in the json file, so we add it back in here.
+            relative_path = os.path.relpath(path, FileSystemService.root_path())
+            data["id"] = cls.path_to_id(relative_path)
+            process_model_info = ProcessModelInfo(**data)
+            if process_model_info is None:
+                raise ApiError(
+                    error_code="process_model_could_not_be_loaded_from_disk",
+                    message=f"We could not load the process_model from disk with data: {data}",
+                )
         else:
             if name is None:
                 raise ApiError(
@@ -153,40 +153,37 @@ class ProcessModelTestRunnerScriptEngine(PythonScriptEngine):  # type: ignore
         self.method_overrides = method_overrides
         super().__init__(environment=environment)
 
-    def _get_all_methods_for_context(self, external_context: dict[str, Any] | None, task: SpiffTask | None = None) -> dict:
-        methods = {
-            "get_process_initiator_user": lambda: {
-                "username": "test_username_a",
-                "tenant_specific_field_1": "test_tenant_specific_field_1_a",
-            },
-        }
-
-        script_attributes_context = ScriptAttributesContext(
-            task=task,
-            environment_identifier="mocked-environment-identifier",
-            process_instance_id=1,
-            process_model_identifier="fake-test-process-model-identifier",
-        )
-        methods = Script.generate_augmented_list(script_attributes_context)
+    def _get_all_methods_for_context(self, external_context: dict[str, Any] | None) -> dict:
+        methods = {**Script.script_functions()}
 
         if self.method_overrides:
-            methods = {**methods, **self.method_overrides}
+            methods.update(self.method_overrides)
 
         if external_context:
             methods.update(external_context)
 
         return methods
 
+    def _get_script_attributes_context(self, task: SpiffTask | None) -> ScriptAttributesContext:
+        return ScriptAttributesContext(
+            task=task,
+            environment_identifier="mocked-environment-identifier",
+            process_instance_id=1,
+            process_model_identifier="fake-test-process-model-identifier",
+        )
+
     # Evaluate the given expression, within the context of the given task and
     # return the result.
     def evaluate(self, task: SpiffTask, expression: str, external_context: dict[str, Any] | None = None) -> Any:
-        updated_context = self._get_all_methods_for_context(external_context, task)
-        return super().evaluate(task, expression, updated_context)
+        updated_context = self._get_all_methods_for_context(external_context)
+        with Script.with_script_attributes_context(self._get_script_attributes_context(task)):
+            return super().evaluate(task, expression, updated_context)
 
     def execute(self, task: SpiffTask, script: str, external_context: Any = None) -> bool:
         if script:
-            methods = self._get_all_methods_for_context(external_context, task)
-            super().execute(task, script, methods)
+            methods = self._get_all_methods_for_context(external_context)
+            with Script.with_script_attributes_context(self._get_script_attributes_context(task)):
+                super().execute(task, script, methods)
 
         return True
 
@@ -1,10 +1,13 @@
 from sqlalchemy import insert
+from sqlalchemy import literal
+from sqlalchemy import select
 from sqlalchemy.orm import aliased
 
 from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_caller_relationship import ProcessCallerRelationshipModel
 from spiffworkflow_backend.models.reference_cache import ReferenceCacheModel
+from spiffworkflow_backend.models.reference_cache import ReferenceType
 from spiffworkflow_backend.services.upsearch_service import UpsearchService
 
 
@@ -17,12 +20,25 @@ class ReferenceCacheService:
         reference_objects[reference_cache_unique] = reference_cache
 
     @classmethod
-    def add_new_generation(cls, reference_objects: dict[str, ReferenceCacheModel]) -> None:
+    def add_new_generation(
+        cls,
+        reference_objects: dict[str, ReferenceCacheModel],
+        previous_generation_id: int | None = None,
+        changed_relative_locations: set[str] | None = None,
+    ) -> None:
+        """Stores the reference objects as a new generation of the reference cache.
+
+        If previous_generation_id is given then the process and decision references from that generation that are not
+        in one of the changed_relative_locations are copied into the new generation along with their process callers.
+        """
         # get inserted autoincrement primary key value back in a database agnostic way without committing the db session
         ins = insert(CacheGenerationModel).values(cache_table="reference_cache")  # type: ignore
         res = db.session.execute(ins)
         cache_generation_id = res.inserted_primary_key[0]
 
+        if previous_generation_id is not None:
+            cls._copy_unchanged_references(previous_generation_id, cache_generation_id, changed_relative_locations or set())
+
         # add primary key value to each element in reference objects list and store in new list
         reference_object_list_with_cache_generation_id = []
         for reference_object in reference_objects.values():
@@ -30,8 +46,92 @@ class ReferenceCacheService:
             reference_object_list_with_cache_generation_id.append(reference_object)
 
         db.session.bulk_save_objects(reference_object_list_with_cache_generation_id)
+
+        if previous_generation_id is not None:
+            cls._copy_unchanged_process_callers(previous_generation_id, cache_generation_id, changed_relative_locations or set())
         db.session.commit()
 
+    @classmethod
+    def _copy_unchanged_references(
+        cls, previous_generation_id: int, cache_generation_id: int, changed_relative_locations: set[str]
+    ) -> None:
+        # data store references are cheap to find again so they are always rebuilt instead of copied
+        copied_columns = ["identifier", "display_name", "type", "file_name", "relative_location", "properties"]
+        unchanged_references = select(
+            literal(cache_generation_id),
+            *[getattr(ReferenceCacheModel, column) for column in copied_columns],
+        ).where(
+            ReferenceCacheModel.generation_id == previous_generation_id,  # type: ignore
+            ReferenceCacheModel.type != ReferenceType.data_store.value,  # type: ignore
+            ReferenceCacheModel.relative_location.not_in(changed_relative_locations),  # type: ignore
+        )
+        db.session.execute(insert(ReferenceCacheModel).from_select(["generation_id", *copied_columns], unchanged_references))
+
+    @classmethod
+    def _copy_unchanged_process_callers(
+        cls, previous_generation_id: int, cache_generation_id: int, changed_relative_locations: set[str]
+    ) -> None:
+        """Points the process callers of copied references at the rows in the new generation.
+
+        Callers from changed locations are added again when their files are parsed.
+        """
+        calling_reference_alias = aliased(ReferenceCacheModel)
+        called_reference_alias = aliased(ReferenceCacheModel)
+        previous_process_callers = (
+            db.session.query(  # type: ignore
+                calling_reference_alias.identifier,
+                calling_reference_alias.relative_location,
+                calling_reference_alias.type,
+                called_reference_alias.identifier,
+            )
+            .select_from(ProcessCallerRelationshipModel)
+            .join(
+                calling_reference_alias,
+                calling_reference_alias.id == ProcessCallerRelationshipModel.calling_reference_cache_process_id,
+            )
+            .join(
+                called_reference_alias,
+                called_reference_alias.id == ProcessCallerRelationshipModel.called_reference_cache_process_id,
+            )
+            .filter(
+                calling_reference_alias.generation_id == previous_generation_id,
+                calling_reference_alias.relative_location.not_in(changed_relative_locations),  # type: ignore
+            )
+            .all()
+        )
+        if len(previous_process_callers) == 0:
+            return
+
+        new_references = (
+            db.session.query(  # type: ignore
+                ReferenceCacheModel.id,
+                ReferenceCacheModel.identifier,
+                ReferenceCacheModel.relative_location,
+                ReferenceCacheModel.type,
+            )
+            .filter(ReferenceCacheModel.generation_id == cache_generation_id)
+            .all()
+        )
+        new_reference_ids = {(r.identifier, r.relative_location, r.type): r.id for r in new_references}
+        # ProcessCallerService.add_caller also finds called processes by identifier alone
+        new_reference_ids_by_identifier = {r.identifier: r.id for r in new_references}
+
+        process_callers = set()
+        for calling_identifier, calling_relative_location, calling_type, called_identifier in previous_process_callers:
+            calling_id = new_reference_ids.get((calling_identifier, calling_relative_location, calling_type))
+            called_id = new_reference_ids_by_identifier.get(called_identifier)
+            if calling_id is not None and called_id is not None:
+                process_callers.add((called_id, calling_id))
+
+        if len(process_callers) > 0:
+            db.session.execute(
+                insert(ProcessCallerRelationshipModel),
+                [
+                    {"called_reference_cache_process_id": called_id, "calling_reference_cache_process_id": calling_id}
+                    for called_id, calling_id in process_callers
+                ],
+            )
+
     @classmethod
     def upsearch(cls, location: str, identifier: str, type: str) -> str | None:
         locations = UpsearchService.upsearch_locations(location)
@@ -1,4 +1,9 @@
 import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
 
 import sentry_sdk
 from flask import current_app
@@ -8,9 +13,24 @@ from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.secret_model import SecretModel
 
 
+@dataclass
+class DecryptedSecretCacheEntry:
+    updated_at_in_seconds: int | None
+    # the encrypted value is compared too since updated_at_in_seconds only changes once per second
+    encrypted_value: str = field(repr=False)
+    decrypted_value: str = field(repr=False)
+    cached_at_in_seconds: float
+
+
 class SecretService:
     CIPHER_ENCODING = "ascii"
 
+    # decrypted secrets used by service tasks, only ever kept in memory. changes made in this process clear
+    # their entry right away and changes made elsewhere are noticed once the entry is older than the ttl.
+    _decrypted_secret_cache: OrderedDict[str, DecryptedSecretCacheEntry] = OrderedDict()
+    _decrypted_secret_cache_lock = threading.Lock()
+    _decrypted_secret_cache_stats: dict[str, int] = {"hits": 0, "revalidations": 0, "misses": 0, "evictions": 0}
+
     @classmethod
     def _encrypt(cls, value: str) -> str:
         encrypted_bytes: bytes = b""
@@ -49,6 +69,8 @@ class SecretService:
                     f" ending with: {value[:-4]}. Original error is {e}"
                 ),
             ) from e
+        finally:
+            cls.invalidate_decrypted_secret(key)
         return secret_model
 
     @staticmethod
@@ -81,6 +103,8 @@ class SecretService:
             except Exception as e:
                 db.session.rollback()
                 raise e
+            finally:
+                cls.invalidate_decrypted_secret(key)
         elif create_if_not_exists:
             if user_id is None:
                 raise ApiError(
@@ -96,8 +120,8 @@ class SecretService:
                 status_code=404,
             )
 
-    @staticmethod
-    def delete_secret(key: str, user_id: int) -> None:
+    @classmethod
+    def delete_secret(cls, key: str, user_id: int) -> None:
         """Delete secret."""
         secret_model = SecretModel.query.filter(SecretModel.key == key).first()
         if secret_model:
@@ -109,6 +133,8 @@ class SecretService:
                     error_code="delete_secret_error",
                     message=f"Could not delete secret with key: {key}. Original error is: {e}",
                 ) from e
+            finally:
+                cls.invalidate_decrypted_secret(key)
         else:
             raise ApiError(
                 error_code="delete_secret_error",
@@ -122,8 +148,77 @@ class SecretService:
             spiff_secret_match = re.match(r".*SPIFF_SECRET:(?P<variable_name>\w+).*", value)
             if spiff_secret_match is not None:
                 spiff_variable_name = spiff_secret_match.group("variable_name")
-                secret = cls.get_secret(spiff_variable_name)
-                with sentry_sdk.start_span(op="task", description="decrypt_secret"):
-                    decrypted_value = cls._decrypt(secret.value)
-                    return re.sub(r"\bSPIFF_SECRET:\w+", decrypted_value, value)
+                decrypted_value = cls.get_decrypted_secret_value(spiff_variable_name)
+                return re.sub(r"\bSPIFF_SECRET:\w+", decrypted_value, value)
         return value
+
+    @classmethod
+    def get_decrypted_secret_value(cls, key: str) -> str:
+        """Returns the decrypted value of a secret, reusing a recent decryption of the same stored value."""
+        ttl_in_seconds = current_app.config["SPIFFWORKFLOW_BACKEND_SECRET_CACHE_TTL_IN_SECONDS"]
+        if ttl_in_seconds <= 0:
+            return cls._decrypt_with_span(cls.get_secret(key).value)
+
+        with cls._decrypted_secret_cache_lock:
+            entry = cls._decrypted_secret_cache.get(key)
+            if entry is not None and time.time() - entry.cached_at_in_seconds < ttl_in_seconds:
+                cls._decrypted_secret_cache.move_to_end(key)
+                cls._decrypted_secret_cache_stats["hits"] += 1
+                return entry.decrypted_value
+
+        try:
+            secret = cls.get_secret(key)
+        except ApiError:
+            cls.invalidate_decrypted_secret(key)
+            raise
+
+        stat_key = "misses"
+        if (
+            entry is not None
+            and entry.updated_at_in_seconds == secret.updated_at_in_seconds
+            and entry.encrypted_value == secret.value
+        ):
+            stat_key = "revalidations"
+            decrypted_value = entry.decrypted_value
+        else:
+            decrypted_value = cls._decrypt_with_span(secret.value)
+
+        max_entries = current_app.config["SPIFFWORKFLOW_BACKEND_SECRET_CACHE_MAX_ENTRIES"]
+        with cls._decrypted_secret_cache_lock:
+            cls._decrypted_secret_cache_stats[stat_key] += 1
+            cls._decrypted_secret_cache[key] = DecryptedSecretCacheEntry(
+                updated_at_in_seconds=secret.updated_at_in_seconds,
+                encrypted_value=secret.value,
+                decrypted_value=decrypted_value,
+                cached_at_in_seconds=time.time(),
+            )
+            cls._decrypted_secret_cache.move_to_end(key)
+            while len(cls._decrypted_secret_cache) > max_entries:
+                cls._decrypted_secret_cache.popitem(last=False)
+                cls._decrypted_secret_cache_stats["evictions"] += 1
+        return decrypted_value
+
+    @classmethod
+    def invalidate_decrypted_secret(cls, key: str | None = None) -> None:
+        """Forgets the decrypted value of the given secret or of all secrets if no key is given."""
+        with cls._decrypted_secret_cache_lock:
+            if key is None:
+                cls._decrypted_secret_cache.clear()
+            else:
+                cls._decrypted_secret_cache.pop(key, None)
+
+    @classmethod
+    def decrypted_secret_cache_stats(cls) -> dict[str, int]:
+        with cls._decrypted_secret_cache_lock:
+            return {**cls._decrypted_secret_cache_stats, "size": len(cls._decrypted_secret_cache)}
+
+    @classmethod
+    def reset_decrypted_secret_cache_stats(cls) -> None:
+        with cls._decrypted_secret_cache_lock:
+            for key in cls._decrypted_secret_cache_stats:
+                cls._decrypted_secret_cache_stats[key] = 0
+
+    @classmethod
+    def _decrypt_with_span(cls, value: str) -> str:
+        with sentry_sdk.start_span(op="task", description="decrypt_secret"):
+            return cls._decrypt(value)
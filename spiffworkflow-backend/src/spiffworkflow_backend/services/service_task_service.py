@@ -3,7 +3,6 @@ import json
 from json import JSONDecodeError
 from typing import Any
 
-import requests
 import sentry_sdk
 from flask import current_app
 from flask import g
@@ -16,8 +15,7 @@ from SpiffWorkflow.task import Task as SpiffTask  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
 from spiffworkflow_connector_command.command_interface import CommandErrorDict
 
-from spiffworkflow_backend.config import CONNECTOR_PROXY_COMMAND_TIMEOUT
-from spiffworkflow_backend.config import HTTP_REQUEST_TIMEOUT_SECONDS
+from spiffworkflow_backend.services.connector_proxy_service import ConnectorProxyService
 from spiffworkflow_backend.services.file_system_service import FileSystemService
 from spiffworkflow_backend.services.secret_service import SecretService
 from spiffworkflow_backend.services.user_service import UserService
@@ -69,9 +67,7 @@ class ServiceTaskDelegate:
             secret_prefix = "secret:"  # noqa: S105
             if value.startswith(secret_prefix):
                 key = value.removeprefix(secret_prefix)
-                secret = SecretService.get_secret(key)
-                with sentry_sdk.start_span(op="task", description="decrypt_secret"):
-                    return SecretService._decrypt(secret.value)
+                return SecretService.get_decrypted_secret_value(key)
 
             file_prefix = "file:"
             if value.startswith(file_prefix):
@@ -191,14 +187,15 @@ class ServiceTaskDelegate:
         with sentry_sdk.start_span(op="connector_by_name", description=operator_identifier):
             with sentry_sdk.start_span(op="call-connector", description=call_url):
                 params = {k: cls.value_with_secrets_replaced(v["value"]) for k, v in bpmn_params.items()}
-                params["spiff__task_data"] = task_data
+                if ConnectorProxyService.command_needs_task_data(operator_identifier):
+                    params["spiff__task_data"] = task_data
 
                 response_text = ""
                 status_code = 0
                 parsed_response: dict = {}
                 try:
                     # this will raise on ConnectionError - like a bad url, and maybe limited other scenarios
-                    proxied_response = requests.post(call_url, json=params, timeout=CONNECTOR_PROXY_COMMAND_TIMEOUT)
+                    proxied_response = ConnectorProxyService.do_command(operator_identifier, params)
 
                     status_code = proxied_response.status_code
                     response_text = proxied_response.text
@@ -255,7 +252,7 @@ class ServiceTaskService:
     def available_connectors() -> Any:
         """Returns a list of available connectors."""
         try:
-            response = requests.get(f"{connector_proxy_url()}/v1/commands", timeout=HTTP_REQUEST_TIMEOUT_SECONDS)
+            response = ConnectorProxyService.get("/v1/commands")
 
             if response.status_code != 200:
                 return []
@@ -270,7 +267,7 @@ class ServiceTaskService:
     def authentication_list() -> Any:
         """Returns a list of available authentications."""
         try:
-            response = requests.get(f"{connector_proxy_url()}/v1/auths", timeout=HTTP_REQUEST_TIMEOUT_SECONDS)
+            response = ConnectorProxyService.get("/v1/auths")
 
             if response.status_code != 200:
                 return []
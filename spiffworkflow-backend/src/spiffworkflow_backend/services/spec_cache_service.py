@@ -0,0 +1,247 @@
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from hashlib import sha256
+from typing import Any
+
+from flask import current_app
+
+
+@dataclass
+class SpecDependencies:
+    """The files from other process models that were pulled in to resolve the call activities in a spec."""
+
+    # called process identifier -> full path of the bpmn file the reference cache resolved it to
+    bpmn_file_paths_by_identifier: dict[str, str] = field(default_factory=dict)
+
+    # glob for the dmn files next to one of those bpmn files -> full paths of the files it matched
+    dmn_file_paths_by_glob: dict[str, list[str]] = field(default_factory=dict)
+
+    def file_paths(self) -> set[str]:
+        file_paths = set(self.bpmn_file_paths_by_identifier.values())
+        for dmn_file_paths in self.dmn_file_paths_by_glob.values():
+            file_paths.update(dmn_file_paths)
+        return file_paths
+
+
+@dataclass
+class SpecCacheEntry:
+    bpmn_process_spec: Any
+    subprocesses: dict[str, Any]
+
+    # full file path -> digest of the file contents for the bpmn/dmn files that went into the spec.
+    # own files live in the process model directory and dependency files were pulled in to resolve call activities.
+    own_file_digests: dict[str, str]
+    dependency_file_digests: dict[str, str]
+    dependencies: SpecDependencies = field(default_factory=SpecDependencies)
+    created_at_in_seconds: float = field(default_factory=time.time)
+
+
+@dataclass
+class ProcessModelSettingsCacheEntry:
+    """The settings from a process_model.json file that are needed while instances of the model run."""
+
+    metadata_extraction_paths: list[dict[str, str]] | None
+    task_data_size_soft_limit_in_bytes: int | None
+    task_data_size_hard_limit_in_bytes: int | None
+
+    # the process_model.json file is only read again after its modification time changes
+    process_model_json_mtime_ns: int
+    created_at_in_seconds: float = field(default_factory=time.time)
+
+
+class SpecCacheService:
+    """Per-worker cache of parsed bpmn specs so we do not re-parse the same process model files over and over.
+
+    Entries are keyed by process model identifier and process id and are only considered a hit if the
+    contents of every file that contributed to the spec still match what was parsed, and if the call
+    activities would still pull in the same files from other process models.
+    """
+
+    _cache: OrderedDict[tuple[str, str], SpecCacheEntry] = OrderedDict()
+    _process_model_settings_cache: OrderedDict[str, ProcessModelSettingsCacheEntry] = OrderedDict()
+    _lock = threading.Lock()
+    _stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_SPEC_CACHE_ENABLED"] is True
+
+    @classmethod
+    def digest(cls, file_contents: bytes) -> str:
+        return sha256(file_contents).hexdigest()
+
+    @classmethod
+    def digest_for_file(cls, full_file_path: str) -> str | None:
+        try:
+            with open(full_file_path, "rb") as f:
+                return cls.digest(f.read())
+        except OSError:
+            return None
+
+    @classmethod
+    def get(
+        cls,
+        process_model_identifier: str,
+        process_id: str,
+        own_file_digests: dict[str, str],
+        bpmn_file_path_for_identifier: Callable[[str], str | None],
+    ) -> SpecCacheEntry | None:
+        """Returns the cached spec if it is still what parsing the given files would give.
+
+        bpmn_file_path_for_identifier returns the full path of the bpmn file that a called process identifier
+        resolves to right now, or None if it cannot be resolved.
+        """
+        if not cls.enabled():
+            return None
+
+        cache_key = (process_model_identifier, process_id)
+        with cls._lock:
+            entry = cls._cache.get(cache_key)
+            if entry is not None and cls._is_expired(entry):
+                del cls._cache[cache_key]
+                cls._stats["evictions"] += 1
+                entry = None
+
+        if entry is not None and cls._entry_matches_files(entry, own_file_digests, bpmn_file_path_for_identifier):
+            with cls._lock:
+                if cache_key in cls._cache:
+                    cls._cache.move_to_end(cache_key)
+                cls._stats["hits"] += 1
+            return entry
+
+        with cls._lock:
+            cls._stats["misses"] += 1
+        return None
+
+    @classmethod
+    def set(
+        cls,
+        process_model_identifier: str,
+        process_id: str,
+        bpmn_process_spec: Any,
+        subprocesses: dict[str, Any],
+        own_file_digests: dict[str, str],
+        dependencies: SpecDependencies,
+    ) -> None:
+        if not cls.enabled():
+            return
+
+        dependency_file_digests = {}
+        for file_path in dependencies.file_paths():
+            digest = cls.digest_for_file(file_path)
+            if digest is not None:
+                dependency_file_digests[file_path] = digest
+
+        cache_key = (process_model_identifier, process_id)
+        entry = SpecCacheEntry(
+            bpmn_process_spec=bpmn_process_spec,
+            subprocesses=subprocesses,
+            own_file_digests=own_file_digests,
+            dependency_file_digests=dependency_file_digests,
+            dependencies=dependencies,
+        )
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_SPEC_CACHE_MAX_ENTRIES"])
+        with cls._lock:
+            cls._cache[cache_key] = entry
+            cls._cache.move_to_end(cache_key)
+            while len(cls._cache) > max_entries:
+                cls._cache.popitem(last=False)
+                cls._stats["evictions"] += 1
+
+    @classmethod
+    def mtime_ns_for_file(cls, full_file_path: str) -> int | None:
+        try:
+            return os.stat(full_file_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def get_process_model_settings(
+        cls, process_model_identifier: str, process_model_json_mtime_ns: int
+    ) -> ProcessModelSettingsCacheEntry | None:
+        if not cls.enabled():
+            return None
+        with cls._lock:
+            entry = cls._process_model_settings_cache.get(process_model_identifier)
+            if entry is not None and (cls._is_expired(entry) or entry.process_model_json_mtime_ns != process_model_json_mtime_ns):
+                del cls._process_model_settings_cache[process_model_identifier]
+                entry = None
+            if entry is not None:
+                cls._process_model_settings_cache.move_to_end(process_model_identifier)
+            return entry
+
+    @classmethod
+    def set_process_model_settings(cls, process_model_identifier: str, entry: ProcessModelSettingsCacheEntry) -> None:
+        if not cls.enabled():
+            return
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_SPEC_CACHE_PROCESS_MODEL_SETTINGS_MAX_ENTRIES"])
+        with cls._lock:
+            cls._process_model_settings_cache[process_model_identifier] = entry
+            cls._process_model_settings_cache.move_to_end(process_model_identifier)
+            while len(cls._process_model_settings_cache) > max_entries:
+                cls._process_model_settings_cache.popitem(last=False)
+
+    @classmethod
+    def invalidate_for_file(cls, full_file_path: str) -> None:
+        """Remove any cached spec that was built using the given file."""
+        with cls._lock:
+            keys_to_remove = [
+                key
+                for key, entry in cls._cache.items()
+                if full_file_path in entry.own_file_digests or full_file_path in entry.dependency_file_digests
+            ]
+            for key in keys_to_remove:
+                del cls._cache[key]
+            cls._stats["invalidations"] += len(keys_to_remove)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._stats["invalidations"] += len(cls._cache)
+            cls._cache.clear()
+            cls._process_model_settings_cache.clear()
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {**cls._stats, "size": len(cls._cache)}
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _is_expired(cls, entry: SpecCacheEntry | ProcessModelSettingsCacheEntry) -> bool:
+        max_age = int(current_app.config["SPIFFWORKFLOW_BACKEND_SPEC_CACHE_MAX_AGE_IN_SECONDS"])
+        return time.time() - entry.created_at_in_seconds > max_age
+
+    @classmethod
+    def _entry_matches_files(
+        cls,
+        entry: SpecCacheEntry,
+        own_file_digests: dict[str, str],
+        bpmn_file_path_for_identifier: Callable[[str], str | None],
+    ) -> bool:
+        # files may have been added to or removed from the process model directory so those must match exactly.
+        # files from other process models are not handed to us so make sure the same ones would be pulled in
+        # and that they have not changed on disk.
+        if entry.own_file_digests != own_file_digests:
+            return False
+        for dmn_file_glob, dmn_file_paths in entry.dependencies.dmn_file_paths_by_glob.items():
+            if sorted(glob.glob(dmn_file_glob)) != dmn_file_paths:
+                return False
+        for identifier, file_path in entry.dependencies.bpmn_file_paths_by_identifier.items():
+            if bpmn_file_path_for_identifier(identifier) != file_path:
+                return False
+        for file_path, digest in entry.dependency_file_digests.items():
+            if cls.digest_for_file(file_path) != digest:
+                return False
+        return True
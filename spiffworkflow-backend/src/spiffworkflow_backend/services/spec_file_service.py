@@ -20,7 +20,9 @@ from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.custom_parser import MyCustomParser
 from spiffworkflow_backend.services.file_system_service import FileSystemService
 from spiffworkflow_backend.services.process_caller_service import ProcessCallerService
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 
 if TYPE_CHECKING:
     from spiffworkflow_backend.models.process_model import ProcessModelInfo
@@ -220,6 +222,8 @@ class SpecFileService(FileSystemService):
         # make sure we save the file as the last thing we do to ensure validations have run
         full_file_path = cls.full_file_path(process_model_info, file_name)
         cls.write_file_data_to_system(full_file_path, binary_data)
+        SpecCacheService.invalidate_for_file(full_file_path)
+        ProcessModelIndexService.invalidate(full_file_path)
         return (cls.to_file_object(file_name, full_file_path), references)
 
     @classmethod
@@ -237,12 +241,15 @@ class SpecFileService(FileSystemService):
         cls.clear_caches_for_item(file_name=file_name, process_model_info=process_model)
         full_file_path = cls.full_file_path(process_model, file_name)
         os.remove(full_file_path)
+        SpecCacheService.invalidate_for_file(full_file_path)
+        ProcessModelIndexService.invalidate(full_file_path)
 
     @staticmethod
     def delete_all_files(process_model: ProcessModelInfo) -> None:
         dir_path = SpecFileService.process_model_full_path(process_model)
         if os.path.exists(dir_path):
             shutil.rmtree(dir_path)
+            ProcessModelIndexService.invalidate(dir_path)
 
     # fixme: Place all the caching stuff in a different service.
 
@@ -1,10 +1,9 @@
 import copy
-import json
 import time
-from hashlib import sha256
 from typing import TypedDict
 from uuid import UUID
 
+from flask import current_app
 from SpiffWorkflow.bpmn.serializer.workflow import BpmnWorkflowSerializer  # type: ignore
 from SpiffWorkflow.bpmn.workflow import BpmnWorkflow  # type: ignore
 from SpiffWorkflow.exceptions import WorkflowException  # type: ignore
@@ -12,8 +11,12 @@ from SpiffWorkflow.task import Task as SpiffTask  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
 from sqlalchemy import and_
 from sqlalchemy import asc
+from sqlalchemy import or_
+from sqlalchemy.orm import defer
 
 from spiffworkflow_backend.exceptions.error import TaskMismatchError
+from spiffworkflow_backend.helpers.content_hash import content_hash
+from spiffworkflow_backend.helpers.content_hash import memoize_for_object
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessNotFoundError
 from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
@@ -126,10 +129,48 @@ class TaskService:
         self.bpmn_processes: dict[str, BpmnProcessModel] = {}
         self.task_models: dict[str, TaskModel] = {}
         self.json_data_dicts: dict[str, JsonDataDict] = {}
+        # json_data hash of task data saved by this service -> (full task data, number of deltas to get to it, size)
+        self.task_data_by_json_data_hash: dict[str, tuple[dict, int, int]] = {}
         self.process_instance_events: dict[str, ProcessInstanceEventModel] = {}
 
+        # rows for the instance that are loaded all at once the first time one is needed after enable_prefetching.
+        # when set, anything that is not in them does not exist yet so it does not have to be queried for.
+        self.prefetch_enabled = False
+        self.prefetched_task_models: dict[str, TaskModel] | None = None
+        self.prefetched_bpmn_processes_by_id: dict[int, BpmnProcessModel] | None = None
+        self.prefetched_bpmn_processes_by_guid: dict[str, BpmnProcessModel] | None = None
+
         self.run_started_at: float | None = run_started_at
 
+    def enable_prefetching(self) -> None:
+        """Only use this when the rows will be looked up while the instance is dequeued so nothing else can add rows for it."""
+        self.prefetch_enabled = True
+
+    def prefetch_process_instance_models(self) -> None:
+        """Loads all of the task and bpmn process rows for the instance with one query each.
+
+        The properties_json of the tasks is left out since it is the bulk of each row and saving a task replaces
+        it without reading it. It is loaded for a task the first time something does read it.
+        """
+        self.prefetched_task_models = {
+            t.guid: t
+            for t in TaskModel.query.filter_by(process_instance_id=self.process_instance.id)
+            .options(defer(TaskModel.properties_json))  # type: ignore
+            .all()
+        }
+        bpmn_processes: list[BpmnProcessModel] = []
+        if self.process_instance.bpmn_process_id is not None:
+            bpmn_processes = BpmnProcessModel.query.filter(
+                or_(
+                    BpmnProcessModel.id == self.process_instance.bpmn_process_id,  # type: ignore
+                    BpmnProcessModel.top_level_process_id == self.process_instance.bpmn_process_id,  # type: ignore
+                )
+            ).all()
+        self.prefetched_bpmn_processes_by_id = {}
+        self.prefetched_bpmn_processes_by_guid = {}
+        for bpmn_process in bpmn_processes:
+            self._add_prefetched_bpmn_process(bpmn_process)
+
     def save_objects_to_database(self, save_process_instance_events: bool = True) -> None:
         db.session.bulk_save_objects(self.bpmn_processes.values())
         db.session.bulk_save_objects(self.task_models.values())
@@ -202,9 +243,7 @@ class TaskService:
             )
 
         # we are not sure why task_model.bpmn_process can be None while task_model.bpmn_process_id actually has a valid value
-        bpmn_process = (
-            new_bpmn_process or task_model.bpmn_process or BpmnProcessModel.query.filter_by(id=task_model.bpmn_process_id).first()
-        )
+        bpmn_process = new_bpmn_process or task_model.bpmn_process or self._find_bpmn_process_by_id(task_model.bpmn_process_id)
 
         self.update_task_model(task_model, spiff_task)
         bpmn_process_json_data = self.update_task_data_on_bpmn_process(bpmn_process, bpmn_process_instance=spiff_task.workflow)
@@ -266,7 +305,7 @@ class TaskService:
         self.bpmn_processes[bpmn_process.guid or "top_level"] = bpmn_process
 
         if spiff_workflow.parent_task_id:
-            direct_parent_bpmn_process = BpmnProcessModel.query.filter_by(id=bpmn_process.direct_parent_process_id).first()
+            direct_parent_bpmn_process = self._find_bpmn_process_by_id(bpmn_process.direct_parent_process_id)
             self.update_bpmn_process(spiff_workflow.parent_workflow, direct_parent_bpmn_process)
 
         if self.force_update_definitions is True:
@@ -298,38 +337,80 @@ class TaskService:
         python_env_data_dict = self.__class__._get_python_env_data_dict_from_spiff_task(spiff_task, self.serializer)
         task_model.properties_json = new_properties_json
         task_model.state = TaskState.get_name(new_properties_json["state"])
-        json_data_dict = self.__class__.update_json_data_on_db_model_and_return_dict_if_updated(
-            task_model, spiff_task_data, "json_data_hash"
-        )
-        python_env_dict = self.__class__.update_json_data_on_db_model_and_return_dict_if_updated(
+        previous_json_data_size = task_model.json_data_size
+        json_data_dict = self._update_task_data_on_task_model(task_model, spiff_task, spiff_task_data)
+        python_env_dict, python_env_size = self.__class__.update_json_data_and_size_on_db_model(
             task_model, python_env_data_dict, "python_env_data_hash"
         )
+        self._update_data_sizes_on_process_instance(previous_json_data_size, task_model.json_data_size, python_env_size)
         if json_data_dict is not None:
             self.json_data_dicts[json_data_dict["hash"]] = json_data_dict
         if python_env_dict is not None:
             self.json_data_dicts[python_env_dict["hash"]] = python_env_dict
         task_model.runtime_info = spiff_task.task_spec.task_info(spiff_task)
 
+    def _update_task_data_on_task_model(
+        self, task_model: TaskModel, spiff_task: SpiffTask, task_data: dict
+    ) -> JsonDataDict | None:
+        """Sets the json_data_hash and json_data_size on the task model and returns the json_data dict if it was changed.
+
+        When delta encoding is enabled and the parent task's data was saved by this service, the data is
+        stored as a delta against the parent's data as long as the chain of deltas stays short enough.
+        """
+        if not current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING_ENABLED"]:
+            changed_json_data_dict, task_model.json_data_size = self.__class__.update_json_data_and_size_on_db_model(
+                task_model, task_data, "json_data_hash"
+            )
+            return changed_json_data_dict
+
+        json_data_dict: JsonDataDict | None = None
+        depth = 0
+        size = 0
+        parent_task_model = self.task_models.get(str(spiff_task.parent.id)) if spiff_task.parent is not None else None
+        if parent_task_model is not None and parent_task_model.json_data_hash in self.task_data_by_json_data_hash:
+            base_data, base_depth, base_size = self.task_data_by_json_data_hash[parent_task_model.json_data_hash]
+            if base_depth < current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_LENGTH"]:
+                json_data_dict = JsonDataModel.delta_json_data_dict(
+                    parent_task_model.json_data_hash, base_data, task_data, base_depth
+                )
+                if json_data_dict is not None:
+                    size = JsonDataModel.resolved_data_size(base_data, base_size, json_data_dict["data"])
+                depth = base_depth + 1
+        if json_data_dict is None:
+            json_data_dict, size = JsonDataModel.json_data_dict_and_size_from_dict(task_data)
+            depth = 0
+
+        # the serializer gives us a fresh copy of the task data so it is safe to keep around as a base
+        self.task_data_by_json_data_hash[json_data_dict["hash"]] = (task_data, depth, size)
+        task_model.json_data_size = size
+        if task_model.json_data_hash != json_data_dict["hash"]:
+            task_model.json_data_hash = json_data_dict["hash"]
+            return json_data_dict
+        return None
+
     def find_or_create_task_model_from_spiff_task(
         self,
         spiff_task: SpiffTask,
     ) -> tuple[BpmnProcessModel | None, TaskModel]:
         spiff_task_guid = str(spiff_task.id)
-        task_model: TaskModel | None = TaskModel.query.filter_by(guid=spiff_task_guid).first()
+        task_model = self._find_task_model(spiff_task_guid)
         bpmn_process = None
         if task_model is None:
             bpmn_process = self.task_bpmn_process(
                 spiff_task,
             )
-            task_definition = self.bpmn_definition_to_task_definitions_mappings[spiff_task.workflow.spec.name][
-                spiff_task.task_spec.name
-            ]
-            task_model = TaskModel(
-                guid=spiff_task_guid,
-                bpmn_process_id=bpmn_process.id,
-                process_instance_id=self.process_instance.id,
-                task_definition_id=task_definition.id,
-            )
+            # adding a new bpmn process adds its tasks as well so reuse that task model instead of counting its data twice
+            task_model = self.task_models.get(spiff_task_guid)
+            if task_model is None:
+                task_definition = self.bpmn_definition_to_task_definitions_mappings[spiff_task.workflow.spec.name][
+                    spiff_task.task_spec.name
+                ]
+                task_model = TaskModel(
+                    guid=spiff_task_guid,
+                    bpmn_process_id=bpmn_process.id,
+                    process_instance_id=self.process_instance.id,
+                    task_definition_id=task_definition.id,
+                )
 
         return (bpmn_process, task_model)
 
@@ -350,7 +431,7 @@ class TaskService:
                     spiff_workflow=spiff_workflow,
                 )
         else:
-            bpmn_process = BpmnProcessModel.query.filter_by(guid=subprocess_guid).first()
+            bpmn_process = self._find_bpmn_process_by_guid(subprocess_guid)
             if bpmn_process is None:
                 spiff_workflow = spiff_task.workflow
                 bpmn_process = self.add_bpmn_process(
@@ -385,9 +466,14 @@ class TaskService:
 
         bpmn_process = None
         if top_level_process is not None:
-            bpmn_process = BpmnProcessModel.query.filter_by(
-                top_level_process_id=top_level_process.id, guid=bpmn_process_guid
-            ).first()
+            if self.prefetch_enabled:
+                # all of the prefetched subprocesses belong to this instance's top level process
+                if bpmn_process_guid is not None:
+                    bpmn_process = self._find_bpmn_process_by_guid(bpmn_process_guid)
+            else:
+                bpmn_process = BpmnProcessModel.query.filter_by(
+                    top_level_process_id=top_level_process.id, guid=bpmn_process_guid
+                ).first()
         elif self.process_instance.bpmn_process_id is not None:
             bpmn_process = self.process_instance.bpmn_process
 
@@ -403,7 +489,7 @@ class TaskService:
 
             if top_level_process is not None:
                 subprocesses = spiff_workflow.top_workflow.subprocesses
-                direct_bpmn_process_parent = top_level_process
+                direct_bpmn_process_parent: BpmnProcessModel | None = top_level_process
 
                 # BpmnWorkflows do not know their own guid so we have to cycle through subprocesses to find the guid that matches
                 # calling list(subprocesses) to make a copy of the keys so we can change subprocesses while iterating
@@ -412,7 +498,7 @@ class TaskService:
                 for subprocess_guid in list(subprocesses):
                     subprocess = subprocesses[subprocess_guid]
                     if subprocess == spiff_workflow.parent_workflow:
-                        direct_bpmn_process_parent = BpmnProcessModel.query.filter_by(guid=str(subprocess_guid)).first()
+                        direct_bpmn_process_parent = self._find_bpmn_process_by_guid(str(subprocess_guid))
                         if direct_bpmn_process_parent is None:
                             raise BpmnProcessNotFoundError(
                                 f"Could not find bpmn process with guid: {str(subprocess_guid)} "
@@ -440,6 +526,11 @@ class TaskService:
         # Since we bulk insert tasks later we need to add the bpmn_process to the session
         # to ensure we have an id.
         db.session.add(bpmn_process)
+        if bpmn_process_is_new:
+            # this used to happen through autoflush when querying for its tasks but those may have been prefetched
+            db.session.flush()
+        if self.prefetched_bpmn_processes_by_id is not None:
+            self._add_prefetched_bpmn_process(bpmn_process)
 
         if bpmn_process_is_new:
             self.add_tasks_to_bpmn_process(
@@ -462,7 +553,7 @@ class TaskService:
             if spiff_task.has_state(TaskState.PREDICTED_MASK):
                 self.__class__.remove_spiff_task_from_parent(spiff_task, self.task_models)
                 continue
-            task_model = TaskModel.query.filter_by(guid=task_id).first()
+            task_model = self._find_task_model(task_id)
             if task_model is None:
                 task_model = self.__class__._create_task(
                     bpmn_process,
@@ -498,6 +589,7 @@ class TaskService:
         # otherwise sqlalchemy returns several warnings.
         for task in human_tasks_to_clear + tasks_to_clear:
             db.session.delete(task)
+        self.__class__.remove_task_data_sizes_from_process_instance(self.process_instance, tasks_to_clear)
 
         bpmn_processes_to_delete = (
             BpmnProcessModel.query.filter(BpmnProcessModel.guid.in_(deleted_task_guids))  # type: ignore
@@ -539,26 +631,87 @@ class TaskService:
     ) -> JsonDataDict | None:
         data_dict_to_use = bpmn_process_data_dict
         if bpmn_process_instance is not None:
-            data_dict_to_use = self.serializer.to_dict(bpmn_process_instance.data)
+            workflow_data = bpmn_process_instance.data
+            data_dict_to_use = memoize_for_object(
+                workflow_data, lambda: self.serializer.to_dict(workflow_data), kind="serialized_workflow_data"
+            )
         if data_dict_to_use is None:
             data_dict_to_use = {}
-        bpmn_process_data_json = json.dumps(data_dict_to_use, sort_keys=True)
-        bpmn_process_data_hash: str = sha256(bpmn_process_data_json.encode("utf8")).hexdigest()
+        bpmn_process_data_hash = content_hash(data_dict_to_use)
         json_data_dict: JsonDataDict | None = None
         if bpmn_process.json_data_hash != bpmn_process_data_hash:
             json_data_dict = {"hash": bpmn_process_data_hash, "data": data_dict_to_use}
             bpmn_process.json_data_hash = bpmn_process_data_hash
         return json_data_dict
 
+    def _prefetch_if_enabled(self) -> None:
+        if self.prefetch_enabled and self.prefetched_task_models is None:
+            self.prefetch_process_instance_models()
+
+    def _find_task_model(self, guid: str) -> TaskModel | None:
+        self._prefetch_if_enabled()
+        if self.prefetched_task_models is None:
+            task_model: TaskModel | None = TaskModel.query.filter_by(guid=guid).first()
+            return task_model
+        return self.prefetched_task_models.get(guid)
+
+    def _find_bpmn_process_by_id(self, bpmn_process_id: int | None) -> BpmnProcessModel:
+        self._prefetch_if_enabled()
+        if self.prefetched_bpmn_processes_by_id is not None and bpmn_process_id in self.prefetched_bpmn_processes_by_id:
+            return self.prefetched_bpmn_processes_by_id[bpmn_process_id]
+        bpmn_process: BpmnProcessModel | None = BpmnProcessModel.query.filter_by(id=bpmn_process_id).first()
+        if bpmn_process is None:
+            raise BpmnProcessNotFoundError(f"Could not find bpmn process with id: {bpmn_process_id}")
+        return bpmn_process
+
+    def _find_bpmn_process_by_guid(self, guid: str | None) -> BpmnProcessModel | None:
+        self._prefetch_if_enabled()
+        if self.prefetched_bpmn_processes_by_guid is None:
+            bpmn_process: BpmnProcessModel | None = BpmnProcessModel.query.filter_by(guid=guid).first()
+            return bpmn_process
+        if guid is None:
+            return None
+        return self.prefetched_bpmn_processes_by_guid.get(guid)
+
+    def _add_prefetched_bpmn_process(self, bpmn_process: BpmnProcessModel) -> None:
+        if self.prefetched_bpmn_processes_by_id is not None:
+            self.prefetched_bpmn_processes_by_id[bpmn_process.id] = bpmn_process
+        if self.prefetched_bpmn_processes_by_guid is not None and bpmn_process.guid is not None:
+            self.prefetched_bpmn_processes_by_guid[bpmn_process.guid] = bpmn_process
+
     @classmethod
     def update_json_data_on_db_model_and_return_dict_if_updated(
         cls, db_model: SpiffworkflowBaseDBModel, task_data_dict: dict, task_model_data_column: str
     ) -> JsonDataDict | None:
-        json_data_dict = JsonDataModel.json_data_dict_from_dict(task_data_dict)
+        return cls.update_json_data_and_size_on_db_model(db_model, task_data_dict, task_model_data_column)[0]
+
+    @classmethod
+    def update_json_data_and_size_on_db_model(
+        cls, db_model: SpiffworkflowBaseDBModel, task_data_dict: dict, task_model_data_column: str
+    ) -> tuple[JsonDataDict | None, int]:
+        """Like update_json_data_on_db_model_and_return_dict_if_updated but also returns the serialized size of the data."""
+        json_data_dict, size = JsonDataModel.json_data_dict_and_size_from_dict(task_data_dict)
         if getattr(db_model, task_model_data_column) != json_data_dict["hash"]:
             setattr(db_model, task_model_data_column, json_data_dict["hash"])
-            return json_data_dict
-        return None
+            return (json_data_dict, size)
+        return (None, size)
+
+    def _update_data_sizes_on_process_instance(
+        self, previous_json_data_size: int | None, json_data_size: int | None, python_env_size: int
+    ) -> None:
+        # the python environment is the whole state of the script engine so it is not added up across tasks
+        self.process_instance.python_env_size = python_env_size
+        # instances that were started before sizes were tracked have no total to keep up to date
+        if self.process_instance.task_data_size is not None:
+            self.process_instance.task_data_size += (json_data_size or 0) - (previous_json_data_size or 0)
+
+    @classmethod
+    def remove_task_data_sizes_from_process_instance(
+        cls, process_instance: ProcessInstanceModel, task_models: list[TaskModel]
+    ) -> None:
+        """Call this for tasks that are being deleted so their data no longer counts toward the instance's size."""
+        if process_instance.task_data_size is not None:
+            process_instance.task_data_size -= sum(t.json_data_size or 0 for t in task_models)
 
     @classmethod
     def bpmn_process_and_descendants(cls, bpmn_processes: list[BpmnProcessModel]) -> list[BpmnProcessModel]:
@@ -791,7 +944,9 @@ class TaskService:
 
     @classmethod
     def _get_python_env_data_dict_from_spiff_task(cls, spiff_task: SpiffTask, serializer: BpmnWorkflowSerializer) -> dict:
-        user_defined_state = spiff_task.workflow.script_engine.environment.user_defined_state()
+        environment = spiff_task.workflow.script_engine.environment
         # this helps to convert items like datetime objects to be json serializable
-        converted_data: dict = serializer.registry.convert(user_defined_state)
+        converted_data: dict = memoize_for_object(
+            environment, lambda: serializer.registry.convert(environment.user_defined_state()), kind="converted_python_env"
+        )
         return converted_data
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import concurrent.futures
+import os
+import threading
 import time
+import weakref
 from abc import abstractmethod
 from collections.abc import Callable
 from datetime import datetime
@@ -26,6 +29,8 @@ from spiffworkflow_backend.background_processing.celery_tasks.process_instance_t
 )
 from spiffworkflow_backend.data_stores.kkv import KKVDataStore
 from spiffworkflow_backend.exceptions.api_error import ApiError
+from spiffworkflow_backend.helpers.benchmarking import PhaseTimings
+from spiffworkflow_backend.helpers.content_hash import memoized_content_hashes
 from spiffworkflow_backend.helpers.spiff_enum import SpiffEnum
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.future_task import FutureTaskModel
@@ -36,7 +41,9 @@ from spiffworkflow_backend.models.process_instance_event import ProcessInstanceE
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.assertion_service import safe_assertion
 from spiffworkflow_backend.services.jinja_service import JinjaService
+from spiffworkflow_backend.services.message_correlation_service import MessageCorrelationService
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_progress_service import ProcessInstanceProgressService
 from spiffworkflow_backend.services.process_instance_tmp_service import ProcessInstanceTmpService
 from spiffworkflow_backend.services.task_service import StartAndEndTimes
 from spiffworkflow_backend.services.task_service import TaskService
@@ -95,10 +102,28 @@ class EngineStepDelegate:
 class ExecutionStrategy:
     """Interface of sorts for a concrete execution strategy."""
 
+    # one bounded pool per process for running ready engine steps in parallel instead of one pool per loop
+    _engine_step_executor: concurrent.futures.ThreadPoolExecutor | None = None
+    _engine_step_executor_pid: int | None = None
+    _engine_step_executor_lock = threading.Lock()
+    _thread_local = threading.local()
+
     def __init__(self, delegate: EngineStepDelegate, options: dict | None = None):
         self.delegate = delegate
         self.options = options
 
+    @classmethod
+    def engine_step_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
+        with cls._engine_step_executor_lock:
+            if cls._engine_step_executor is None or cls._engine_step_executor_pid != os.getpid():
+                # threads do not survive a fork so a pool inherited from the parent process has no workers
+                cls._engine_step_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_THREAD_POOL_SIZE"],
+                    thread_name_prefix="engine-step",
+                )
+                cls._engine_step_executor_pid = os.getpid()
+            return cls._engine_step_executor
+
     def should_break_before(self, tasks: list[SpiffTask], process_instance_model: ProcessInstanceModel) -> bool:
         return False
 
@@ -121,7 +146,11 @@ class ExecutionStrategy:
                 tld.process_model_identifier = process_model_identifier
 
             g.user = user
-            spiff_task.run()
+            self._thread_local.in_engine_step_executor = True
+            try:
+                spiff_task.run()
+            finally:
+                self._thread_local.in_engine_step_executor = False
             return spiff_task
 
     def spiff_run(
@@ -159,7 +188,13 @@ class ExecutionStrategy:
                         if isinstance(child_task.task_spec, UnstructuredJoin):
                             has_gateway_children = True
 
-                if current_app.config["SPIFFWORKFLOW_BACKEND_USE_THREADS_FOR_TASK_EXECUTION"] and not has_gateway_children:
+                # tasks already running on the shared pool could wait forever on a full pool so they run their steps inline
+                in_engine_step_executor = getattr(self._thread_local, "in_engine_step_executor", False)
+                if (
+                    current_app.config["SPIFFWORKFLOW_BACKEND_USE_THREADS_FOR_TASK_EXECUTION"]
+                    and not has_gateway_children
+                    and not in_engine_step_executor
+                ):
                     self._run_engine_steps_with_threads(engine_steps, process_instance_model, user)
                 else:
                     self._run_engine_steps_without_threads(engine_steps, process_instance_model, user)
@@ -189,23 +224,25 @@ class ExecutionStrategy:
         # service tasks at once - many api calls, and then get those responses back without
         # waiting for each individual task to complete.
         futures = []
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for spiff_task in engine_steps:
-                self.delegate.will_complete_task(spiff_task)
-                futures.append(
-                    executor.submit(
-                        self._run,
-                        spiff_task,
-                        current_app._get_current_object(),
-                        user,
-                        process_instance.process_model_identifier,
-                    )
+        executor = self.engine_step_executor()
+        for spiff_task in engine_steps:
+            self.delegate.will_complete_task(spiff_task)
+            futures.append(
+                executor.submit(
+                    self._run,
+                    spiff_task,
+                    current_app._get_current_object(),
+                    user,
+                    process_instance.process_model_identifier,
                 )
-            for future in concurrent.futures.as_completed(futures):
-                spiff_task = future.result()
+            )
+        # wait for every step like leaving a with block on the executor did before raising the first error
+        concurrent.futures.wait(futures)
+        for future in futures:
+            spiff_task = future.result()
 
-            for spiff_task in engine_steps:
-                self.delegate.did_complete_task(spiff_task)
+        for spiff_task in engine_steps:
+            self.delegate.did_complete_task(spiff_task)
 
     def _run_engine_steps_without_threads(
         self, engine_steps: list[SpiffTask], process_instance: ProcessInstanceModel, user: UserModel | None
@@ -221,6 +258,79 @@ class ExecutionStrategy:
             self.delegate.did_complete_task(spiff_task)
 
 
+class TaskChangeTracker:
+    """Remembers what non-completed spiff tasks looked like when they were last persisted.
+
+    Persisting a task serializes it, writes its row and upserts its data so we only want to do that for
+    tasks that could have changed. A task is considered unchanged if its state, last_state_change,
+    triggered flag, number of children and data version are the same as before.
+
+    Spiff does not keep a version of task data so one is kept here. It is bumped with mark_data_changed
+    whenever a script runs on a task or the backend sets data on a task, which also catches values that
+    were modified in place, like a script changing a nested dict. Anything that sets task data outside of
+    a script must call mark_data_changed for the change to be saved while the task is not completed.
+    """
+
+    # these tasks have state spiff can change without updating last_state_change, such as multi-instance
+    # and subprocess tasks, and there are few enough of them that it is not worth the risk.
+    STATES_TO_ALWAYS_PERSIST = TaskState.STARTED | TaskState.ERROR
+
+    # keyed by the spiff task or script engine environment whose data changed
+    _data_versions: weakref.WeakKeyDictionary[Any, int] = weakref.WeakKeyDictionary()
+    _data_versions_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self.task_versions: dict[UUID, tuple] = {}
+        self.environment_version: tuple[int, int] | None = None
+
+    @classmethod
+    def mark_data_changed(cls, changed: Any) -> None:
+        """Takes the spiff task whose data or the script engine environment whose state was changed."""
+        with cls._data_versions_lock:
+            cls._data_versions[changed] = cls._data_versions.get(changed, 0) + 1
+
+    @classmethod
+    def data_version(cls, changed: Any) -> int:
+        with cls._data_versions_lock:
+            return cls._data_versions.get(changed, 0)
+
+    def record(self, spiff_tasks: list[SpiffTask], bpmn_process_instance: BpmnWorkflow) -> None:
+        self.environment_version = self._environment_version(bpmn_process_instance)
+        for spiff_task in spiff_tasks:
+            # completed tasks are never considered for persistence again so there is no need to remember them
+            if not spiff_task.has_state(TaskState.COMPLETED):
+                self.task_versions[spiff_task.id] = self._task_version(spiff_task)
+
+    def changed_tasks(self, spiff_tasks: list[SpiffTask], bpmn_process_instance: BpmnWorkflow) -> list[SpiffTask]:
+        # the python environment state is saved on every task so if it changed then every task needs to be saved
+        if self.environment_version != self._environment_version(bpmn_process_instance):
+            return spiff_tasks
+        return [
+            spiff_task
+            for spiff_task in spiff_tasks
+            if spiff_task.has_state(self.STATES_TO_ALWAYS_PERSIST)
+            or spiff_task.id not in self.task_versions
+            or self.task_versions[spiff_task.id] != self._task_version(spiff_task)
+        ]
+
+    def clear(self) -> None:
+        self.task_versions = {}
+        self.environment_version = None
+
+    def _task_version(self, spiff_task: SpiffTask) -> tuple:
+        return (
+            spiff_task.state,
+            spiff_task.last_state_change,
+            spiff_task.triggered,
+            len(spiff_task._children),
+            self.data_version(spiff_task),
+        )
+
+    def _environment_version(self, bpmn_process_instance: BpmnWorkflow) -> tuple[int, int]:
+        environment = bpmn_process_instance.script_engine.environment
+        return (id(environment), self.data_version(environment))
+
+
 class TaskModelSavingDelegate(EngineStepDelegate):
     """Engine step delegate that takes care of saving a task model to the database.
 
@@ -233,8 +343,10 @@ class TaskModelSavingDelegate(EngineStepDelegate):
         process_instance: ProcessInstanceModel,
         bpmn_definition_to_task_definitions_mappings: dict,
         secondary_engine_step_delegate: EngineStepDelegate | None = None,
+        task_change_tracker: TaskChangeTracker | None = None,
     ) -> None:
         self.secondary_engine_step_delegate = secondary_engine_step_delegate
+        self.task_change_tracker = task_change_tracker
         self.process_instance = process_instance
         self.bpmn_definition_to_task_definitions_mappings = bpmn_definition_to_task_definitions_mappings
         self.serializer = serializer
@@ -251,6 +363,9 @@ class TaskModelSavingDelegate(EngineStepDelegate):
             bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
             run_started_at=time.time(),
         )
+        # tasks are only saved while the instance is dequeued so the rows it already has can all be loaded at once
+        if current_app.config["SPIFFWORKFLOW_BACKEND_TASK_MODEL_PREFETCH_ENABLED"]:
+            self.task_service.enable_prefetching()
 
     def will_complete_task(self, spiff_task: SpiffTask) -> None:
         if self._should_update_task_model():
@@ -272,6 +387,7 @@ class TaskModelSavingDelegate(EngineStepDelegate):
             task_model.end_in_seconds = time.time()
 
             self.last_completed_spiff_task = spiff_task
+            ProcessInstanceProgressService.notify_progress(self.process_instance.id)
         if (
             spiff_task.task_spec.__class__.__name__ in ["StartEvent", "EndEvent", "IntermediateThrowEvent"]
             and spiff_task.task_spec.bpmn_name is not None
@@ -288,14 +404,15 @@ class TaskModelSavingDelegate(EngineStepDelegate):
             self.secondary_engine_step_delegate.did_complete_task(spiff_task)
 
     def add_object_to_db_session(self, bpmn_process_instance: BpmnWorkflow) -> None:
-        # NOTE: process-all-tasks: All tests pass with this but it's less efficient and would be nice to replace
-        # excludes COMPLETED. the others were required to get PP1 to go to completion.
+        # NOTE: process-all-tasks: excludes COMPLETED. the others were required to get PP1 to go to completion.
         # process FUTURE tasks because Boundary events are not processed otherwise.
         #
         # ANOTHER NOTE: at one point we attempted to be smarter about what tasks we considered for persistence,
         # but it didn't quite work in all cases, so we deleted it. you can find it in commit
         # 1ead87b4b496525df8cc0e27836c3e987d593dc0 if you are curious.
-        for waiting_spiff_task in bpmn_process_instance.get_tasks(
+        # we still consider all of these tasks but the task_change_tracker lets us skip the ones that have not
+        # changed since they were last persisted.
+        spiff_tasks = bpmn_process_instance.get_tasks(
             state=TaskState.WAITING
             | TaskState.CANCELLED
             | TaskState.READY
@@ -304,10 +421,25 @@ class TaskModelSavingDelegate(EngineStepDelegate):
             | TaskState.FUTURE
             | TaskState.STARTED
             | TaskState.ERROR,
-        ):
-            self.task_service.update_task_model_with_spiff_task(waiting_spiff_task)
+        )
+        spiff_tasks_to_update = spiff_tasks
+        if self.task_change_tracker is not None:
+            spiff_tasks_to_update = self.task_change_tracker.changed_tasks(spiff_tasks, bpmn_process_instance)
+
+        # nothing runs while we save so the process data and python environment state that get saved
+        # along with every task can be serialized and hashed once.
+        with memoized_content_hashes():
+            for waiting_spiff_task in spiff_tasks_to_update:
+                self.task_service.update_task_model_with_spiff_task(waiting_spiff_task)
+
+            # the top level process data is normally saved along with its tasks but can change on its own
+            # when the script engine state is preserved on it.
+            if self.task_change_tracker is not None and self.process_instance.bpmn_process is not None:
+                self.task_service.update_bpmn_process(bpmn_process_instance, self.process_instance.bpmn_process)
 
         self.task_service.save_objects_to_database()
+        if self.task_change_tracker is not None:
+            self.task_change_tracker.record(spiff_tasks, bpmn_process_instance)
 
         if self.secondary_engine_step_delegate:
             self.secondary_engine_step_delegate.add_object_to_db_session(bpmn_process_instance)
@@ -427,12 +559,14 @@ class WorkflowExecutionService:
         execution_strategy: ExecutionStrategy,
         process_instance_completer: ProcessInstanceCompleter,
         process_instance_saver: ProcessInstanceSaver,
+        phase_timings: PhaseTimings | None = None,
     ):
         self.bpmn_process_instance = bpmn_process_instance
         self.process_instance_model = process_instance_model
         self.execution_strategy = execution_strategy
         self.process_instance_completer = process_instance_completer
         self.process_instance_saver = process_instance_saver
+        self.phase_timings = phase_timings or PhaseTimings()
 
     # names of methods that do spiff stuff:
     # processor.do_engine_steps calls:
@@ -448,19 +582,20 @@ class WorkflowExecutionService:
                         f" instance ({self.process_instance_model.id})."
                     )
         try:
-            self.bpmn_process_instance.refresh_waiting_tasks()
+            with self.phase_timings.phase("run"):
+                self.bpmn_process_instance.refresh_waiting_tasks()
 
-            # TODO: implicit re-entrant locks here `with_dequeued`
-            task_runnability = self.execution_strategy.spiff_run(
-                self.bpmn_process_instance, exit_at=exit_at, process_instance_model=self.process_instance_model
-            )
+                # TODO: implicit re-entrant locks here `with_dequeued`
+                task_runnability = self.execution_strategy.spiff_run(
+                    self.bpmn_process_instance, exit_at=exit_at, process_instance_model=self.process_instance_model
+                )
 
-            if self.bpmn_process_instance.is_completed():
-                self.process_instance_completer(self.bpmn_process_instance)
+                if self.bpmn_process_instance.is_completed():
+                    self.process_instance_completer(self.bpmn_process_instance)
 
-            self.process_bpmn_messages()
-            self.queue_waiting_receive_messages()
-            self.schedule_waiting_timer_events()
+                self.process_bpmn_messages()
+                self.queue_waiting_receive_messages()
+                self.schedule_waiting_timer_events()
             return task_runnability
         except WorkflowTaskException as wte:
             ProcessInstanceTmpService.add_event_to_process_instance(
@@ -478,9 +613,11 @@ class WorkflowExecutionService:
         finally:
             if self.process_instance_model.persistence_level != "none":
                 # even if a task fails, try to persist all tasks, which will include the error state.
-                self.execution_strategy.add_object_to_db_session(self.bpmn_process_instance)
+                with self.phase_timings.phase("persist"):
+                    self.execution_strategy.add_object_to_db_session(self.bpmn_process_instance)
                 if save:
-                    self.process_instance_saver()
+                    with self.phase_timings.phase("save"):
+                        self.process_instance_saver()
 
     def is_happening_soon(self, time_in_seconds: int) -> bool:
         # if it is supposed to happen in less than the amount of time we take between polling runs
@@ -555,6 +692,7 @@ class WorkflowExecutionService:
                 name=event.name,
                 correlation_keys=self.bpmn_process_instance.correlations,
             )
+            message_correlations = []
             for correlation_property in event.value:
                 message_correlation = MessageInstanceCorrelationRuleModel(
                     message_instance=message_instance,
@@ -563,7 +701,9 @@ class WorkflowExecutionService:
                     correlation_key_names=correlation_property.correlation_keys,
                 )
                 db.session.add(message_correlation)
+                message_correlations.append(message_correlation)
             db.session.add(message_instance)
+            MessageCorrelationService.add_correlation_values(message_instance, message_correlations)
 
             bpmn_process = self.process_instance_model.bpmn_process
 
@@ -34,6 +34,7 @@ from spiffworkflow_backend.services.process_instance_queue_service import Proces
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
 from spiffworkflow_backend.services.user_service import UserService
+from sqlalchemy import event
 from werkzeug.test import TestResponse  # type: ignore
 
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
@@ -578,6 +579,20 @@ class BaseTest:
         finally:
             app.config[config_identifier] = initial_value
 
+    @contextmanager
+    def count_queries(self) -> Generator[list[str], None, None]:
+        """Yields a list that gets every sql statement that is run inside of the block."""
+        statements: list[str] = []
+
+        def _record_statement(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _record_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _record_statement)
+
     def round_last_state_change(self, bpmn_process_dict: dict | list) -> None:
         """Round last state change to the nearest 4 significant digits.
 
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from flask.app import Flask
 from flask.testing import FlaskClient
@@ -136,6 +138,39 @@ class TestSecretService(SecretServiceTestHelpers):
         secrets = SecretModel.query.all()
         assert len(secrets) == 0
 
+    def test_decrypted_secrets_are_reused_until_they_change(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+        with_super_admin_user: UserModel,
+    ) -> None:
+        SecretService.invalidate_decrypted_secret()
+        SecretService.reset_decrypted_secret_cache_stats()
+        self.add_test_secret(with_super_admin_user)
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_SECRET_CACHE_TTL_IN_SECONDS", 30):
+            with patch.object(SecretService, "_decrypt", wraps=SecretService._decrypt) as mock_decrypt:
+                for _ in range(3):
+                    assert SecretService.get_decrypted_secret_value(self.test_key) == self.test_value
+                assert SecretService.resolve_possibly_secret_value(f"Bearer SPIFF_SECRET:{self.test_key}") == (
+                    f"Bearer {self.test_value}"
+                )
+                assert mock_decrypt.call_count == 1
+                assert SecretService.decrypted_secret_cache_stats()["hits"] == 3
+
+                SecretService.update_secret(self.test_key, "new_secret_value", with_super_admin_user.id)
+                assert SecretService.get_decrypted_secret_value(self.test_key) == "new_secret_value"  # noqa: S105
+                assert mock_decrypt.call_count == 2
+
+            # an expired entry is reused if the stored value did not change
+            with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_SECRET_CACHE_TTL_IN_SECONDS", 0.000001):
+                assert SecretService.get_decrypted_secret_value(self.test_key) == "new_secret_value"  # noqa: S105
+            assert SecretService.decrypted_secret_cache_stats()["revalidations"] == 1
+            assert "new_secret_value" not in repr(SecretService._decrypted_secret_cache)
+
+            SecretService.delete_secret(self.test_key, with_super_admin_user.id)
+            with pytest.raises(ApiError):
+                SecretService.get_decrypted_secret_value(self.test_key)
+
     def test_delete_secret_bad_secret_fails(
         self,
         app: Flask,
@@ -94,6 +94,36 @@ class TestBackgroundProcessingService(BaseTest):
         ProcessInstanceService.do_waiting(ProcessInstanceStatus.waiting.value)
         assert process_instance.status == ProcessInstanceStatus.waiting.value
 
+    def test_do_waiting_claims_process_instances_in_batches(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance_ids = [
+            self.create_process_instance_from_process_model(process_model=process_model, status="waiting").id for _ in range(3)
+        ]
+        # do_waiting leaves alone anything that was enqueued in the last minute
+        db.session.query(ProcessInstanceQueueModel).update({"updated_at_in_seconds": round(time.time()) - 120})
+        db.session.commit()
+
+        dequeue_many_spy = mocker.spy(ProcessInstanceQueueService, "dequeue_many")
+        run_mock = mocker.patch.object(ProcessInstanceService, "run_process_instance_with_processor")
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_DEQUEUE_BATCH_SIZE", 2):
+            ProcessInstanceService.do_waiting(ProcessInstanceStatus.waiting.value)
+
+        assert sorted(call.args[0].id for call in run_mock.call_args_list) == process_instance_ids
+        # two batches and the empty claim that ends the loop
+        assert dequeue_many_spy.call_count == 3
+        queue_entries = ProcessInstanceQueueModel.query.all()
+        assert len(queue_entries) == 3
+        assert all(queue_entry.locked_by is None for queue_entry in queue_entries)
+
     def _load_up_a_future_task_and_return_instance(self) -> ProcessInstanceModel:
         process_model = load_test_spec(
             process_model_id="test_group/user-task-with-timer",
@@ -0,0 +1,90 @@
+from flask.app import Flask
+from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
+from spiffworkflow_backend.services.bpmn_process_definition_cache_service import BpmnProcessDefinitionCacheService
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestBpmnProcessDefinitionCacheService(BaseTest):
+    def test_reuses_definitions_when_loading_a_process_instance(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        BpmnProcessDefinitionCacheService.clear()
+        BpmnProcessDefinitionCacheService.reset_stats()
+
+        first_processor = ProcessInstanceProcessor(process_instance)
+        second_processor = ProcessInstanceProcessor(process_instance)
+
+        stats = BpmnProcessDefinitionCacheService.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+        assert first_processor.serialize() == second_processor.serialize()
+        first_mappings = first_processor.bpmn_definition_to_task_definitions_mappings
+        second_mappings = second_processor.bpmn_definition_to_task_definitions_mappings
+        assert first_mappings.keys() == second_mappings.keys()
+        for bpmn_identifier, definitions in first_mappings.items():
+            assert definitions.keys() == second_mappings[bpmn_identifier].keys()
+            for key, db_model in definitions.items():
+                assert db_model.id == second_mappings[bpmn_identifier][key].id
+
+    def test_does_not_cache_when_disabled(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        BpmnProcessDefinitionCacheService.clear()
+        BpmnProcessDefinitionCacheService.reset_stats()
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_BPMN_PROCESS_DEFINITION_CACHE_ENABLED", False):
+            ProcessInstanceProcessor(process_instance)
+            ProcessInstanceProcessor(process_instance)
+
+        assert BpmnProcessDefinitionCacheService.stats()["size"] == 0
+
+    def test_does_not_reuse_definitions_when_the_row_id_changes(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        BpmnProcessDefinitionCacheService.clear()
+        ProcessInstanceProcessor(process_instance)
+        bpmn_process_definition = process_instance.bpmn_process_definition
+        assert BpmnProcessDefinitionCacheService.get(bpmn_process_definition) is not None
+
+        # the same definition written again after its rows were deleted gets a new id
+        rewritten_bpmn_process_definition = BpmnProcessDefinitionModel(
+            id=bpmn_process_definition.id + 1,
+            full_process_model_hash=bpmn_process_definition.full_process_model_hash,
+        )
+        assert BpmnProcessDefinitionCacheService.get(rewritten_bpmn_process_definition) is None
+        assert BpmnProcessDefinitionCacheService.stats()["size"] == 0
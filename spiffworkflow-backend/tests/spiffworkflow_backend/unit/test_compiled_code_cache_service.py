@@ -0,0 +1,50 @@
+import pytest
+from flask import Flask
+from spiffworkflow_backend.services.compiled_code_cache_service import CompiledCodeCacheService
+from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+class TestCompiledCodeCacheService(BaseTest):
+    def test_reuses_compiled_code_for_the_same_source(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        CompiledCodeCacheService.clear()
+        CompiledCodeCacheService.reset_stats()
+        script_engine = CustomBpmnScriptEngine()
+
+        for amount in range(3):
+            # leading whitespace is allowed in expressions just like with eval
+            assert script_engine.environment.evaluate("  amount > 1", {"amount": amount}) is (amount > 1)
+            context = {"amount": amount}
+            script_engine.environment.execute("doubled = amount * 2", context)
+            assert context["doubled"] == amount * 2
+        assert CompiledCodeCacheService.stats() == {"hits": 4, "misses": 2, "evictions": 0, "size": 2}
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_COMPILED_CODE_CACHE_MAX_ENTRIES", 1):
+            CompiledCodeCacheService.compile("amount + 1", "eval")
+        assert CompiledCodeCacheService.stats()["evictions"] == 2
+        assert CompiledCodeCacheService.stats()["size"] == 1
+
+    def test_errors_point_at_the_script_line(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        script_engine = CustomBpmnScriptEngine()
+        script = "a = 1\nb = a / 0\n"
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError) as exception:
+                script_engine.environment.execute(script, {})
+            # get_error_line_number_and_content looks for the "<string>" frame in the current traceback
+            try:
+                raise exception.value
+            except ZeroDivisionError as error:
+                assert script_engine.get_error_line_number_and_content(script, error) == (2, "b = a / 0")
+
+        with pytest.raises(SyntaxError) as syntax_error:
+            CompiledCodeCacheService.compile("a = 1\nb = (\n", "exec")
+        assert syntax_error.value.lineno == 2
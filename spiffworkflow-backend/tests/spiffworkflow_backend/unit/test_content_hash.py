@@ -0,0 +1,79 @@
+import json
+from hashlib import sha256
+
+import pytest
+from flask.app import Flask
+from spiffworkflow_backend.helpers.content_hash import UnknownContentHashAlgorithmError
+from spiffworkflow_backend.helpers.content_hash import content_hash
+from spiffworkflow_backend.helpers.content_hash import content_hash_and_size
+from spiffworkflow_backend.helpers.content_hash import memoize_for_object
+from spiffworkflow_backend.helpers.content_hash import memoized_content_hashes
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+class TestContentHash(BaseTest):
+    def test_default_algorithm_matches_existing_hashes(
+        self,
+        app: Flask,
+    ) -> None:
+        data = {"b": [1, 2, {"d": "é", "c": None}], "a": 1.5}
+        expected_hash = sha256(json.dumps(data, sort_keys=True).encode("utf8")).hexdigest()
+        assert content_hash(data) == expected_hash
+
+    def test_blake2b_hashes_are_prefixed_and_ignore_key_order(
+        self,
+        app: Flask,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM", "blake2b"):
+            first_hash = content_hash({"a": 1, "b": {"c": "é", "d": [1, 2]}})
+            second_hash = content_hash({"b": {"d": [1, 2], "c": "é"}, "a": 1})
+            different_hash = content_hash({"a": 2, "b": {"c": "é", "d": [1, 2]}})
+        assert first_hash.startswith("blake2b:")
+        assert first_hash == second_hash
+        assert first_hash != different_hash
+
+    def test_size_is_the_length_of_what_was_hashed(
+        self,
+        app: Flask,
+    ) -> None:
+        data = {"b": "é", "a": [1, 2]}
+        assert content_hash_and_size(data) == (content_hash(data), len(json.dumps(data, sort_keys=True).encode("utf8")))
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM", "blake2b"):
+            assert content_hash_and_size(data)[1] == len('{"a":[1,2],"b":"é"}'.encode())
+
+    def test_unknown_algorithm_raises(
+        self,
+        app: Flask,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM", "md5"):
+            with pytest.raises(UnknownContentHashAlgorithmError):
+                content_hash({"a": 1})
+
+    def test_memoizes_by_object_identity_only_when_enabled(
+        self,
+        app: Flask,
+    ) -> None:
+        data = {"a": 1}
+        calls = []
+
+        def compute() -> str:
+            calls.append(1)
+            return "result"
+
+        memoize_for_object(data, compute, kind="test")
+        memoize_for_object(data, compute, kind="test")
+        assert len(calls) == 2
+
+        with memoized_content_hashes():
+            memoize_for_object(data, compute, kind="test")
+            memoize_for_object(data, compute, kind="test")
+            memoize_for_object({"a": 1}, compute, kind="test")
+            # a different computation on the same object does not get the result of the first one
+            assert memoize_for_object(data, lambda: "other result", kind="other") == "other result"
+            first_hash = content_hash(data)
+            data["a"] = 2
+            # objects must not be modified while memoizing so this returns the hash from before
+            assert content_hash(data) == first_hash
+        assert len(calls) == 4
+        assert content_hash(data) != first_hash
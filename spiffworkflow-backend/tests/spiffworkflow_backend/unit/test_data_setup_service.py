@@ -0,0 +1,86 @@
+import os
+from unittest.mock import patch
+
+from flask import Flask
+from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_caller_relationship import ProcessCallerRelationshipModel
+from spiffworkflow_backend.models.reference_cache import ReferenceCacheModel
+from spiffworkflow_backend.services.data_setup_service import DataSetupService
+from spiffworkflow_backend.services.file_system_service import FileSystemService
+from spiffworkflow_backend.services.spec_file_service import SpecFileService
+from sqlalchemy.orm import aliased
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestDataSetupService(BaseTest):
+    def test_save_changed_process_models_only_parses_changed_process_models(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        load_test_spec("test_group/call_activity_nested", process_model_source_directory="call_activity_nested")
+        load_test_spec("test_group/hello_world", process_model_source_directory="hello_world")
+        DataSetupService.save_all_process_models()
+        previous_generation = CacheGenerationModel.newest_generation_for_table("reference_cache")
+        assert previous_generation is not None
+        references_before = self._references()
+        process_callers_before = self._process_callers()
+        assert len(process_callers_before) > 0
+
+        hello_world_path = os.path.join(FileSystemService.full_path_from_id("test_group/hello_world"), "hello_world.bpmn")
+        with open(hello_world_path) as f:
+            contents = f.read()
+        with open(hello_world_path, "w") as f:
+            f.write(contents.replace('name="Hello World Process"', 'name="Hello Again Process"'))
+
+        with patch.object(
+            SpecFileService, "get_references_for_process", wraps=SpecFileService.get_references_for_process
+        ) as mock_get_references_for_process:
+            failing_process_models = DataSetupService.save_changed_process_models(["test_group/hello_world/hello_world.bpmn"])
+        assert failing_process_models == []
+        assert mock_get_references_for_process.call_count == 1
+
+        new_generation = CacheGenerationModel.newest_generation_for_table("reference_cache")
+        assert new_generation is not None
+        assert new_generation.id > previous_generation.id
+        expected_references = [
+            (
+                (identifier, "Hello Again Process", type, file_name, relative_location)
+                if identifier == "Process_HelloWorld"
+                else (identifier, display_name, type, file_name, relative_location)
+            )
+            for identifier, display_name, type, file_name, relative_location in references_before
+        ]
+        assert self._references() == expected_references
+        assert self._process_callers() == process_callers_before
+
+    def _references(self) -> list[tuple[str, str, str, str, str]]:
+        return sorted(
+            (r.identifier, r.display_name, r.type, r.file_name, r.relative_location)
+            for r in ReferenceCacheModel.basic_query().all()
+        )
+
+    def _process_callers(self) -> list[tuple[str, str]]:
+        """Called and calling process identifiers in the newest generation."""
+        generation = CacheGenerationModel.newest_generation_for_table("reference_cache")
+        assert generation is not None
+        called_reference_alias = aliased(ReferenceCacheModel)
+        calling_reference_alias = aliased(ReferenceCacheModel)
+        rows = (
+            db.session.query(called_reference_alias.identifier, calling_reference_alias.identifier)  # type: ignore
+            .select_from(ProcessCallerRelationshipModel)
+            .join(
+                called_reference_alias,
+                called_reference_alias.id == ProcessCallerRelationshipModel.called_reference_cache_process_id,
+            )
+            .join(
+                calling_reference_alias,
+                calling_reference_alias.id == ProcessCallerRelationshipModel.calling_reference_cache_process_id,
+            )
+            .filter(calling_reference_alias.generation_id == generation.id)
+            .all()
+        )
+        return sorted((called, calling) for called, calling in rows)
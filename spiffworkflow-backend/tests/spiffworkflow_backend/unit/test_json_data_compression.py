@@ -0,0 +1,60 @@
+from flask import Flask
+from spiffworkflow_backend.helpers.json_data_compression import JsonDataCompression
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+class TestJsonDataCompression(BaseTest):
+    def test_compresses_large_rows_transparently(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        large_data = {"file": "a" * 10000, "values": list(range(100))}
+        small_data = {"a": 1}
+        JsonDataCompression.reset_stats()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_ENABLED", True):
+            large_hash = JsonDataModel.create_and_insert_json_data_from_dict(large_data)
+            small_hash = JsonDataModel.create_and_insert_json_data_from_dict(small_data)
+            db.session.commit()
+        assert large_hash == JsonDataModel.json_data_dict_from_dict(large_data)["hash"]
+
+        large_row = JsonDataModel.find_object_by_hash(large_hash)
+        assert large_row.data == large_data
+        assert large_row.codec == "zlib"
+        assert large_row.compressed_data is not None
+        assert large_row not in db.session.dirty
+        stored_data = db.session.query(JsonDataModel.data).filter_by(hash=large_hash).scalar()  # type: ignore
+        assert stored_data is None
+        assert JsonDataModel.find_object_by_hash(small_hash).codec is None
+        assert JsonDataModel.find_data_dicts_by_hashes([large_hash, small_hash]) == {
+            large_hash: large_data,
+            small_hash: small_data,
+        }
+        assert JsonDataCompression.stats()["bytes_saved"] > 0
+
+    def test_compacting_rewrites_rows_to_match_config(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        large_data = {"file": "b" * 10000}
+        large_hash = JsonDataModel.create_and_insert_json_data_from_dict(large_data)
+        db.session.commit()
+        assert JsonDataModel.find_object_by_hash(large_hash).codec is None
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_COMPRESSION_ENABLED", True):
+            last_hash, rewritten_count = JsonDataModel.compact_json_data_records(batch_size=1000)
+            db.session.commit()
+        assert last_hash is not None
+        assert rewritten_count == 1
+        assert JsonDataModel.find_object_by_hash(large_hash).codec == "zlib"
+        assert JsonDataModel.compact_json_data_records(after_hash=last_hash) == (None, 0)
+
+        JsonDataModel.compact_json_data_records(batch_size=1000)
+        db.session.commit()
+        large_row = JsonDataModel.find_object_by_hash(large_hash)
+        assert large_row.codec is None
+        assert large_row.data == large_data
@@ -0,0 +1,96 @@
+import pytest
+from flask import Flask
+from SpiffWorkflow.util.task import TaskState  # type: ignore
+from spiffworkflow_backend.helpers.content_hash import canonical_json
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestJsonDataDeltaEncoding(BaseTest):
+    def test_resolves_chains_of_deltas(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        base_data = {"unchanged": {"values": [1, 2, 3]}, "changed": 1, "removed": True}
+        base_json_data_dict = JsonDataModel.json_data_dict_from_dict(base_data)
+        first_data = {"unchanged": {"values": [1, 2, 3]}, "changed": 2, "added": "yes"}
+        first_delta = JsonDataModel.delta_json_data_dict(base_json_data_dict["hash"], base_data, first_data, 0)
+        assert first_delta is not None
+        second_data = {**first_data, "changed": 3}
+        second_delta = JsonDataModel.delta_json_data_dict(first_delta["hash"], first_data, second_data, 1)
+        assert second_delta is not None
+        assert JsonDataModel.delta_json_data_dict(base_json_data_dict["hash"], base_data, {"other": 1}, 0) is None
+
+        JsonDataModel.insert_or_update_json_data_records({d["hash"]: d for d in [base_json_data_dict, first_delta, second_delta]})
+        db.session.commit()
+
+        data_dicts = JsonDataModel.find_data_dicts_by_hashes([second_delta["hash"], first_delta["hash"]])
+        assert data_dicts == {second_delta["hash"]: second_data, first_delta["hash"]: first_data}
+        assert data_dicts[first_delta["hash"]]["unchanged"] is not data_dicts[second_delta["hash"]]["unchanged"]
+        assert JsonDataModel.find_data_dict_by_hash(first_delta["hash"]) == first_data
+
+    @pytest.mark.parametrize("algorithm", ["sha256", "blake2b"])
+    def test_resolved_data_size_is_the_size_of_the_resolved_data(
+        self,
+        app: Flask,
+        algorithm: str,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CONTENT_HASH_ALGORITHM", algorithm):
+            base_data = {"unchanged": {"values": [1, 2, 3]}, "changed": 1, "removed": "é"}
+            for data in [
+                {"unchanged": {"values": [1, 2, 3]}, "changed": "a longer value", "added": None},
+                {"unchanged": {"values": [1, 2, 3]}},
+                {"unchanged": {"values": [1, 2, 3]}, "changed": 1, "removed": "é", "added": [1.5]},
+            ]:
+                delta = JsonDataModel.delta_json_data_dict("base", base_data, data, 0)
+                assert delta is not None
+                base_size = len(canonical_json(base_data))
+                assert JsonDataModel.resolved_data_size(base_data, base_size, delta["data"]) == len(canonical_json(data))
+
+    def test_processor_can_store_task_data_as_deltas(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/parallel_manual_tasks",
+            process_model_source_directory="parallel_manual_tasks",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING_ENABLED", True):
+            processor = ProcessInstanceProcessor(process_instance)
+            processor.do_engine_steps(save=True)
+            self._assert_task_data_matches_spiff_tasks(processor)
+
+            processor = ProcessInstanceProcessor(process_instance)
+            self.complete_next_manual_task(processor, data={"branch_one": True})
+            processor = ProcessInstanceProcessor(process_instance)
+            self.complete_next_manual_task(processor, data={"branch_two": True})
+            self._assert_task_data_matches_spiff_tasks(processor)
+
+        task_hashes = [t.json_data_hash for t in TaskModel.query.filter_by(process_instance_id=process_instance.id).all()]
+        stored_data = [j.data for j in JsonDataModel.query.filter(JsonDataModel.hash.in_(task_hashes)).all()]  # type: ignore
+        assert any(JsonDataModel.is_delta(d) for d in stored_data)
+
+        # completed tasks only get their data when asked for so this resolves every delta that was stored
+        processor = ProcessInstanceProcessor(process_instance, include_task_data_for_completed_tasks=True)
+        assert processor.bpmn_process_instance.is_completed()
+        self._assert_task_data_matches_spiff_tasks(processor, state=TaskState.ANY_MASK)
+        end_task = processor.get_task_by_bpmn_identifier("EndEvent_1", processor.bpmn_process_instance)
+        assert end_task is not None
+        assert end_task.data == {"shared": {"values": [1, 2, 3]}, "branch_one": True, "branch_two": True}
+
+    def _assert_task_data_matches_spiff_tasks(
+        self, processor: ProcessInstanceProcessor, state: int = TaskState.NOT_FINISHED_MASK
+    ) -> None:
+        for spiff_task in processor.bpmn_process_instance.get_tasks(state=state):
+            task_model = TaskModel.query.filter_by(guid=str(spiff_task.id)).first()
+            assert task_model is not None, f"Could not find task model for {spiff_task.task_spec.name}"
+            assert task_model.json_data() == processor._serializer.to_dict(spiff_task)["data"], spiff_task.task_spec.name
+            assert task_model.json_data_size == len(canonical_json(task_model.json_data())), spiff_task.task_spec.name
@@ -0,0 +1,88 @@
+from flask import Flask
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
+from spiffworkflow_backend.services.json_data_garbage_collection_service import JsonDataGarbageCollectionService
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestJsonDataGarbageCollectionService(BaseTest):
+    def test_deletes_only_orphaned_rows(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/parallel_manual_tasks",
+            process_model_source_directory="parallel_manual_tasks",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        orphaned_hash = JsonDataModel.create_and_insert_json_data_from_dict({"orphaned": True})
+        report_hash = JsonDataModel.create_and_insert_json_data_from_dict({"columns": [], "filter_by": [], "order_by": []})
+        base_data = {"base": True, "shared": [1, 2, 3]}
+        base_hash = JsonDataModel.create_and_insert_json_data_from_dict(base_data)
+        delta_json_data_dict = JsonDataModel.delta_json_data_dict(base_hash, base_data, {**base_data, "base": False}, 0)
+        assert delta_json_data_dict is not None
+        JsonDataModel.insert_or_update_json_data_dict(delta_json_data_dict)
+        db.session.commit()
+        referenced_hashes = {h for t in TaskModel.query.all() for h in [t.json_data_hash, t.python_env_data_hash]}
+
+        deleted_count, after_hash = JsonDataGarbageCollectionService.collect(2, 0)
+        assert after_hash is None
+
+        remaining_hashes = {j.hash for j in JsonDataModel.query.all()}
+        assert orphaned_hash not in remaining_hashes
+        # ad hoc reports are looked up by this hash so it is kept
+        assert report_hash in remaining_hashes
+        assert delta_json_data_dict["hash"] not in remaining_hashes
+        # the base of the delta is kept until the walk after its delta was deleted
+        assert base_hash in remaining_hashes
+        assert referenced_hashes.issubset(remaining_hashes)
+        assert deleted_count >= 2
+
+        JsonDataGarbageCollectionService.collect(1000, 0)
+        assert base_hash not in {j.hash for j in JsonDataModel.query.all()}
+        processor = ProcessInstanceProcessor(process_instance)
+        assert len(processor.get_ready_user_tasks()) == 2
+
+    def test_sweep_does_not_delete_rows_referenced_after_marking(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/parallel_manual_tasks",
+            process_model_source_directory="parallel_manual_tasks",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        new_hash = JsonDataModel.create_and_insert_json_data_from_dict({"new": "data"})
+        db.session.commit()
+        marked_hashes, _ = JsonDataGarbageCollectionService.mark(1000)
+        assert new_hash in marked_hashes
+
+        # marking one batch at a time and resuming from the returned hash finds the same rows
+        resumed_marked_hashes: list[str] = []
+        after_hash = None
+        while True:
+            batch_marked_hashes, after_hash = JsonDataGarbageCollectionService.mark(2, after_hash=after_hash, max_batches=1)
+            resumed_marked_hashes.extend(batch_marked_hashes)
+            if after_hash is None:
+                break
+        assert resumed_marked_hashes == marked_hashes
+
+        task_model = TaskModel.query.filter_by(process_instance_id=process_instance.id).first()
+        task_model.json_data_hash = new_hash
+        db.session.add(task_model)
+        db.session.commit()
+
+        JsonDataGarbageCollectionService.sweep(marked_hashes, 1000)
+        assert JsonDataModel.query.filter_by(hash=new_hash).first() is not None
@@ -0,0 +1,137 @@
+from flask import Flask
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+from spiffworkflow_backend.models.message_instance_correlation import MessageInstanceCorrelationRuleModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.services.message_correlation_service import MessageCorrelationService
+from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestMessageCorrelationService(BaseTest):
+    def test_finds_the_same_receive_message_as_correlates(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._create_process_instance()
+        catch_all = self._create_receive_message(process_instance, {})
+        purchase_order_one = self._create_receive_message(process_instance, {"order": {"po_number": 1, "customer": "x"}})
+        purchase_order_two = self._create_receive_message(process_instance, {"order": {"po_number": 2, "customer": None}})
+        receive_messages = [catch_all, purchase_order_one, purchase_order_two]
+
+        sends_and_expected_receives: list[tuple[dict, MessageInstanceModel]] = [
+            ({"po": 1, "customer_name": "x"}, purchase_order_one),
+            ({"po": 1, "customer_name": "y"}, catch_all),
+            ({"po": 2, "customer_name": "anyone"}, purchase_order_two),
+            ({"unrelated": True}, catch_all),
+        ]
+        for payload, expected_receive in sends_and_expected_receives:
+            message_instance_send = MessageInstanceModel(message_type="send", name="order_message", payload=payload)
+            assert self._find_with_correlates(message_instance_send, receive_messages) == expected_receive
+            found = MessageCorrelationService.find_receive_message_instance(message_instance_send, CustomBpmnScriptEngine())
+            assert found == expected_receive
+
+        other_send = MessageInstanceModel(message_type="send", name="other_message", payload={"po": 1, "customer_name": "x"})
+        assert MessageCorrelationService.find_receive_message_instance(other_send, CustomBpmnScriptEngine()) is None
+
+        # a send with the same correlation keys matches without evaluating anything
+        same_keys_send = MessageInstanceModel(
+            message_type="send", name="order_message", payload={}, correlation_keys=purchase_order_two.correlation_keys
+        )
+        assert (
+            MessageCorrelationService.find_receive_message_instance(same_keys_send, CustomBpmnScriptEngine())
+            == purchase_order_two
+        )
+
+        purchase_order_one.status = "completed"
+        MessageCorrelationService.remove_correlation_values(purchase_order_one)
+        db.session.commit()
+        message_instance_send = MessageInstanceModel(
+            message_type="send", name="order_message", payload={"po": 1, "customer_name": "x"}
+        )
+        assert (
+            MessageCorrelationService.find_receive_message_instance(message_instance_send, CustomBpmnScriptEngine()) == catch_all
+        )
+
+    def test_numbers_that_are_equal_match_like_they_do_in_correlates(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._create_process_instance()
+        int_receive = self._create_receive_message(process_instance, {"order": {"po_number": 4}})
+        float_receive = self._create_receive_message(process_instance, {"order": {"po_number": 5.0}})
+        receive_messages = [int_receive, float_receive]
+
+        sends_and_expected_receives: list[tuple[dict, MessageInstanceModel | None]] = [
+            ({"po": 4.0}, int_receive),
+            ({"po": 5}, float_receive),
+            ({"po": 4.5}, None),
+        ]
+        for payload, expected_receive in sends_and_expected_receives:
+            message_instance_send = MessageInstanceModel(message_type="send", name="order_message", payload=payload)
+            assert self._find_with_correlates(message_instance_send, receive_messages) == expected_receive
+            found = MessageCorrelationService.find_receive_message_instance(message_instance_send, CustomBpmnScriptEngine())
+            assert found == expected_receive
+
+    def test_indexes_receive_messages_created_before_correlation_values_existed(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._create_process_instance()
+        receive_message = self._create_receive_message(process_instance, {"order": {"po_number": 3}}, add_values=False)
+        assert receive_message.correlation_values == []
+
+        message_instance_send = MessageInstanceModel(message_type="send", name="order_message", payload={"po": 3})
+        found = MessageCorrelationService.find_receive_message_instance(message_instance_send, CustomBpmnScriptEngine())
+        assert found == receive_message
+        assert len(receive_message.correlation_values) == 2
+
+    def _create_process_instance(self) -> ProcessInstanceModel:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            bpmn_file_name="hello_world.bpmn",
+            process_model_source_directory="hello_world",
+        )
+        return self.create_process_instance_from_process_model(process_model, "waiting")
+
+    def _create_receive_message(
+        self, process_instance: ProcessInstanceModel, correlation_keys: dict, add_values: bool = True
+    ) -> MessageInstanceModel:
+        message_instance = MessageInstanceModel(
+            process_instance_id=process_instance.id,
+            user_id=process_instance.process_initiator_id,
+            message_type="receive",
+            name="order_message",
+            correlation_keys=correlation_keys,
+        )
+        correlation_rules = [
+            MessageInstanceCorrelationRuleModel(
+                message_instance=message_instance, name="po_number", retrieval_expression="po", correlation_key_names=["order"]
+            ),
+            MessageInstanceCorrelationRuleModel(
+                message_instance=message_instance,
+                name="customer",
+                retrieval_expression="customer_name",
+                correlation_key_names=["order"],
+            ),
+        ]
+        db.session.add(message_instance)
+        db.session.add_all(correlation_rules)
+        if add_values:
+            MessageCorrelationService.add_correlation_values(message_instance, correlation_rules)
+        db.session.commit()
+        return message_instance
+
+    def _find_with_correlates(
+        self, message_instance_send: MessageInstanceModel, receive_messages: list[MessageInstanceModel]
+    ) -> MessageInstanceModel | None:
+        message_instance_receive = None
+        for message_instance in receive_messages:
+            if message_instance.correlates(message_instance_send, CustomBpmnScriptEngine()):
+                message_instance_receive = message_instance
+        return message_instance_receive
@@ -0,0 +1,131 @@
+from flask import Flask
+from spiffworkflow_backend.models.cache_generation import CacheGenerationModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.permission_assignment import PermissionAssignmentModel
+from spiffworkflow_backend.services.authorization_service import AuthorizationService
+from spiffworkflow_backend.services.permission_cache_service import PermissionCacheService
+from spiffworkflow_backend.services.user_service import UserService
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+class TestPermissionCacheService(BaseTest):
+    def test_gives_the_same_answers_as_the_database(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        user = self.find_or_create_user(username="user_one")
+        group_one = UserService.find_or_create_group("group_one")
+        group_two = UserService.find_or_create_group("group_two")
+        UserService.add_user_to_group(user, group_one)
+        UserService.add_user_to_group(user, group_two)
+        other_user = self.find_or_create_user(username="user_two")
+
+        AuthorizationService.add_permission_from_uri_or_macro(group_one.identifier, "read", "PG:hey")
+        AuthorizationService.add_permission_from_uri_or_macro(group_two.identifier, "DENY:read", "PG:hey:yo")
+        AuthorizationService.add_permission_from_uri_or_macro(group_two.identifier, "DENY:read", "/process-groups/hey:new")
+        AuthorizationService.add_permission_from_uri_or_macro(group_one.identifier, "update", "/process-models/pre*")
+        AuthorizationService.add_permission_from_uri_or_macro(group_one.identifier, "read", "/tasks")
+        self.add_permissions_to_user(user, target_uri="/secrets/*", permission_names=["create"])
+        self.add_permissions_to_user(other_user, target_uri="/*", permission_names=["read"])
+
+        checks = [
+            ("read", "/v1.0/process-groups/hey"),
+            ("read", "/v1.0/process-groups/hey:there"),
+            ("read", "/v1.0/process-groups/hey:yo"),
+            ("read", "/v1.0/process-groups/hey:yo:me"),
+            ("read", "/v1.0/process-groups/hey:new"),
+            ("read", "/v1.0/process-groups/hey:new:group"),
+            ("read", "/v1.0/process-groups/heyo"),
+            ("read", "/v1.0/process-groups"),
+            ("read", "/v1.0/process-models/hey"),
+            ("update", "/v1.0/process-models/pre"),
+            ("update", "/v1.0/process-models/prefix:model"),
+            ("update", "/v1.0/process-models/pr"),
+            ("read", "/v1.0/tasks"),
+            ("read", "/v1.0/tasks/1"),
+            ("create", "/v1.0/secrets"),
+            ("create", "/v1.0/secrets/key"),
+            ("create", "/v1.0/secretsx"),
+            ("delete", "/v1.0/secrets/key"),
+            ("read", "/"),
+            ("read", ""),
+        ]
+        for check_user in [user, other_user]:
+            for permission, target_uri in checks:
+                expected_result = AuthorizationService.user_has_permission(check_user, permission, target_uri)
+                with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED", True):
+                    self.assert_user_has_permission(check_user, permission, target_uri, expected_result=expected_result)
+
+    def test_rebuilds_when_permissions_change(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED", True):
+            user = self.find_or_create_user(username="user_one")
+            group = UserService.find_or_create_group("group_one")
+            AuthorizationService.add_permission_from_uri_or_macro(group.identifier, "read", "PG:hey")
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+            builds = PermissionCacheService.stats()["builds"]
+
+            # group memberships are cached on their own so changing them does not rebuild anything
+            UserService.add_user_to_group(user, group)
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey")
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey:yo")
+            assert PermissionCacheService.stats()["builds"] == builds
+
+            # bulk deletes do not go through the orm so make sure they are noticed as well
+            PermissionAssignmentModel.query.delete()
+            db.session.commit()
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+            assert CacheGenerationModel.query.filter_by(cache_table="permission").count() == 1
+
+    def test_caches_group_memberships_until_they_change(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED", True):
+            user = self.find_or_create_user(username="user_one")
+            group = UserService.find_or_create_group("group_one")
+            AuthorizationService.add_permission_from_uri_or_macro(group.identifier, "read", "PG:hey")
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+
+            with self.count_queries() as statements:
+                self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+            assert statements == []
+
+            UserService.add_user_to_group(user, group)
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey")
+            UserService.remove_user_from_group(user, group.identifier)
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+            assert CacheGenerationModel.query.filter_by(cache_table="permission_membership").count() == 1
+
+            # pretend another process added the membership by undoing the generation bumps that happened here
+            membership_generation = PermissionCacheService._membership_generation
+            UserService.add_user_to_group(user, group)
+            PermissionCacheService._membership_generation = membership_generation
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+            PermissionCacheService.cached_memberships().cache_generation_checked_at = 0
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey")
+
+    def test_notices_changes_from_other_processes(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PERMISSION_CACHE_ENABLED", True):
+            user = self.find_or_create_user(username="user_one")
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+
+            # pretend another process added the permission by undoing the generation bumps that happened here
+            generation = PermissionCacheService.stats()["generation"]
+            self.add_permissions_to_user(user, target_uri="/process-groups/hey", permission_names=["read"])
+            PermissionCacheService._generation = generation
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey", expected_result=False)
+
+            compiled_permissions = PermissionCacheService.compiled_permissions()
+            compiled_permissions.cache_generation_checked_at = 0
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey")
@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from uuid import UUID
 
 import pytest
@@ -6,6 +7,7 @@ from flask.app import Flask
 from flask.testing import FlaskClient
 from SpiffWorkflow.task import Task as SpiffTask  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
+from spiffworkflow_backend.exceptions.api_error import ApiError
 from spiffworkflow_backend.exceptions.error import TaskMismatchError
 from spiffworkflow_backend.exceptions.error import UserDoesNotHaveAccessToTaskError
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
@@ -22,6 +24,8 @@ from spiffworkflow_backend.models.task_instructions_for_end_user import TaskInst
 from spiffworkflow_backend.services.authorization_service import AuthorizationService
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionServiceError
 
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
@@ -1053,3 +1057,90 @@ class TestProcessInstanceProcessor(BaseTest):
 
         processor.do_engine_steps(save=True)
         assert process_instance.status == "complete"
+
+    def test_only_serializes_the_spec_when_definitions_are_not_stored_yet(
+        self,
+        app: Flask,
+        client: FlaskClient,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="group/call_activity_with_manual_task",
+            process_model_source_directory="call_activity_with_manual_task",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        serialized = processor.serialize()
+        assert processor.serialize_spec() == {
+            "spec": serialized["spec"],
+            "subprocess_specs": serialized["subprocess_specs"],
+        }
+
+        with patch.object(ProcessInstanceProcessor, "serialize_spec", wraps=processor.serialize_spec) as mock_serialize_spec:
+            processor.do_engine_steps(save=True)
+        assert mock_serialize_spec.call_count == 1
+        assert process_instance.bpmn_process_definition_id is not None
+        assert list(processor.engine_step_timings.durations_in_seconds.keys()) == [
+            "lock",
+            "definitions",
+            "run",
+            "persist",
+            "save",
+        ]
+
+        process_instance = ProcessInstanceModel.query.filter_by(id=process_instance.id).first()
+        processor = ProcessInstanceProcessor(process_instance)
+        with (
+            patch.object(ProcessInstanceProcessor, "serialize") as mock_serialize,
+            patch.object(ProcessInstanceProcessor, "serialize_spec") as mock_serialize_spec,
+        ):
+            processor.do_engine_steps(save=True)
+        assert mock_serialize.call_count == 0
+        assert mock_serialize_spec.call_count == 0
+
+    def test_task_data_size_is_tracked_as_tasks_are_saved(
+        self,
+        app: Flask,
+        client: FlaskClient,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="group/call_activity_with_manual_task",
+            process_model_source_directory="call_activity_with_manual_task",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        assert process_instance.task_data_size == 0
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        process_instance = ProcessInstanceModel.query.filter_by(id=process_instance.id).first()
+        task_models = TaskModel.query.filter_by(process_instance_id=process_instance.id).all()
+        assert all(t.json_data_size is not None for t in task_models)
+        assert process_instance.task_data_size == sum(t.json_data_size for t in task_models)
+        assert process_instance.task_data_size > 0
+        assert process_instance.python_env_size is not None
+        assert process_instance.serialized()["task_data_size"] == process_instance.task_data_size
+
+        processor = ProcessInstanceProcessor(process_instance)
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_TASK_DATA_SIZE_HARD_LIMIT_IN_BYTES", 1):
+            with pytest.raises(ApiError) as exception:
+                processor.do_engine_steps(save=True)
+            assert exception.value.error_code == "task_data_size_exceeded"
+
+            # process models can set their own limits
+            ProcessModelService.update_process_model(process_model, {"task_data_size_hard_limit_in_bytes": 0})
+            SpecCacheService.clear()
+            assert processor.task_data_size_limits() == (0, 0)
+            processor.do_engine_steps(save=True)
+
+            # instances started before sizes were tracked are still checked by serializing their task data
+            ProcessModelService.update_process_model(process_model, {"task_data_size_hard_limit_in_bytes": None})
+            SpecCacheService.clear()
+            process_instance.task_data_size = None
+            db.session.add(process_instance)
+            db.session.commit()
+            processor = ProcessInstanceProcessor(process_instance)
+            assert processor.task_data_size() == ProcessInstanceProcessor.get_task_data_size(processor.bpmn_process_instance)
+            with pytest.raises(ApiError) as exception:
+                processor.do_engine_steps(save=True)
+            assert exception.value.error_code == "task_data_size_exceeded"
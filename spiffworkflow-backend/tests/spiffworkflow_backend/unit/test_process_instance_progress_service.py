@@ -0,0 +1,83 @@
+from flask import Flask
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.routes.tasks_controller import _process_instance_progress_state
+from spiffworkflow_backend.routes.tasks_controller import _wait_for_process_instance_progress
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+from spiffworkflow_backend.services.process_instance_progress_service import ProcessInstanceProgressService
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessInstanceProgressService(BaseTest):
+    def test_publishes_progress_only_after_the_session_commits(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        subscription = ProcessInstanceProgressService.subscribe(123)
+        ProcessInstanceProgressService.notify_progress(123)
+        assert subscription.wait(0) is False
+        db.session.rollback()
+        db.session.commit()
+        assert subscription.wait(0) is False
+
+        ProcessInstanceProgressService.notify_progress(123)
+        db.session.commit()
+        assert subscription.wait(0) is True
+        assert subscription.wait(0) is False
+
+        # the local backend forgets a process instance once nobody is subscribed to it
+        subscription.close()
+        ProcessInstanceProgressService.notify_progress(123)
+        db.session.commit()
+        assert 123 not in ProcessInstanceProgressService.backend().versions
+
+    def test_completing_tasks_publishes_progress(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        subscription = ProcessInstanceProgressService.subscribe(process_instance.id)
+        other_subscription = ProcessInstanceProgressService.subscribe(process_instance.id + 1)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+        assert subscription.wait(0) is True
+        assert other_subscription.wait(0) is False
+
+    def test_interstitial_waits_for_progress_with_heartbeats(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        subscription = ProcessInstanceProgressService.subscribe(process_instance.id)
+        progress_state = _process_instance_progress_state(process_instance.id)
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_INTERSTITIAL_HEARTBEAT_IN_SECONDS", 0.01):
+            stream = _wait_for_process_instance_progress(process_instance.id, subscription, progress_state)
+            assert next(stream) == ": heartbeat\n\n"
+            assert next(stream) == ": heartbeat\n\n"
+
+            # a change made somewhere the backend cannot see is noticed on the next heartbeat
+            process_instance.status = "waiting"
+            db.session.add(process_instance)
+            db.session.commit()
+            subscription.wait(0)
+            assert list(stream) == []
+
+            ProcessInstanceProgressService.notify_progress(process_instance.id)
+            db.session.commit()
+            progress_state = _process_instance_progress_state(process_instance.id)
+            assert list(_wait_for_process_instance_progress(process_instance.id, subscription, progress_state)) == []
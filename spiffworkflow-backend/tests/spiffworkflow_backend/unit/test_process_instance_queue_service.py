@@ -1,10 +1,14 @@
+import threading
 import time
 from contextlib import suppress
 
 import pytest
 from flask.app import Flask
 from pytest_mock.plugin import MockerFixture
+from spiffworkflow_backend.background_processing.process_instance_queue_dispatcher import ProcessInstanceQueueDispatcher
+from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
@@ -138,3 +142,119 @@ class TestProcessInstanceQueueService(BaseTest):
             with ProcessInstanceQueueService.dequeued(process_instance):
                 pass
         assert dequeue_mocker.call_count == 6
+
+    def test_claim_ready_entries_claims_each_entry_once(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance_one = self._create_process_instance()
+        process_instance_two = self._create_process_instance()
+        assert ProcessInstanceQueueService.claim_ready_entries({"not_started": 60}, 10) == []
+
+        first_claim = ProcessInstanceQueueService.claim_ready_entries({"not_started": 0}, 1)
+        assert len(first_claim) == 1
+        assert first_claim[0].locked_by == ProcessInstanceLockService.locked_by()
+        second_claim = ProcessInstanceQueueService.claim_ready_entries({"not_started": 0}, 10)
+        assert len(second_claim) == 1
+        assert {e.process_instance_id for e in first_claim + second_claim} == {process_instance_one.id, process_instance_two.id}
+        assert ProcessInstanceQueueService.claim_ready_entries({"not_started": 0}, 10) == []
+        assert ProcessInstanceQueueService.seconds_until_next_ready_entry({"not_started": 0}) is None
+
+    def test_dispatcher_runs_claimed_entries_and_enqueues_them_again(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._create_process_instance()
+        dispatcher = ProcessInstanceQueueDispatcher(app)
+        dispatcher.min_age_in_seconds_by_status = {"not_started": 0}
+        assert ProcessInstanceQueueService.seconds_until_next_ready_entry(dispatcher.min_age_in_seconds_by_status) == 0
+
+        generation = ProcessInstanceQueueService.enqueued_generation()
+        queue_entries = ProcessInstanceQueueService.claim_ready_entries(dispatcher.min_age_in_seconds_by_status, 1)
+        assert len(queue_entries) == 1
+        dispatcher.run_queue_entry(queue_entries[0])
+        assert ProcessInstanceQueueService.enqueued_generation() != generation
+
+        # entries are claimed and released with update statements so do not get stale ones from the identity map
+        db.session.expire_all()
+        process_instance = ProcessInstanceModel.query.filter_by(id=process_instance.id).first()
+        assert process_instance.status == "user_input_required"
+        queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+        assert queue_entry.locked_by is None
+        assert queue_entry.status == "user_input_required"
+        assert not ProcessInstanceLockService.has_lock(process_instance.id)
+
+    def test_dequeue_many_locks_entries_until_enqueue_many_releases_them(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instances = [self._create_process_instance() for _ in range(3)]
+        assert ProcessInstanceQueueService.dequeue_many(10, "not_started", min_age_in_seconds=60) == []
+
+        queue_entries = ProcessInstanceQueueService.dequeue_many(2, "not_started")
+        assert len(queue_entries) == 2
+        assert {e.locked_by for e in queue_entries} == {ProcessInstanceLockService.locked_by()}
+        claimed_ids = {e.process_instance_id for e in queue_entries}
+        for process_instance_id in claimed_ids:
+            assert ProcessInstanceLockService.has_lock(process_instance_id)
+
+        remaining_entries = ProcessInstanceQueueService.dequeue_many(10, "not_started")
+        assert len(remaining_entries) == 1
+        assert remaining_entries[0].process_instance_id not in claimed_ids
+        assert ProcessInstanceQueueService.dequeue_many(10, "not_started") == []
+
+        claimed_process_instances = [p for p in process_instances if p.id in claimed_ids]
+        # dequeued reenters locks taken by dequeue_many and leaves releasing them to enqueue_many
+        with ProcessInstanceQueueService.dequeued(claimed_process_instances[0]):
+            pass
+        assert ProcessInstanceLockService.has_lock(claimed_process_instances[0].id)
+
+        claimed_process_instances[0].status = "waiting"
+        ProcessInstanceQueueService.enqueue_many(claimed_process_instances)
+        for process_instance in claimed_process_instances:
+            assert not ProcessInstanceLockService.has_lock(process_instance.id)
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+            db.session.refresh(queue_entry)
+            assert queue_entry.locked_by is None
+            assert queue_entry.locked_at_in_seconds is None
+            assert queue_entry.status == process_instance.status
+        assert len(ProcessInstanceQueueService.dequeue_many(10, "waiting")) == 1
+
+    def test_dequeue_many_does_not_claim_an_entry_twice_with_concurrent_workers(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance_ids = {self._create_process_instance().id for _ in range(10)}
+        claimed_ids_by_worker: dict[int, list[int]] = {}
+        start_barrier = threading.Barrier(4)
+
+        def worker(worker_index: int) -> None:
+            with app.app_context():
+                ProcessInstanceLockService.set_thread_local_locking_context(f"test:worker{worker_index}")
+                start_barrier.wait()
+                claimed_ids: list[int] = []
+                while True:
+                    queue_entries = ProcessInstanceQueueService.dequeue_many(2, "not_started")
+                    if len(queue_entries) == 0:
+                        break
+                    claimed_ids.extend(e.process_instance_id for e in queue_entries)
+                claimed_ids_by_worker[worker_index] = claimed_ids
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_claimed_ids = [i for claimed_ids in claimed_ids_by_worker.values() for i in claimed_ids]
+        assert len(claimed_ids_by_worker) == 4
+        assert sorted(all_claimed_ids) == sorted(process_instance_ids)
+        for process_instance_id in process_instance_ids:
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance_id).first()
+            db.session.refresh(queue_entry)
+            claiming_worker = next(w for w, claimed_ids in claimed_ids_by_worker.items() if process_instance_id in claimed_ids)
+            assert queue_entry.locked_by.startswith(f"test:worker{claiming_worker}:")
@@ -1,13 +1,16 @@
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
+from pytest_mock.plugin import MockerFixture
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.group import GroupModel
 from spiffworkflow_backend.models.human_task import HumanTaskModel
+from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
 from spiffworkflow_backend.models.process_instance_report import ReportMetadata
 from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportMetadataInvalidError
 from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportService
 from spiffworkflow_backend.services.user_service import UserService
+from sqlalchemy.orm import Query
 
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
@@ -352,3 +355,168 @@ class TestProcessInstanceReportService(BaseTest):
         assert process_instance_created_by_user_one_two.id in process_instance_ids_in_results
         assert process_instance_created_by_user_one_three.id in process_instance_ids_in_results
         assert process_instance_created_by_user_two_one.id in process_instance_ids_in_results
+
+    def test_can_page_with_a_cursor(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "runs_without_input/sample",
+            process_model_source_directory="sample",
+        )
+        user_one = self.find_or_create_user(username="user_one")
+        start_times = [None, 1000, 1000, 2000, None, 3000, 2000]
+        for start_in_seconds in start_times:
+            process_instance = self.create_process_instance_from_process_model(process_model=process_model, user=user_one)
+            process_instance.start_in_seconds = start_in_seconds
+            db.session.add(process_instance)
+        db.session.commit()
+
+        for order_by in [["-start_in_seconds", "-id"], ["start_in_seconds"], ["status", "-end_in_seconds"]]:
+            report_metadata: ReportMetadata = {"columns": [], "filter_by": [], "order_by": order_by}
+            expected_ids = [
+                r["id"]
+                for r in ProcessInstanceReportService.run_process_instance_report(
+                    report_metadata=report_metadata, user=user_one, per_page=100
+                )["results"]
+            ]
+            assert len(expected_ids) == len(start_times)
+
+            offset_ids = []
+            for page in range(1, 5):
+                response_json = ProcessInstanceReportService.run_process_instance_report(
+                    report_metadata=report_metadata, user=user_one, page=page, per_page=2
+                )
+                offset_ids += [r["id"] for r in response_json["results"]]
+            assert offset_ids == expected_ids
+
+            cursor_ids = []
+            cursor = None
+            for _ in range(5):
+                response_json = ProcessInstanceReportService.run_process_instance_report(
+                    report_metadata=report_metadata, user=user_one, per_page=2, cursor=cursor
+                )
+                assert response_json["pagination"]["total"] == len(start_times)
+                cursor_ids += [r["id"] for r in response_json["results"]]
+                cursor = response_json["pagination"]["next_cursor"]
+                if cursor is None:
+                    break
+            assert cursor_ids == expected_ids
+
+    def test_reuses_recent_totals_until_process_instances_are_added_or_removed(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "runs_without_input/sample",
+            process_model_source_directory="sample",
+        )
+        user_one = self.find_or_create_user(username="user_one")
+        self.create_process_instance_from_process_model(process_model=process_model, user=user_one)
+        report_metadata: ReportMetadata = {"columns": [], "filter_by": [], "order_by": []}
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_REPORT_TOTAL_COUNT_CACHE_MAX_AGE_IN_SECONDS", 60):
+            response_json = ProcessInstanceReportService.run_process_instance_report(
+                report_metadata=report_metadata, user=user_one
+            )
+            assert response_json["pagination"]["total"] == 1
+
+            count_spy = mocker.spy(Query, "count")
+            response_json = ProcessInstanceReportService.run_process_instance_report(
+                report_metadata=report_metadata, user=user_one
+            )
+            assert response_json["pagination"]["total"] == 1
+            assert count_spy.call_count == 0
+            response_json = ProcessInstanceReportService.run_process_instance_report(
+                report_metadata=report_metadata, user=user_one, total_count_mode="exact"
+            )
+            assert response_json["pagination"]["total"] == 1
+            assert count_spy.call_count == 1
+
+            process_instance = self.create_process_instance_from_process_model(process_model=process_model, user=user_one)
+            response_json = ProcessInstanceReportService.run_process_instance_report(
+                report_metadata=report_metadata, user=user_one
+            )
+            assert response_json["pagination"]["total"] == 2
+
+            db.session.delete(process_instance)
+            db.session.commit()
+            response_json = ProcessInstanceReportService.run_process_instance_report(
+                report_metadata=report_metadata, user=user_one
+            )
+            assert response_json["pagination"]["total"] == 1
+
+    def test_can_explain_system_reports(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        user_one = self.find_or_create_user(username="user_one")
+        for report_identifier in ProcessInstanceReportService.system_metadata_maps().keys():
+            process_instance_report = ProcessInstanceReportService.report_with_identifier(
+                user=user_one, report_identifier=report_identifier
+            )
+            query_plan = ProcessInstanceReportService.explain_process_instance_report(
+                process_instance_report.report_metadata, user=user_one
+            )
+            assert "process_instance" in query_plan["sql"]
+            assert query_plan["explain"] != ""
+
+    def test_adds_human_task_fields_with_the_same_number_of_queries_for_any_page_size(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "runs_without_input/sample",
+            process_model_source_directory="sample",
+        )
+        user_one = self.find_or_create_user(username="user_one")
+        user_two = self.find_or_create_user(username="user_two")
+        group_one = UserService.find_or_create_group("group_one")
+
+        process_instance_ids = []
+        for index in range(6):
+            process_instance = self.create_process_instance_from_process_model(process_model=process_model, user=user_one)
+            process_instance_ids.append(process_instance.id)
+            for task_number, completed in enumerate([True, False, False]):
+                human_task = HumanTaskModel(
+                    process_instance_id=process_instance.id,
+                    lane_assignment_id=group_one.id,
+                    task_id=f"task_{index}_{task_number}",
+                    task_name=f"task_name_{task_number}",
+                    task_title=f"Task {task_number}",
+                    completed=completed,
+                )
+                db.session.add(human_task)
+                db.session.flush()
+                db.session.add(HumanTaskUserModel(human_task_id=human_task.id, user_id=user_one.id))
+                if task_number == 1:
+                    db.session.add(HumanTaskUserModel(human_task_id=human_task.id, user_id=user_two.id))
+        db.session.commit()
+
+        query_counts = []
+        for page_size in [2, 6]:
+            process_instance_dicts: list[dict] = [
+                {"id": process_instance_id} for process_instance_id in process_instance_ids[:page_size]
+            ]
+            with self.count_queries() as statements:
+                ProcessInstanceReportService.add_human_task_fields(process_instance_dicts)
+            query_counts.append(len(statements))
+            for index, process_instance_dict in enumerate(process_instance_dicts):
+                assert process_instance_dict["task_id"] == f"task_{index}_1"
+                assert process_instance_dict["task_title"] == "Task 1"
+                assert process_instance_dict["assigned_user_group_identifier"] == "group_one"
+                usernames = {u.strip() for u in process_instance_dict["potential_owner_usernames"].split(",")}
+                assert usernames == {"user_one", "user_two"}
+        assert query_counts == [1, 1]
+
+        # the oldest task is the oldest one the user can work on when restricted to a user
+        process_instance_dicts = [{"id": process_instance_id} for process_instance_id in process_instance_ids]
+        ProcessInstanceReportService.add_human_task_fields(process_instance_dicts, restrict_human_tasks_to_user=user_two)
+        for index, process_instance_dict in enumerate(process_instance_dicts):
+            assert process_instance_dict["task_id"] == f"task_{index}_1"
+            assert process_instance_dict["potential_owner_usernames"] == "user_two"
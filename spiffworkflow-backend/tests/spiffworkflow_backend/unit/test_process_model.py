@@ -1,5 +1,6 @@
 """Process Model."""
 
+import os
 import re
 
 from flask.app import Flask
@@ -8,7 +9,10 @@ from spiffworkflow_backend.models.process_caller_relationship import ProcessCall
 from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
 from spiffworkflow_backend.models.process_model import ProcessModelInfo
 from spiffworkflow_backend.models.reference_cache import ReferenceCacheModel
+from spiffworkflow_backend.services.file_system_service import FileSystemService
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
 
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
@@ -119,6 +123,48 @@ class TestProcessModel(BaseTest):
         assert process_instance_metadata_awesome_var is not None
         assert process_instance_metadata_awesome_var.value == "123"
 
+    def test_extract_metadata_only_writes_changed_values(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = self.create_process_model_with_metadata()
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        metadata_before = {
+            m.key: (m.id, m.value) for m in ProcessInstanceMetadataModel.query.filter_by(process_instance_id=process_instance.id)
+        }
+        assert sorted(metadata_before.keys()) == ["awesome_var", "invoice_number"]
+        processor.extract_metadata()
+        db.session.commit()
+        metadata_after = {
+            m.key: (m.id, m.value) for m in ProcessInstanceMetadataModel.query.filter_by(process_instance_id=process_instance.id)
+        }
+        assert metadata_after == metadata_before
+
+        # the paths are cached until process_model.json changes
+        process_model_json_path = os.path.join(
+            FileSystemService.full_path_from_id(process_model.id), ProcessModelService.PROCESS_MODEL_JSON_FILE
+        )
+        mtime_ns = SpecCacheService.mtime_ns_for_file(process_model_json_path)
+        assert mtime_ns is not None
+        assert SpecCacheService.get_process_model_settings(process_model.id, mtime_ns) is not None
+
+        ProcessModelService.update_process_model(
+            process_model, {"metadata_extraction_paths": [{"key": "invoice_number_again", "path": "invoice_number"}]}
+        )
+        # make sure the change is noticed even on file systems with coarse modification times
+        os.utime(process_model_json_path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+        processor.extract_metadata()
+        db.session.commit()
+        metadata = ProcessInstanceMetadataModel.query.filter_by(
+            process_instance_id=process_instance.id, key="invoice_number_again"
+        ).first()
+        assert metadata is not None
+        assert metadata.value == "123"
+
     def _create_test_process_model(self, id: str, display_name: str) -> ProcessModelInfo:
         return ProcessModelInfo(
             id=id,
@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import time
+
+from flask import Flask
+from spiffworkflow_backend.services.file_system_service import FileSystemService
+from spiffworkflow_backend.services.process_model_index_service import ProcessModelIndexService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessModelIndexService(BaseTest):
+    def test_serves_process_models_and_groups_from_the_index_until_they_change(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        self.create_process_group("test_group")
+        self.create_process_group("test_group/nested_group")
+        load_test_spec("test_group/hello_world", bpmn_file_name="hello_world.bpmn", process_model_source_directory="hello_world")
+        load_test_spec(
+            "test_group/nested_group/simple_script",
+            bpmn_file_name="simple_script.bpmn",
+            process_model_source_directory="simple_script",
+        )
+        self._age_spec_dir(seconds=60)
+        ProcessModelIndexService.clear()
+
+        ProcessModelService.get_process_models(recursive=True)
+        ProcessModelService.get_process_groups()
+        ProcessModelIndexService.reset_stats()
+        process_models = ProcessModelService.get_process_models(recursive=True)
+        assert [p.id for p in process_models] == ["test_group/hello_world", "test_group/nested_group/simple_script"]
+        assert [p.primary_process_id for p in process_models] == ["Process_HelloWorld", "Process_SimpleScript"]
+        process_groups = ProcessModelService.get_process_groups()
+        assert [p.id for p in process_groups] == ["test_group"]
+        assert [p.id for p in process_groups[0].process_groups] == ["test_group/nested_group"]
+        assert ProcessModelIndexService.stats()["misses"] == 0
+
+        # each caller gets its own objects
+        process_models[0].display_name = "changed in memory"
+        assert ProcessModelService.get_process_model("test_group/hello_world").display_name == "test_group/hello_world"
+
+        # changes made through the service are seen right away
+        ProcessModelService.update_process_model(process_models[1], {"display_name": "renamed"})
+        assert ProcessModelService.get_process_model("test_group/nested_group/simple_script").display_name == "renamed"
+
+        # and so are changes made to the files directly once their modification times change
+        process_model_json_path = os.path.join(
+            FileSystemService.full_path_from_id("test_group/hello_world"), FileSystemService.PROCESS_MODEL_JSON_FILE
+        )
+        with open(process_model_json_path) as f:
+            data = json.load(f)
+        data["display_name"] = "edited by hand"
+        with open(process_model_json_path, "w") as f:
+            json.dump(data, f)
+        assert ProcessModelService.get_process_model("test_group/hello_world").display_name == "edited by hand"
+
+        shutil.rmtree(FileSystemService.full_path_from_id("test_group/nested_group"))
+        assert [p.id for p in ProcessModelService.get_process_models(recursive=True)] == ["test_group/hello_world"]
+        assert ProcessModelService.get_process_group("test_group").process_groups == []
+
+    def _age_spec_dir(self, seconds: int) -> None:
+        """Entries are only trusted once their modification time is older than the racy window."""
+        timestamp = time.time() - seconds
+        for root, _dirs, files in os.walk(FileSystemService.root_path()):
+            os.utime(root, (timestamp, timestamp))
+            for file in files:
+                os.utime(os.path.join(root, file), (timestamp, timestamp))
@@ -0,0 +1,58 @@
+import pytest
+from flask import Flask
+from spiffworkflow_backend.models.script_attributes_context import ScriptAttributesContext
+from spiffworkflow_backend.scripts.script import Script
+from spiffworkflow_backend.scripts.script import ScriptAttributesContextMissingError
+from spiffworkflow_backend.services.process_instance_processor import CustomBpmnScriptEngine
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestScript(BaseTest):
+    def test_script_functions_use_the_context_of_the_running_script(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        script_functions = Script.script_functions()
+        assert Script.script_functions() is script_functions
+        assert script_functions.keys() == Script.generate_augmented_list(self._script_attributes_context("any")).keys()
+
+        with pytest.raises(ScriptAttributesContextMissingError):
+            script_functions["get_env"]()
+
+        with Script.with_script_attributes_context(self._script_attributes_context("outer")):
+            with Script.with_script_attributes_context(self._script_attributes_context("inner")):
+                assert script_functions["get_env"]() == "inner"
+            assert script_functions["get_env"]() == "outer"
+
+    def test_script_engine_gives_scripts_the_task_context(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            bpmn_file_name="hello_world.bpmn",
+            process_model_source_directory="hello_world",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        spiff_task = processor.bpmn_process_instance.get_tasks()[0]
+
+        script_engine = CustomBpmnScriptEngine()
+        assert script_engine.evaluate(spiff_task, "get_env()") == app.config["ENV_IDENTIFIER"]
+        assert script_engine.evaluate(spiff_task, "get_env() + suffix", external_context={"suffix": "_1"}) == (
+            app.config["ENV_IDENTIFIER"] + "_1"
+        )
+        assert "suffix" not in Script.script_functions()
+
+    def _script_attributes_context(self, environment_identifier: str) -> ScriptAttributesContext:
+        return ScriptAttributesContext(
+            task=None,
+            environment_identifier=environment_identifier,
+            process_instance_id=None,
+            process_model_identifier=None,
+        )
@@ -7,6 +7,7 @@ from flask.app import Flask
 from requests import Response
 from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
 from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
+from spiffworkflow_backend.services.connector_proxy_service import ConnectorProxyService
 from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
 from spiffworkflow_backend.services.secret_service import SecretService
 from spiffworkflow_backend.services.service_task_service import ServiceTaskDelegate
@@ -57,7 +58,7 @@ class TestServiceTaskDelegate(BaseTest):
         processor.do_engine_steps(save=True)
         spiff_task = processor.next_task()
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value.status_code = 404
             mock_post.return_value.ok = True
             mock_post.return_value.text = '{"error_stuff": "WE ERRORED"}'
@@ -82,7 +83,7 @@ class TestServiceTaskDelegate(BaseTest):
         processor.do_engine_steps(save=True)
         spiff_task = processor.next_task()
 
-        with patch("requests.post", side_effect=Exception("mocked error")):
+        with patch("requests.Session.post", side_effect=Exception("mocked error")):
             with pytest.raises(UncaughtServiceTaskError) as connector_proxy_error:
                 ServiceTaskDelegate.call_connector("my_operation", {}, spiff_task)
             self._assert_error_with_code(str(connector_proxy_error.value), "Exception", "mocked error", 500)
@@ -99,7 +100,7 @@ class TestServiceTaskDelegate(BaseTest):
         spiff_task = processor.next_task()
         return_text = "NOT JSON"
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value.status_code = 200
             mock_post.return_value.ok = True
             mock_post.return_value.text = return_text
@@ -133,7 +134,7 @@ class TestServiceTaskDelegate(BaseTest):
             "command_response_version": 2,
         }
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value.status_code = 500
             mock_post.return_value.ok = False
             mock_post.return_value.text = json.dumps(connector_response)
@@ -162,7 +163,7 @@ class TestServiceTaskDelegate(BaseTest):
             "command_response_version": 2,
         }
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value.status_code = 200
             mock_post.return_value.ok = True
             mock_post.return_value.text = json.dumps(connector_response)
@@ -173,6 +174,44 @@ class TestServiceTaskDelegate(BaseTest):
                 **{"operator_identifier": "my_operation"},
             }
 
+    def test_call_connector_only_sends_task_data_to_commands_that_declare_it(
+        self, app: Flask, with_db_and_bpmn_file_cleanup: None
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+        spiff_task = processor.next_task()
+        commands = [
+            {"id": "needs_data", "parameters": [{"id": "spiff__task_data", "type": "any", "required": False}]},
+            {"id": "no_data", "parameters": [{"id": "url", "type": "str", "required": True}]},
+        ]
+
+        ConnectorProxyService.reset()
+        with (
+            self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CONNECTOR_PROXY_TASK_DATA_MODE", "declared"),
+            patch("requests.Session.get") as mock_get,
+            patch("requests.Session.post") as mock_post,
+        ):
+            mock_get.return_value.status_code = 200
+            mock_get.return_value.text = json.dumps(commands)
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.text = "{}"
+            for operator_identifier, expected_to_send_task_data in [
+                ("needs_data", True),
+                ("no_data", False),
+                ("unknown_command", True),
+            ]:
+                ServiceTaskDelegate.call_connector(operator_identifier, {}, spiff_task)
+                assert ("spiff__task_data" in mock_post.call_args.kwargs["json"]) is expected_to_send_task_data
+            # the commands are only fetched once
+            assert mock_get.call_count == 1
+        ConnectorProxyService.reset()
+
     def test_can_capture_error_on_correct_multinstance_task(self, app: Flask, with_db_and_bpmn_file_cleanup: None) -> None:
         process_model = load_test_spec(
             process_model_id="test_group/multiinstance_with_inner_error_boundary_event",
@@ -211,7 +250,7 @@ class TestServiceTaskDelegate(BaseTest):
         failing_object.status_code = 200
         failing_object._content = json.dumps(failing_connector_response).encode()
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.side_effect = [successful_object, successful_object, failing_object, successful_object]
             processor.do_engine_steps(save=True)
         assert process_instance.status == "complete"
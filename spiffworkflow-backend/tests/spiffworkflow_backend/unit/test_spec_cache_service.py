@@ -0,0 +1,155 @@
+import os
+import shutil
+
+from flask.app import Flask
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.reference_cache import ReferenceCacheModel
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+from spiffworkflow_backend.services.spec_cache_service import ProcessModelSettingsCacheEntry
+from spiffworkflow_backend.services.spec_cache_service import SpecCacheService
+from spiffworkflow_backend.services.spec_file_service import SpecFileService
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestSpecCacheService(BaseTest):
+    def test_reuses_parsed_spec_for_unchanged_process_model(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        SpecCacheService.clear()
+        SpecCacheService.reset_stats()
+
+        (first_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+        (second_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+
+        assert first_spec is second_spec
+        stats = SpecCacheService.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+    def test_updating_a_file_invalidates_the_cached_spec(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        SpecCacheService.clear()
+        SpecCacheService.reset_stats()
+
+        (first_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+        assert process_model.primary_file_name is not None
+        bpmn_file_contents = SpecFileService.get_data(process_model, process_model.primary_file_name)
+        SpecFileService.update_file(process_model, process_model.primary_file_name, bpmn_file_contents + b"\n")
+        assert SpecCacheService.stats()["invalidations"] == 1
+
+        (second_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+        assert first_spec is not second_spec
+        assert SpecCacheService.stats()["misses"] == 2
+
+    def test_notices_when_called_processes_from_other_process_models_change(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        called_process_model = load_test_spec(
+            process_model_id="test_group/called",
+            bpmn_file_name="manual_task.bpmn",
+            process_model_source_directory="call-activity-to-human-task",
+        )
+        process_model = load_test_spec(
+            process_model_id="test_group/caller",
+            bpmn_file_name="primary_process.bpmn",
+            process_model_source_directory="call-activity-to-human-task",
+        )
+        called_process_id = "ManualTaskToCallFromCallActivityToTestWaitingLogs"
+        called_file_path = SpecFileService.full_file_path(called_process_model, "manual_task.bpmn")
+        SpecCacheService.clear()
+        SpecCacheService.reset_stats()
+
+        def get_spec() -> object:
+            (spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+            return spec
+
+        # the called file is edited outside of the api
+        first_spec = get_spec()
+        assert get_spec() is first_spec
+        with open(called_file_path, "ab") as f:
+            f.write(b"\n")
+        second_spec = get_spec()
+        assert second_spec is not first_spec
+
+        # a dmn file is added next to the called file
+        dmn_file_path = os.path.join(os.path.dirname(called_file_path), "level2c.dmn")
+        shutil.copy(self.get_test_data_file_full_path("level2c.dmn", "call_activity_nested"), dmn_file_path)
+        third_spec = get_spec()
+        assert third_spec is not second_spec
+        os.remove(dmn_file_path)
+        fourth_spec = get_spec()
+
+        # the called process now resolves to a file in another process model
+        moved_directory = os.path.join(os.path.dirname(os.path.dirname(called_file_path)), "moved")
+        os.makedirs(moved_directory)
+        shutil.copy(called_file_path, moved_directory)
+        reference = ReferenceCacheModel.basic_query().filter_by(identifier=called_process_id, type="process").first()
+        reference.relative_location = "test_group/moved"
+        db.session.add(reference)
+        db.session.commit()
+        assert get_spec() is not fourth_spec
+        stats = SpecCacheService.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 5
+
+    def test_does_not_cache_when_disabled(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/hello_world",
+            process_model_source_directory="hello_world",
+        )
+        SpecCacheService.clear()
+        SpecCacheService.reset_stats()
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_SPEC_CACHE_ENABLED", False):
+            (first_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+            (second_spec, _) = ProcessInstanceProcessor.get_process_model_and_subprocesses(process_model.id)
+
+        assert first_spec is not second_spec
+        assert SpecCacheService.stats()["size"] == 0
+
+    def test_keeps_only_the_most_recently_used_process_model_settings(
+        self,
+        app: Flask,
+    ) -> None:
+        SpecCacheService.clear()
+
+        def settings() -> ProcessModelSettingsCacheEntry:
+            return ProcessModelSettingsCacheEntry(
+                metadata_extraction_paths=None,
+                task_data_size_soft_limit_in_bytes=None,
+                task_data_size_hard_limit_in_bytes=None,
+                process_model_json_mtime_ns=1,
+            )
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_SPEC_CACHE_PROCESS_MODEL_SETTINGS_MAX_ENTRIES", 2):
+            SpecCacheService.set_process_model_settings("one", settings())
+            SpecCacheService.set_process_model_settings("two", settings())
+            assert SpecCacheService.get_process_model_settings("one", 1) is not None
+            SpecCacheService.set_process_model_settings("three", settings())
+
+        assert SpecCacheService.get_process_model_settings("one", 1) is not None
+        assert SpecCacheService.get_process_model_settings("two", 1) is None
+        assert SpecCacheService.get_process_model_settings("three", 1) is not None
+        SpecCacheService.clear()
@@ -0,0 +1,159 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from flask import Flask
+from pytest_mock.plugin import MockerFixture
+from SpiffWorkflow.util.task import TaskState  # type: ignore
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.task import TaskModel  # noqa: F401
+from spiffworkflow_backend.services.process_instance_processor import ProcessInstanceProcessor
+from spiffworkflow_backend.services.task_service import TaskService
+from spiffworkflow_backend.services.workflow_execution_service import TaskChangeTracker
+
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestTaskChangeTracker(BaseTest):
+    def test_unchanged_tasks_are_not_persisted_again(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/user-task-with-timer",
+            process_model_source_directory="user-task-with-timer",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+        self._assert_task_models_match_spiff_tasks(processor)
+
+        processor = ProcessInstanceProcessor(process_instance)
+        update_spy = mocker.spy(TaskService, "update_task_model_with_spiff_task")
+        processor.do_engine_steps(save=True)
+
+        non_completed_tasks = processor.bpmn_process_instance.get_tasks(state=TaskState.NOT_FINISHED_MASK)
+        assert len(non_completed_tasks) > 0
+        assert update_spy.call_count < len(non_completed_tasks)
+        self._assert_task_models_match_spiff_tasks(processor)
+
+    def test_boundary_timer_firing_is_persisted(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/user-task-with-timer",
+            process_model_source_directory="user-task-with-timer",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        processor = ProcessInstanceProcessor(process_instance)
+        timer_task = processor.get_task_by_bpmn_identifier("user_task_timer_event", processor.bpmn_process_instance)
+        assert timer_task is not None
+        assert timer_task.state == TaskState.WAITING
+        timer_task._set_internal_data(event_value=(datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat())
+        processor.do_engine_steps(save=True)
+
+        assert processor.bpmn_process_instance.is_completed()
+        self._assert_task_models_match_spiff_tasks(processor)
+        process_instance = ProcessInstanceModel.query.filter_by(id=process_instance.id).first()
+        assert process_instance.status == "complete"
+
+    def test_parallel_gateway_branches_are_persisted(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/parallel_manual_tasks",
+            process_model_source_directory="parallel_manual_tasks",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+        assert len(processor.get_ready_user_tasks()) == 2
+        self._assert_task_models_match_spiff_tasks(processor)
+
+        processor = ProcessInstanceProcessor(process_instance)
+        self.complete_next_manual_task(processor, data={"branch_one": True})
+        self._assert_task_models_match_spiff_tasks(processor)
+
+        processor = ProcessInstanceProcessor(process_instance)
+        assert len(processor.get_ready_user_tasks()) == 1
+        join_tasks = [t for t in processor.bpmn_process_instance.get_tasks() if t.task_spec.name == "join"]
+        assert any(t.state == TaskState.WAITING for t in join_tasks)
+        self.complete_next_manual_task(processor, data={"branch_two": True})
+        self._assert_task_models_match_spiff_tasks(processor)
+
+        assert processor.bpmn_process_instance.is_completed()
+        end_data = processor.bpmn_process_instance.last_task.data
+        assert end_data["branch_one"] is True
+        assert end_data["branch_two"] is True
+        assert end_data["shared"] == {"values": [1, 2, 3]}
+
+    def test_data_modified_in_place_is_persisted(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/parallel_manual_tasks",
+            process_model_source_directory="parallel_manual_tasks",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        processor = ProcessInstanceProcessor(process_instance)
+        ready_task = processor.get_ready_user_tasks()[0]
+        ready_task.data["shared"]["values"].append(4)
+        TaskChangeTracker.mark_data_changed(ready_task)
+        processor.do_engine_steps(save=True)
+
+        self._assert_task_models_match_spiff_tasks(processor)
+        task_model = TaskModel.query.filter_by(guid=str(ready_task.id)).first()
+        assert task_model is not None
+        assert task_model.json_data()["shared"] == {"values": [1, 2, 3, 4]}
+
+    def test_persists_every_task_when_disabled(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/user-task-with-timer",
+            process_model_source_directory="user-task-with-timer",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        processor = ProcessInstanceProcessor(process_instance)
+        processor.do_engine_steps(save=True)
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_TASK_CHANGE_TRACKING_ENABLED", False):
+            processor = ProcessInstanceProcessor(process_instance)
+            assert processor.task_change_tracker is None
+            update_spy = mocker.spy(TaskService, "update_task_model_with_spiff_task")
+            processor.do_engine_steps(save=True)
+
+        non_completed_tasks = processor.bpmn_process_instance.get_tasks(state=TaskState.NOT_FINISHED_MASK)
+        assert update_spy.call_count >= len(non_completed_tasks)
+
+    def _assert_task_models_match_spiff_tasks(self, processor: ProcessInstanceProcessor) -> None:
+        """Make sure what is in the database is what we would get by persisting every non-completed task."""
+        for spiff_task in processor.bpmn_process_instance.get_tasks(state=TaskState.NOT_FINISHED_MASK):
+            task_model = TaskModel.query.filter_by(guid=str(spiff_task.id)).first()
+            assert task_model is not None, f"Could not find task model for {spiff_task.task_spec.name}"
+            expected_properties_json = processor._serializer.to_dict(spiff_task)
+            if expected_properties_json["task_spec"] == "Start":
+                expected_properties_json["parent"] = None
+            expected_data = expected_properties_json.pop("data")
+            assert task_model.state == TaskState.get_name(spiff_task.state), spiff_task.task_spec.name
+            assert task_model.properties_json == expected_properties_json, spiff_task.task_spec.name
+            assert task_model.json_data_hash == JsonDataModel.json_data_dict_from_dict(expected_data)["hash"]
@@ -1,3 +1,5 @@
+import re
+
 from flask import Flask
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
 from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
@@ -57,6 +59,46 @@ class TestTaskService(BaseTest):
         full_bpnmn_process_path = TaskService.full_bpmn_process_path(bpmn_process_level_3)
         assert full_bpnmn_process_path == ["Level1", "Level2", "Level3"]
 
+    def test_prefetches_task_and_bpmn_process_rows_when_saving_a_run(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        for bpmn_file_name in ["call_activity_level_3", "call_activity_level_2b", "call_activity_level_2"]:
+            load_test_spec(
+                f"test_group/{bpmn_file_name}",
+                process_model_source_directory="call_activity_nested",
+                bpmn_file_name=bpmn_file_name,
+            )
+        process_model = load_test_spec(
+            "test_group/call_activity_nested",
+            process_model_source_directory="call_activity_nested",
+            bpmn_file_name="call_activity_nested",
+        )
+        # one row at a time lookups like "FROM task WHERE task.guid = ?"
+        point_query_pattern = re.compile(r"FROM (task|bpmn_process)\s+WHERE (task|bpmn_process)\.(guid|id) = ")
+
+        point_query_counts = []
+        task_counts = []
+        for prefetch_enabled in [False, True]:
+            process_instance = self.create_process_instance_from_process_model(process_model)
+            processor = ProcessInstanceProcessor(process_instance)
+            with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_TASK_MODEL_PREFETCH_ENABLED", prefetch_enabled):
+                with self.count_queries() as statements:
+                    processor.do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert process_instance.status == "complete"
+            point_query_counts.append(len([s for s in statements if point_query_pattern.search(s)]))
+            task_counts.append(TaskModel.query.filter_by(process_instance_id=process_instance.id).count())
+
+        assert point_query_counts[0] > 0
+        assert point_query_counts[1] == 0
+        assert task_counts[0] == task_counts[1]
+
+        # the rows are prefetched without their properties_json since saving replaces it anyway
+        prefetch_statements = [s for s in statements if re.search(r"FROM task\s+WHERE task\.process_instance_id = ", s)]
+        assert len(prefetch_statements) > 0
+        assert all("properties_json" not in s for s in prefetch_statements)
+
     def test_task_models_of_parent_bpmn_processes_stop_on_first_call_activity(
         self,
         app: Flask,